@@ -0,0 +1,127 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Per route concurrency limits with backpressure for the REST API
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+
+@dataclass
+class RouteLimit:
+    """
+    concurrency limit of a single route
+    """
+
+    max_concurrency: int = 4
+    # requests allowed to wait for a free slot - more are rejected with 429
+    max_queue: int = 16
+    # seconds a request may wait for a free slot - then it is rejected with 503
+    queue_timeout: float = 10.0
+    # seconds a rejected client should wait before retrying
+    retry_after: int = 1
+
+
+@dataclass
+class ApiLimits:
+    """
+    the route limits of the REST API by route name
+    """
+
+    routes: Dict[str, RouteLimit] = field(
+        default_factory=lambda: {
+            "backends": RouteLimit(max_concurrency=4),
+            "endpoints": RouteLimit(max_concurrency=4),
+            "examples": RouteLimit(max_concurrency=16, max_queue=64),
+            "stats": RouteLimit(max_concurrency=8, max_queue=32),
+            # streams hold their slot until the whole sweep is done
+            "stream": RouteLimit(max_concurrency=4, max_queue=0),
+        }
+    )
+
+    def apply(self, specs: Optional[List[str]]):
+        """
+        apply the given command line limits
+
+        Args:
+            specs: list of route=max_concurrency e.g. ["endpoints=8"]
+        """
+        for spec in specs or []:
+            route, _, value = spec.partition("=")
+            if route not in self.routes or not value.isdigit():
+                raise ValueError(
+                    f"invalid api limit {spec} - expected route=n with route one of {list(self.routes)}"
+                )
+            self.routes[route].max_concurrency = int(value)
+
+
+class RouteLimiter:
+    """
+    bounds the number of concurrently handled requests of a route
+
+    Requests beyond the limit wait for a free slot - if too many are already
+    waiting the request is rejected with 429 Too Many Requests, if no slot
+    frees up in time with 503 Service Unavailable, both with a Retry-After
+    header. This keeps slow probing routes from piling up work that competes
+    with the websocket traffic of the dashboards.
+    """
+
+    def __init__(self, name: str, limit: RouteLimit):
+        """
+        constructor
+
+        Args:
+            name: the name of the route
+            limit: the limit to apply
+        """
+        self.name = name
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit.max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def reject(self, status_code: int, reason: str) -> HTTPException:
+        """
+        get the exception rejecting a request with the given status code
+        """
+        self.rejected += 1
+        ex = HTTPException(
+            status_code=status_code,
+            detail=f"{self.name}: {reason}",
+            headers={"Retry-After": str(self.limit.retry_after)},
+        )
+        return ex
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        acquire a slot for handling a request
+        """
+        # count the requests instead of asking the semaphore which only
+        # sees waiters once their acquire has actually started
+        busy = self.active + self.waiting
+        if busy >= self.limit.max_concurrency + self.limit.max_queue:
+            raise self.reject(429, "too many requests")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(
+                self.semaphore.acquire(), timeout=self.limit.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            raise self.reject(503, "no capacity - try again later")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.semaphore.release()
@@ -4,13 +4,17 @@ Created on 2025-12-19
 @author: wf
 """
 
+import asyncio
 from dataclasses import field
 from pathlib import Path
 from typing import Dict, Optional
 
+import httpx
 import requests
 from basemkit.yamlable import lod_storable
 
+from nscholia.http_client import HttpClientManager
+
 
 @lod_storable
 class Backend:
@@ -24,6 +28,28 @@ class Backend:
     third_parties_enabled: Optional[bool] = None
     version: Optional[str] = None
 
+    @property
+    def config_url(self) -> str:
+        """
+        the url of the /backend configuration endpoint
+        """
+        # Ensure url ends with slash for clean joining, but remove it for the check
+        base_url = self.url.rstrip("/")
+        config_url = f"{base_url}/backend"
+        return config_url
+
+    def apply_config(self, data: dict):
+        """
+        update the instance fields from the given /backend JSON
+        """
+        self.sparql_endpoint = data.get("sparql_endpoint")
+        self.sparql_endpoint_name = data.get("sparql_endpoint_name")
+        self.sparql_editurl = data.get("sparql_editurl")
+        self.sparql_embedurl = data.get("sparql_embedurl")
+        self.text_to_topic_q_text_enabled = data.get("text_to_topic_q_text_enabled")
+        self.third_parties_enabled = data.get("third_parties_enabled")
+        self.version = data.get("version")
+
     def fetch_config(self, timeout: float = 2.0) -> bool:
         """
         Fetches the configuration JSON from the backend's /backend endpoint
@@ -35,25 +61,12 @@ class Backend:
         Returns:
             bool: True if successful, False otherwise.
         """
-        # Ensure url ends with slash for clean joining, but remove it for the check
-        base_url = self.url.rstrip("/")
-        config_url = f"{base_url}/backend"
-
         try:
             headers = {"Accept": "application/json"}
-            response = requests.get(config_url, headers=headers, timeout=timeout)
+            response = requests.get(self.config_url, headers=headers, timeout=timeout)
 
             if response.status_code == 200:
-                data = response.json()
-                self.sparql_endpoint = data.get("sparql_endpoint")
-                self.sparql_endpoint_name = data.get("sparql_endpoint_name")
-                self.sparql_editurl = data.get("sparql_editurl")
-                self.sparql_embedurl = data.get("sparql_embedurl")
-                self.text_to_topic_q_text_enabled = data.get(
-                    "text_to_topic_q_text_enabled"
-                )
-                self.third_parties_enabled = data.get("third_parties_enabled")
-                self.version = data.get("version")
+                self.apply_config(response.json())
                 return True
             else:
                 return False
@@ -61,6 +74,37 @@ class Backend:
             # In a real app, you might want to log the error: print(f"Error fetching {config_url}: {_e}")
             return False
 
+    async def fetch_config_async(
+        self, timeout: float = 2.0, client: Optional[httpx.AsyncClient] = None
+    ) -> bool:
+        """
+        async variant of fetch_config using the shared pooled http client
+
+        Args:
+            timeout (float): Request timeout in seconds.
+            client: the client to use - default: the shared pooled client
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            headers = {"Accept": "application/json"}
+            if client is None:
+                response = await HttpClientManager.request(
+                    "GET", self.config_url, headers=headers, timeout=timeout
+                )
+            else:
+                response = await client.get(
+                    self.config_url, headers=headers, timeout=timeout
+                )
+            if response.status_code == 200:
+                self.apply_config(response.json())
+                return True
+            else:
+                return False
+        except Exception as _e:
+            return False
+
 
 @lod_storable
 class Backends:
@@ -81,3 +125,28 @@ class Backends:
             yaml_path = cls.yaml_path()
         backends = cls.load_from_yaml_file(yaml_path)
         return backends
+
+    async def probe_all(self, timeout: float = 2.0) -> Dict[str, bool]:
+        """
+        fetch the configuration of all backends concurrently
+
+        Args:
+            timeout: the time budget in seconds for the whole probe
+
+        Returns:
+            Dict[str, bool]: success by backend key - backends that did
+            not answer within the budget are reported as False
+        """
+        tasks = {
+            key: asyncio.ensure_future(backend.fetch_config_async(timeout))
+            for key, backend in self.backends.items()
+        }
+        results = {key: False for key in tasks}
+        if tasks:
+            _done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            for key, task in tasks.items():
+                if task.done() and not task.cancelled():
+                    results[key] = task.result()
+        return results
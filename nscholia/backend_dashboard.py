@@ -4,8 +4,6 @@ Created on 2025-12-19
 @author: wf
 """
 
-import asyncio
-
 from ngwidgets.lod_grid import GridConfig, ListOfDictsGrid
 from ngwidgets.progress import NiceguiProgressbar
 from ngwidgets.widgets import Link
@@ -13,6 +11,8 @@ from nicegui import run, ui
 
 from nscholia.backend import Backends
 from nscholia.dashboard import Dashboard
+from nscholia.grid_updater import GridUpdater
+from nscholia.probe_service import BackendProbe
 
 
 class BackendDashboard(Dashboard):
@@ -29,6 +29,8 @@ class BackendDashboard(Dashboard):
         self.grid_container = None
         self.grid = None
         self.timeout_seconds = 2.0
+        # results are shared by all sessions via the server side probe service
+        self.probe_service = self.webserver.probe_service
 
         self.COLORS.update(
             {"pending": "#ffffff", "checking": "#f0f0f0", "offline": "#ffcccc"}
@@ -62,14 +64,36 @@ class BackendDashboard(Dashboard):
 
         self.grid_container = ui.column().classes("w-full h-full")
 
-        ui.timer(0.1, self.reload_config, once=True)
+        self.probe_service.subscribe("backends", self.on_probe)
+        self.solution.client.on_disconnect(self.on_disconnect)
+        ui.timer(0.1, self.load_config, once=True)
+
+    async def load_config(self):
+        """Load the configuration - the shared one if it is already loaded."""
+        await self.show_config(force=self.webserver.backends is None)
 
     async def reload_config(self):
         """Reload data from the YAML file."""
+        await self.show_config(force=True)
+
+    async def show_config(self, force: bool):
+        """
+        read and show the configuration
+
+        Args:
+            force: re-read the default config shared with the probe service
+                and the API even if it is already loaded
+        """
         try:
-            self.backends_config = await run.io_bound(
-                Backends.from_yaml_path, self.yaml_path
-            )
+            if self.yaml_path is None:
+                if force:
+                    backends = await run.io_bound(Backends.from_yaml_path)
+                    self.share_config(backends)
+                self.backends_config = self.webserver.backends
+            else:
+                self.backends_config = await run.io_bound(
+                    Backends.from_yaml_path, self.yaml_path
+                )
 
             self.render_grid()
             if self.backends_config and self.backends_config.backends:
@@ -82,6 +106,18 @@ class BackendDashboard(Dashboard):
             if self.solution:
                 self.solution.handle_exception(e)
 
+    def share_config(self, backends: Backends):
+        """
+        carry the entries of the given freshly read default config over to
+        the shared one and drop the probe results of the old entries
+        """
+        if self.webserver.backends is None:
+            self.webserver.backends = backends
+        else:
+            # in place so that all holders of the shared config see the edits
+            self.webserver.backends.backends = backends.backends
+        self.probe_service.caches["backends"].invalidate()
+
     def _get_sparql_link_html(self, backend_obj) -> str:
         """
         Helper function to generate the HTML link for the SPARQL edit URL.
@@ -143,6 +179,7 @@ class BackendDashboard(Dashboard):
             "rowSelection": "single",
             "animateRows": True,
             ":getRowStyle": """function(params) { return { background: params.data.color }; }""",
+            **GridUpdater.row_id_option("key"),
         }
 
         config = GridConfig(
@@ -156,9 +193,20 @@ class BackendDashboard(Dashboard):
 
         with self.grid_container:
             self.grid = ListOfDictsGrid(lod=rows, config=config)
+            self.updater = GridUpdater(self.grid, fps=self.UPDATE_FPS)
+
+        # show the shared results of earlier probes
+        for row in rows:
+            entry = self.probe_service.get_entry("backends", row["key"])
+            if entry is not None:
+                self.set_result(row, entry.value)
+        self.grid.update()
 
     async def check_all(self):
-        """Check all backends asynchronously."""
+        """
+        Trigger a (coalesced) re-probe of all backends - the rows are
+        filled in by on_probe as soon as each result arrives
+        """
         if not self.grid:
             ui.notify("No data loaded to check")
             return
@@ -174,43 +222,46 @@ class BackendDashboard(Dashboard):
         for row in rows:
             row["status_msg"] = "Queued..."
             row["color"] = self.COLORS["checking"]
-        self.grid.update()
+        self.updater.mark_all(rows)
 
-        batch_size = 5
-        for i in range(0, total, batch_size):
-            batch_rows = rows[i : i + batch_size]
-            tasks = [self.check_single_row(row) for row in batch_rows]
-            await asyncio.gather(*tasks)
-            self.progress_bar.update(len(batch_rows))
-            self.grid.update()
+        await self.probe_service.refresh(
+            "backends",
+            targets=dict(self.backends_config.backends),
+            timeout=self.timeout_seconds,
+        )
+        self.updater.flush()
 
         self.progress_bar.progress.visible = False
         ui.notify("Backend check complete")
 
-    async def check_single_row(self, row: dict):
-        """Check a single backend row."""
-        key = row.get("key")
-        backend_obj = self.backends_config.backends.get(key)
-
-        if not backend_obj:
-            row["status_msg"] = "Config Missing"
-            row["color"] = self.COLORS["error"]
-            return
-
-        try:
-            row["status_msg"] = "Checking..."
-            success = await run.io_bound(backend_obj.fetch_config, self.timeout_seconds)
-
-            if success:
-                row["status_msg"] = "OK"
-                row["color"] = self.COLORS["success"]
-                row["version"] = backend_obj.version or "?"
-                row["sparql_link"] = self._get_sparql_link_html(backend_obj)
-
-            else:
-                row["status_msg"] = "Unreachable / No JSON"
-                row["color"] = self.COLORS["offline"]
+    def on_probe(self, key: str, probe: BackendProbe):
+        """
+        probe service callback - fill in the row of the given backend
+        """
+        row = self.grid.get_row_for_key(key) if self.grid else None
+        if row is not None:
+            self.set_result(row, probe)
+            if self.progress_bar.progress.visible:
+                self.progress_bar.update(1)
+            self.updater.mark(row)
+
+    def on_disconnect(self):
+        """
+        stop listening to the probe service when the browser session ends
+        """
+        self.probe_service.unsubscribe("backends", self.on_probe)
 
-        except Exception as ex:
-            row["status_msg"] = f"Error: {str(ex)}"
+    def set_result(self, row: dict, probe: BackendProbe):
+        """Show the result of checking a single backend row."""
+        backend_obj = probe.backend
+        if probe.error:
+            row["status_msg"] = f"Error: {probe.error}"
             row["color"] = self.COLORS["error"]
+        elif probe.success:
+            row["status_msg"] = "OK"
+            row["color"] = self.COLORS["success"]
+            row["version"] = backend_obj.version or "?"
+            row["sparql_link"] = self._get_sparql_link_html(backend_obj)
+        else:
+            row["status_msg"] = "Unreachable / No JSON"
+            row["color"] = self.COLORS["offline"]
@@ -1,43 +1,35 @@
 """
 Command line entry point
+
+Only the modules of the command that is actually run are imported
+- a headless sweep does not load NiceGUI at all
 """
 
 import sys
-from argparse import ArgumentParser
-
-from ngwidgets.cmd import WebserverCmd
-
-from nscholia.webserver import ScholiaWebserver
 
 
-class ScholiaCmd(WebserverCmd):
+def __getattr__(name: str):
     """
-    Command Line Interface
+    lazily provide ScholiaCmd which needs ngwidgets and NiceGUI
     """
+    if name == "ScholiaCmd":
+        from nscholia.scholia_cmd import ScholiaCmd
 
-    def getArgParser(self, description: str, version_msg) -> ArgumentParser:
-        """
-        get the argument parser
-        """
-        parser = super().getArgParser(description, version_msg)
-        parser.add_argument(
-            "--sheet-id",
-            dest="sheet_id",
-            default="1cbEY7P9U-1xtvEgeAiizjJiOkpuihRFdc03JL239Ixg",
-            help="Google Sheet ID for Scholia examples (CSV export will be used)",
-        )
-        parser.add_argument(
-            "--sheet-gid",
-            dest="sheet_gid",
-            type=int,
-            default=0,
-            help="Google Sheet GID (tab id), default: 0",
-        )
-
-        return parser
+        return ScholiaCmd
+    raise AttributeError(f"module {__name__} has no attribute {name}")
 
 
 def main(argv: list = None):
+    args = sys.argv[1:] if argv is None else argv
+    if args and args[0] == "sweep":
+        # headless sweep e.g. nicescholia sweep examples -o examples.json
+        from nscholia.sweep import SweepCmd
+
+        exit_code = SweepCmd().main(args[1:])
+        return exit_code
+    from nscholia.scholia_cmd import ScholiaCmd
+    from nscholia.webserver import ScholiaWebserver
+
     cmd = ScholiaCmd(
         config=ScholiaWebserver.get_config(),
         webserver_cls=ScholiaWebserver,
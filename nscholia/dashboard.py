@@ -18,11 +18,24 @@ class Dashboard:
         "error": "#fee2e2",  # Light red - endpoint offline/unreachable
     }
 
+    # latency breakdown of a StatusResult: field -> column header
+    # - the connect time includes the DNS resolution
+    TIMING_FIELDS = {
+        "connect": "Connect (s)",
+        "tls": "TLS (s)",
+        "ttfb": "TTFB (s)",
+        "transfer": "Transfer (s)",
+    }
+
+    # maximum number of delta updates of the grid per second
+    UPDATE_FPS = 4.0
+
     def __init__(self, solution):
         self.solution = solution
         self.webserver = solution.webserver
         self.legend_row = None
         self.grid = None  # Will hold the ListOfDictsGrid instance
+        self.updater = None  # Will hold the GridUpdater of the grid
 
     def setup_legend(self):
         # Add legend
@@ -31,6 +44,32 @@ class Dashboard:
             ui.label("🟡 Warning").classes("text-sm")
             ui.label("🔴 Error").classes("text-sm")
 
+    def timing_column_defs(self) -> list:
+        """
+        get the column definitions for the latency breakdown
+        """
+        column_defs = []
+        for field, header in self.TIMING_FIELDS.items():
+            column_defs.append(
+                {
+                    "headerName": header,
+                    "field": field,
+                    "sortable": True,
+                    "width": 90,
+                    "type": "numericColumn",
+                    ":valueFormatter": "params.value ? params.value.toFixed(3) : ''",
+                }
+            )
+        return column_defs
+
+    def set_timings(self, row: dict, result=None):
+        """
+        set the latency breakdown of the given StatusResult in the given row
+        - all timings are reset if there is no result
+        """
+        for field in self.TIMING_FIELDS:
+            row[field] = getattr(result, field, 0.0) if result is not None else 0.0
+
     def setup_ui(self):
         """
         Base setup method to be overridden by subclasses
@@ -4,15 +4,14 @@ Created on 2025-12-19
 @author: wf
 """
 
-import asyncio
-
 from ngwidgets.lod_grid import GridConfig, ListOfDictsGrid
 from ngwidgets.widgets import Link
 from nicegui import ui
 
 from nscholia.dashboard import Dashboard
-from nscholia.endpoints import Endpoints, UpdateState
-from nscholia.monitor import Monitor
+from nscholia.endpoints import Endpoints
+from nscholia.grid_updater import GridUpdater
+from nscholia.probe_service import EndpointProbe
 
 
 class EndpointDashboard(Dashboard):
@@ -22,110 +21,96 @@ class EndpointDashboard(Dashboard):
 
     def __init__(self, solution):
         super().__init__(solution)
-        # Initialize the endpoints provider
-        self.endpoints_provider = Endpoints()
-
-        # Initialize the endpoints provider
-        self.endpoints_provider = Endpoints()
+        # the endpoints provider is shared by all sessions
+        self.endpoints_provider = Endpoints.get_instance()
+        # results are shared by all sessions via the server side probe service
+        self.probe_service = self.webserver.probe_service
+        self.rows_by_key = {}
 
     async def check_all(self):
-        """Run checks for all endpoints in the grid"""
+        """
+        Trigger a (coalesced) re-probe of all endpoints - the rows are
+        filled in by on_probe as soon as each result arrives
+        """
         if not self.grid:
             return
 
         ui.notify("Checking endpoints...")
 
-        # Access the List of Dicts (LOD) directly from the wrapper
-        rows = self.grid.lod
-
-        for row in rows:
+        for row in self.grid.lod:
             # Visual update for checking state
             row["status"] = "Checking..."
             row["color"] = self.COLORS["checking"]
             row["triples"] = 0
             row["timestamp"] = ""
 
-            # Update the grid view to show 'Checking...' state immediately
-            self.grid.update()
-
-            # Async check
-            try:
-                url = row["url"]
-                # First check if endpoint is online
-                result = await Monitor.check(url)
-
-                # Update based on availability
-                if result.is_online:
-                    row["status"] = f"Online ({result.status_code})"
-                    row["latency"] = result.latency
-
-                    # Now try to get update state information (triples & timestamp)
-                    ep_key = row["endpoint_key"]
-                    endpoints_data = self.endpoints_provider.get_endpoints()
-
-                    update_success = False
-                    if ep_key in endpoints_data:
-                        ep = endpoints_data[ep_key]
-                        try:
-                            # Run update state query in executor to avoid blocking
-                            update_state = (
-                                await asyncio.get_event_loop().run_in_executor(
-                                    None,
-                                    UpdateState.from_endpoint,
-                                    self.endpoints_provider,
-                                    ep,
-                                )
-                            )
-
-                            if update_state.success:
-                                # SUCCESS: Endpoint online AND update query succeeded
-                                row["triples"] = update_state.triples or 0
-                                row["timestamp"] = update_state.timestamp or ""
-                                row["color"] = self.COLORS["success"]
-                                update_success = True
-                            else:
-                                # WARNING: Endpoint online BUT update query failed
-                                row["triples"] = 0
-                                row["timestamp"] = update_state.error or "N/A"
-                                row["status"] = (
-                                    f"Online ({result.status_code}) ⚠️ {update_state.error or 'Update query failed'}"
-                                )
-                                row["color"] = self.COLORS["warning"]
-
-                        except Exception as update_ex:
-                            # WARNING: Endpoint online BUT update query threw exception
-                            row["triples"] = 0
-                            row["timestamp"] = str(update_ex)
-                            row["status"] = (
-                                f"Online ({result.status_code}) ⚠️ Update error: {str(update_ex)}"
-                            )
-                            row["color"] = self.COLORS["warning"]
-
-                    # If no update state check was attempted or key not found
-                    if not update_success and row["color"] == self.COLORS["checking"]:
-                        row["color"] = self.COLORS["warning"]
-                        row["status"] += " (No update data)"
-
-                else:
-                    # ERROR: Endpoint offline/unreachable
-                    row["status"] = result.error or f"Error {result.status_code}"
-                    row["latency"] = 0
-                    row["triples"] = 0
-                    row["timestamp"] = ""
-                    row["color"] = self.COLORS["error"]
-
-            except Exception as ex:
-                # ERROR: Exception during availability check
-                row["status"] = f"Exception: {str(ex)}"
-                row["latency"] = 0
-                row["triples"] = 0
-                row["timestamp"] = ""
-                row["color"] = self.COLORS["error"]
+        # show the 'Checking...' state with the next frame
+        self.updater.mark_all(self.grid.lod)
 
-        # Final update to show results
-        self.grid.update()
+        await self.probe_service.refresh("endpoints")
+        self.updater.flush()
         ui.notify("Status check complete")
 
+    def on_probe(self, key: str, probe: EndpointProbe):
+        """
+        probe service callback - fill in the row of the given endpoint
+        """
+        row = self.rows_by_key.get(key)
+        if row is not None and self.updater:
+            self.set_result(row, probe)
+            self.updater.mark(row)
+
+    def on_disconnect(self):
+        """
+        stop listening to the probe service when the browser session ends
+        """
+        self.probe_service.unsubscribe("endpoints", self.on_probe)
+
+    def set_result(self, row: dict, probe: EndpointProbe):
+        """
+        show the availability and update state of a single endpoint row
+        """
+        result = probe.status
+        if result.is_online:
+            row["status"] = f"Online ({result.status_code})"
+            row["latency"] = result.latency
+            self.set_timings(row, result)
+            row["color"] = self.COLORS["checking"]
+            update_state = probe.update_state
+            if probe.error:
+                # WARNING: Endpoint online BUT update query threw exception
+                row["triples"] = 0
+                row["timestamp"] = probe.error
+                row["status"] = (
+                    f"Online ({result.status_code}) ⚠️ Update error: {probe.error}"
+                )
+                row["color"] = self.COLORS["warning"]
+            elif update_state is not None and update_state.success:
+                # SUCCESS: Endpoint online AND update query succeeded
+                row["triples"] = update_state.triples or 0
+                row["timestamp"] = update_state.timestamp or ""
+                row["color"] = self.COLORS["success"]
+            elif update_state is not None:
+                # WARNING: Endpoint online BUT update query failed
+                row["triples"] = 0
+                row["timestamp"] = update_state.error or "N/A"
+                row["status"] = (
+                    f"Online ({result.status_code}) ⚠️ {update_state.error or 'Update query failed'}"
+                )
+                row["color"] = self.COLORS["warning"]
+            else:
+                # If no update state check was attempted
+                row["color"] = self.COLORS["warning"]
+                row["status"] += " (No update data)"
+        else:
+            # ERROR: Endpoint offline/unreachable
+            row["status"] = result.error or f"Error {result.status_code}"
+            row["latency"] = 0
+            self.set_timings(row, result)
+            row["triples"] = 0
+            row["timestamp"] = ""
+            row["color"] = self.COLORS["error"]
+
     def setup_ui(self):
         """
         Render the dashboard
@@ -163,6 +148,7 @@ class EndpointDashboard(Dashboard):
                     "link": link_html,
                     "status": "Pending",
                     "latency": 0.0,
+                    **{field: 0.0 for field in self.TIMING_FIELDS},
                     "triples": 0,
                     "timestamp": "",
                     "color": "#ffffff",
@@ -197,6 +183,7 @@ class EndpointDashboard(Dashboard):
                 "type": "numericColumn",
                 "valueFormatter": "params.value ? params.value.toFixed(3) : '0.000'",
             },
+            *self.timing_column_defs(),
             {
                 "headerName": "Triples",
                 "field": "triples",
@@ -219,11 +206,13 @@ class EndpointDashboard(Dashboard):
             ":getRowStyle": """(params) => {
                 return { background: params.data.color };
             }""",
+            **GridUpdater.row_id_option("endpoint_key"),
         }
 
         config = GridConfig(
             column_defs=column_defs,
-            key_col="url",
+            # several endpoints may share the same website url
+            key_col="endpoint_key",
             options=grid_options,
             html_columns=[2],
             auto_size_columns=True,
@@ -231,4 +220,18 @@ class EndpointDashboard(Dashboard):
         )
 
         self.grid = ListOfDictsGrid(lod=rows, config=config)
-        ui.timer(0.5, self.check_all, once=True)
+        self.updater = GridUpdater(self.grid, fps=self.UPDATE_FPS)
+        self.rows_by_key = {row["endpoint_key"]: row for row in rows}
+
+        # show the shared results and only probe if there are none yet
+        all_fresh = True
+        for key, row in self.rows_by_key.items():
+            entry = self.probe_service.get_entry("endpoints", key)
+            if entry is not None:
+                self.set_result(row, entry.value)
+            if entry is None or not entry.is_fresh:
+                all_fresh = False
+        self.probe_service.subscribe("endpoints", self.on_probe)
+        self.solution.client.on_disconnect(self.on_disconnect)
+        if not all_fresh:
+            ui.timer(0.5, self.check_all, once=True)
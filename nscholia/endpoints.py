@@ -3,35 +3,279 @@ created 2025-12-17
 author wf
 """
 
+import asyncio
+import copy
 import os
+import re
+import threading
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import requests
 from lodstorage.query import Endpoint, QueryManager
 from lodstorage.sparql import SPARQL
 from snapquery.snapquery_core import NamedQueryManager, Query
 
+from nscholia.http_client import HttpClientManager
+from nscholia.ttl_cache import TtlCache
+
+
+class TripleCountStrategy(ABC):
+    """
+    a way to get the number of triples of an endpoint
+    """
+
+    name = "abstract"
+    # request timeout in seconds for the cheap http based strategies
+    timeout = 5.0
+
+    @abstractmethod
+    def triple_count(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        """
+        get the triple count of the given endpoint
+
+        Args:
+            em: the endpoints manager
+            ep: the endpoint
+
+        Returns:
+            int: the triple count or None if not available
+        """
+
+    async def triple_count_async(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        """
+        async variant of triple_count - by default triple_count runs in a worker thread
+        """
+        count = await asyncio.to_thread(self.triple_count, em, ep)
+        return count
+
+
+class QLeverStatsStrategy(TripleCountStrategy):
+    """
+    QLever's index statistics via ?cmd=stats
+    """
+
+    name = "qlever-stats"
+
+    def triple_count(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        response = requests.get(
+            ep.endpoint, params={"cmd": "stats"}, timeout=self.timeout
+        )
+        count = self.count_from_response(response)
+        return count
+
+    async def triple_count_async(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        response = await HttpClientManager.request(
+            "GET", ep.endpoint, params={"cmd": "stats"}, timeout=self.timeout
+        )
+        count = self.count_from_response(response)
+        return count
+
+    def count_from_response(self, response) -> Optional[int]:
+        """
+        get the triple count from the given requests or httpx response
+        """
+        count = None
+        if response.status_code == 200:
+            stats = response.json()
+            for key in ["num-triples-normal", "num-triples"]:
+                if key in stats:
+                    count = int(stats[key])
+                    break
+        return count
+
+
+class BlazegraphEstCardStrategy(TripleCountStrategy):
+    """
+    Blazegraph's fast range count via ?ESTCARD
+    """
+
+    name = "blazegraph-estcard"
+
+    def triple_count(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        response = requests.get(f"{ep.endpoint}?ESTCARD", timeout=self.timeout)
+        count = self.count_from_response(response)
+        return count
+
+    async def triple_count_async(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        response = await HttpClientManager.request(
+            "GET", f"{ep.endpoint}?ESTCARD", timeout=self.timeout
+        )
+        count = self.count_from_response(response)
+        return count
+
+    def count_from_response(self, response) -> Optional[int]:
+        """
+        get the triple count from the given requests or httpx response
+        """
+        count = None
+        if response.status_code == 200:
+            match = re.search(r'rangeCount="(\d+)"', response.text)
+            if match:
+                count = int(match.group(1))
+        return count
+
+
+class QueryStrategy(TripleCountStrategy):
+    """
+    triple count via a named query of the dashboard queries
+    """
+
+    def __init__(self, name: str, query_name: str):
+        self.name = name
+        self.query_name = query_name
+
+    def triple_count(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        count = None
+        query = em.get_query(self.query_name, ep)
+        if query:
+            count = self.count_from_qlod(em.runQuery(query))
+        return count
+
+    async def triple_count_async(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        count = None
+        query = em.get_query(self.query_name, ep)
+        if query:
+            count = self.count_from_qlod(await em.run_query_async(query))
+        return count
+
+    @staticmethod
+    def count_from_qlod(qlod: Optional[List[Dict[str, Any]]]) -> Optional[int]:
+        """
+        get the tripleCount of the first record of the given query result
+        """
+        count = None
+        if qlod and qlod[0].get("tripleCount") is not None:
+            value = qlod[0].get("tripleCount")
+            # raw JSON results are strings - possibly in decimal or double notation
+            count = int(float(value)) if isinstance(value, str) else int(value)
+        return count
+
+
+class CachedQueryStrategy(QueryStrategy):
+    """
+    expensive triple count query as fallback with a per endpoint time to live
+    """
+
+    def triple_count(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        key = (self.query_name, ep.endpoint)
+        count = em.count_cache.get(key)
+        if count is None:
+            count = super().triple_count(em, ep)
+            if count is not None:
+                em.count_cache.set(key, count, ttl=em.count_ttl_for_endpoint(ep))
+        return count
+
+    async def triple_count_async(self, em: "Endpoints", ep: Endpoint) -> Optional[int]:
+        key = (self.query_name, ep.endpoint)
+        count = em.count_cache.get(key)
+        if count is None:
+            count = await super().triple_count_async(em, ep)
+            if count is not None:
+                em.count_cache.set(key, count, ttl=em.count_ttl_for_endpoint(ep))
+        return count
+
 
 class Endpoints:
     """
     endpoints access
     """
 
+    # timeout in seconds of the async SPARQL queries
+    QUERY_TIMEOUT = 60.0
+    # default time to live in seconds of the expensive COUNT(*) fallback
+    DEFAULT_COUNT_TTL = 6 * 3600.0
+    # shared by all instances so that the expensive count survives page visits
+    count_cache = TtlCache(default_ttl=DEFAULT_COUNT_TTL)
+
+    VOID_STRATEGY = QueryStrategy("void", "VoidTripleCount")
+    COUNT_STRATEGY = CachedQueryStrategy("count", "TripleCount")
+
+    # cheapest first - the expensive count is always the last resort
+    STRATEGIES_BY_DATABASE = {
+        "qlever": [QLeverStatsStrategy(), VOID_STRATEGY, COUNT_STRATEGY],
+        "blazegraph": [BlazegraphEstCardStrategy(), VOID_STRATEGY, COUNT_STRATEGY],
+    }
+    DEFAULT_STRATEGIES = [VOID_STRATEGY, COUNT_STRATEGY]
+
+    # the process wide instance - see get_instance
+    _instance: Optional["Endpoints"] = None
+    _instance_lock = threading.Lock()
+
     def __init__(self):
         self.nqm = NamedQueryManager.from_samples()
         # Initialize QueryManager with the specific YAML path for dashboard queries
-        yaml_path = (
-            Path(__file__).parent.parent
-            / "nscholia_examples"
-            / "dashboard_queries.yaml"
-        )
+        yaml_path = self.yaml_path()
         if not os.path.exists(yaml_path):
             raise FileNotFoundError(f"Query YAML file not found: {yaml_path}")
         self.qm = QueryManager(
             lang="sparql", queriesPath=yaml_path, with_default=False, debug=False
         )
+        # time to live overrides of the count fallback by endpoint name
+        self.count_ttl: Dict[str, float] = {}
+        self.mtimes = self.source_mtimes()
+
+    @classmethod
+    def yaml_path(cls) -> Path:
+        """
+        the path of the dashboard queries
+        """
+        yaml_path = (
+            Path(__file__).parent.parent
+            / "nscholia_examples"
+            / "dashboard_queries.yaml"
+        )
+        return yaml_path
+
+    def source_paths(self) -> List[str]:
+        """
+        the files this instance has been built from
+        """
+        source_paths = [
+            str(self.yaml_path()),
+            os.path.join(self.nqm.samples_path, "endpoints.yaml"),
+            NamedQueryManager.get_cache_path(),
+        ]
+        return source_paths
+
+    def source_mtimes(self) -> Dict[str, float]:
+        """
+        the modification times of my source files
+        """
+        mtimes = {}
+        for path in self.source_paths():
+            mtimes[path] = os.path.getmtime(path) if os.path.exists(path) else None
+        return mtimes
+
+    def is_outdated(self) -> bool:
+        """
+        check whether any of my source files changed since I was built
+        """
+        outdated = self.source_mtimes() != self.mtimes
+        return outdated
+
+    @classmethod
+    def get_instance(cls) -> "Endpoints":
+        """
+        get the process wide Endpoints instance
+
+        the instance is built lazily on first use and only rebuilt
+        when the query YAML, the endpoints YAML or the sample database change
+
+        Returns:
+            Endpoints: the shared instance
+        """
+        with cls._instance_lock:
+            instance = cls._instance
+            if instance is None or instance.is_outdated():
+                new_instance = cls()
+                if instance is not None:
+                    new_instance.count_ttl = instance.count_ttl
+                cls._instance = new_instance
+            return cls._instance
 
     def get_endpoints(self) -> Dict[str, Any]:
         """
@@ -58,20 +302,127 @@ class Endpoints:
         )
         return qlod
 
-    def update_state_query_for_endpoint(self, ep: Endpoint) -> Query:
+    async def run_query_async(
+        self, query: Query, timeout: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run a SPARQL query on the shared pooled http client
+
+        The values are returned as the plain strings of the SPARQL JSON results.
+        Parameterized queries are run with runQuery in a worker thread.
+
+        Args:
+            query: Query object to execute
+            timeout: request timeout in seconds - default: QUERY_TIMEOUT
+
+        Returns:
+            List of dictionaries containing query results
+        """
+        if query.params.has_params:
+            qlod = await asyncio.to_thread(self.runQuery, query)
+            return qlod
+        if timeout is None:
+            timeout = self.QUERY_TIMEOUT
+        response = await HttpClientManager.request(
+            "POST",
+            query.endpoint,
+            data={"query": query.query},
+            headers={"Accept": "application/sparql-results+json"},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        bindings = response.json()["results"]["bindings"]
+        qlod = [
+            {var_name: value["value"] for var_name, value in binding.items()}
+            for binding in bindings
+        ]
+        return qlod
+
+    def get_query(self, query_name: str, ep: Endpoint) -> Optional[Query]:
+        """
+        get the named dashboard query bound to the given endpoint
+        """
+        query = None
+        if query_name in self.qm.queriesByName:
+            # deep copy since endpoints may be probed concurrently and
+            # applying the default params changes the params of the query
+            query = copy.deepcopy(self.qm.queriesByName.get(query_name))
+            query.endpoint = ep.endpoint
+        return query
+
+    def count_ttl_for_endpoint(self, ep: Endpoint) -> float:
+        """
+        get the time to live of the cached triple count for the given endpoint
+        """
+        ttl = self.count_ttl.get(ep.name, self.DEFAULT_COUNT_TTL)
+        return ttl
+
+    def strategies_for_endpoint(self, ep: Endpoint) -> List[TripleCountStrategy]:
+        """
+        get the triple count strategies for the given endpoint - cheapest first
+        """
+        database = (ep.database or "").lower()
+        strategies = self.STRATEGIES_BY_DATABASE.get(database, self.DEFAULT_STRATEGIES)
+        return strategies
+
+    def triple_count_for_endpoint(
+        self, ep: Endpoint
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        get the triple count of the given endpoint trying the
+        strategies for its backend type until one succeeds
+
+        Returns:
+            Tuple: the triple count and the name of the strategy that delivered it
+        """
+        errors = []
+        for strategy in self.strategies_for_endpoint(ep):
+            try:
+                count = strategy.triple_count(self, ep)
+                if count is not None:
+                    return count, strategy.name
+            except Exception as ex:
+                errors.append(f"{strategy.name}: {ex}")
+        if errors:
+            raise Exception("; ".join(errors))
+        return None, None
+
+    async def triple_count_for_endpoint_async(
+        self, ep: Endpoint
+    ) -> Tuple[Optional[int], Optional[str]]:
         """
-        get the update state query for the given endpoint
+        async variant of triple_count_for_endpoint
+        """
+        errors = []
+        for strategy in self.strategies_for_endpoint(ep):
+            try:
+                count = await strategy.triple_count_async(self, ep)
+                if count is not None:
+                    return count, strategy.name
+            except Exception as ex:
+                errors.append(f"{strategy.name}: {ex}")
+        if errors:
+            raise Exception("; ".join(errors))
+        return None, None
+
+    def update_state_query_for_endpoint(self, ep: Endpoint) -> Optional[Query]:
+        """
+        get the cheap update state (timestamp) query for the given endpoint
+
+        the triple count is not part of these queries - see triple_count_for_endpoint
+
+        Returns:
+            Query: the query or None if there is no update state for this endpoint
         """
         query = None
-        query_name = "TripleCount"
         if "wikidata" in ep.name.lower():
+            query_name = None
             if ep.database == "blazegraph":
-                query_name = "WikidataUpdateState"
+                query_name = "WikidataDateModified"
             elif ep.database == "qlever":
                 query_name = "QLeverUpdateState"
-        if query_name in self.qm.queriesByName:
-            query = self.qm.queriesByName.get(query_name)
-            query.endpoint = ep.endpoint
+            if query_name:
+                query = self.get_query(query_name, ep)
         return query
 
 
@@ -86,28 +437,80 @@ class UpdateState:
     timestamp: Optional[str] = None
     success: bool = False
     error: Optional[str] = None
+    # the strategy that delivered the triple count
+    source: Optional[str] = None
 
     @classmethod
     def from_endpoint(cls, em: Endpoints, ep: Endpoint):
         update_state = cls(triples=0, timestamp=ep.data_seeded, endpoint_name=ep.name)
+        errors = []
+        try:
+            triples, source = em.triple_count_for_endpoint(ep)
+            update_state.apply_triple_count(triples, source)
+        except Exception as ex:
+            errors.append(str(ex))
         try:
             query = em.update_state_query_for_endpoint(ep)
-            qlod = em.runQuery(query)
-            success = qlod and len(qlod) > 0
-            if success:
-                update_state.success = True
-                record = qlod[0]
-                if "tripleCount" in record:
-                    update_state.triples = int(record.get("tripleCount"))
-                for var_name in ["timestamp", "updates_complete_until"]:
-                    if var_name in record:
-                        timestamp = record.get(var_name)
-                        if isinstance(timestamp, datetime):
-                            timestamp = timestamp.isoformat()
-                        update_state.timestamp = timestamp
-                        break
-            else:
-                update_state.error = "query failed"
+            if query:
+                update_state.apply_update_query_result(em.runQuery(query), errors)
         except Exception as ex:
-            update_state.error = str(ex)
+            errors.append(str(ex))
+        update_state.set_error(errors)
         return update_state
+
+    @classmethod
+    async def from_endpoint_async(cls, em: Endpoints, ep: Endpoint):
+        """
+        async variant of from_endpoint using the shared pooled http client
+        """
+        update_state = cls(triples=0, timestamp=ep.data_seeded, endpoint_name=ep.name)
+        errors = []
+        try:
+            triples, source = await em.triple_count_for_endpoint_async(ep)
+            update_state.apply_triple_count(triples, source)
+        except Exception as ex:
+            errors.append(str(ex))
+        try:
+            query = em.update_state_query_for_endpoint(ep)
+            if query:
+                qlod = await em.run_query_async(query)
+                update_state.apply_update_query_result(qlod, errors)
+        except Exception as ex:
+            errors.append(str(ex))
+        update_state.set_error(errors)
+        return update_state
+
+    def apply_triple_count(self, triples: Optional[int], source: Optional[str]):
+        """
+        apply the given triple count
+        """
+        if triples is not None:
+            self.triples = triples
+            self.source = source
+            self.success = True
+
+    def apply_update_query_result(
+        self, qlod: Optional[List[Dict[str, Any]]], errors: List[str]
+    ):
+        """
+        apply the timestamp of the given update state query result
+        """
+        if qlod and len(qlod) > 0:
+            self.success = True
+            record = qlod[0]
+            for var_name in ["timestamp", "updates_complete_until"]:
+                if var_name in record:
+                    timestamp = record.get(var_name)
+                    if isinstance(timestamp, datetime):
+                        timestamp = timestamp.isoformat()
+                    self.timestamp = timestamp
+                    break
+        else:
+            errors.append("query failed")
+
+    def set_error(self, errors: List[str]):
+        """
+        set my error from the given errors unless I succeeded
+        """
+        if not self.success:
+            self.error = "; ".join(errors) if errors else "query failed"
@@ -0,0 +1,147 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Parsed index of the Scholia examples of the Google Sheet
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class Example:
+    """
+    a Scholia example link of the sheet with its path and query
+    split from the base url so that it can be rewritten for any backend
+    """
+
+    example_id: str
+    original_link: str
+    # the path and query relative to the base url - None if the link
+    # does not start with the base url and can not be rewritten
+    path: Optional[str] = None
+    comment: str = ""
+    sheet_status: str = "-"
+    pr: str = ""
+    github1: str = ""
+    error1: str = ""
+
+    def url_for(self, backend_url: Optional[str] = None) -> str:
+        """
+        get the url of this example on the given backend
+
+        Args:
+            backend_url: base url of the backend - None for the original link
+        """
+        if backend_url and self.path is not None:
+            url = backend_url.rstrip("/") + self.path
+        else:
+            url = self.original_link
+        return url
+
+
+class ExampleIndex:
+    """
+    the examples of a sheet load - parsed once so that switching the
+    backend only needs a string concatenation per example
+    """
+
+    DEFAULT_URL_BASE = "https://qlever.scholia.wiki"
+
+    def __init__(self, examples: List[Example], content_hash: Optional[str] = None):
+        """
+        constructor
+
+        Args:
+            examples: the examples
+            content_hash: hash of the sheet content the examples were parsed from
+        """
+        self.examples = examples
+        self.content_hash = content_hash
+        self.examples_by_id: Dict[str, Example] = {
+            example.example_id: example for example in examples
+        }
+
+    @classmethod
+    def from_lod(
+        cls,
+        lod: List[dict],
+        base_url: str = DEFAULT_URL_BASE,
+        content_hash: Optional[str] = None,
+    ) -> "ExampleIndex":
+        """
+        parse the given sheet rows - rows without an http link are skipped
+
+        Args:
+            lod: the rows of the sheet
+            base_url: the base url of the links that may be rewritten
+            content_hash: hash of the sheet content
+        """
+        examples = []
+        occurrences: Dict[str, int] = {}
+        for item in lod or []:
+            link = str(item.get("link", "") or "")
+            if not link.startswith("http"):
+                continue
+            path = link[len(base_url) :] if link.startswith(base_url) else None
+            examples.append(
+                Example(
+                    example_id=cls.example_id_for(link, path, occurrences),
+                    original_link=link,
+                    path=path,
+                    comment=item.get("comment", ""),
+                    sheet_status=item.get("status", "-"),
+                    pr=item.get("PR", ""),
+                    github1=item.get("GitHub ticket 1", ""),
+                    error1=item.get("error message 1", ""),
+                )
+            )
+        index = cls(examples, content_hash=content_hash)
+        return index
+
+    @staticmethod
+    def example_id_for(
+        link: str, path: Optional[str], occurrences: Dict[str, int]
+    ) -> str:
+        """
+        get the content based id of the given link - unlike the sheet row
+        it survives rows being inserted or deleted between two sheet loads
+
+        Args:
+            link: the original link
+            path: the rewritable path of the link if any
+            occurrences: the number of earlier rows with the same link by link
+                - counted up so that duplicate links get distinct ids
+        """
+        example_id = path if path is not None else link
+        count = occurrences.get(example_id, 0) + 1
+        occurrences[example_id] = count
+        if count > 1:
+            example_id = f"{example_id}@{count}"
+        return example_id
+
+    @classmethod
+    def for_sheet(cls, sheet, index: Optional["ExampleIndex"] = None):
+        """
+        get the index of the given sheet's current content
+
+        Args:
+            sheet: the GoogleSheet
+            index: an earlier index that is reused if the content did not change
+        """
+        content_hash = getattr(sheet, "lod_hash", None)
+        if index is None or content_hash is None or index.content_hash != content_hash:
+            index = cls.from_lod(sheet.lod, content_hash=content_hash)
+        return index
+
+    def urls_for(self, backend_url: Optional[str] = None) -> Dict[str, str]:
+        """
+        get the urls of all examples on the given backend by example id
+        """
+        urls = {
+            example.example_id: example.url_for(backend_url)
+            for example in self.examples
+        }
+        return urls
@@ -6,8 +6,7 @@ winning the contest
 
 """
 
-import asyncio
-from typing import Dict
+from typing import Dict, List, Optional
 
 from ngwidgets.lod_grid import GridConfig, ListOfDictsGrid
 from ngwidgets.progress import NiceguiProgressbar
@@ -15,8 +14,13 @@ from ngwidgets.widgets import Link
 from nicegui import run, ui
 
 from nscholia.dashboard import Dashboard
+from nscholia.example_index import ExampleIndex
 from nscholia.google_sheet import GoogleSheet
-from nscholia.monitor import Monitor, StatusResult
+from nscholia.grid_updater import GridUpdater
+from nscholia.http_client import HttpClientManager
+from nscholia.monitor import StatusResult
+from nscholia.probe_matrix import ProbeMatrix, Regression
+from nscholia.scheduler import ConcurrencyLimits
 
 
 class ExampleDashboard(Dashboard):
@@ -25,16 +29,24 @@ class ExampleDashboard(Dashboard):
     Includes background loading, progress tracking, and separate reload capabilities.
     """
 
-    DEFAULT_URL_BASE = "https://qlever.scholia.wiki"
+    DEFAULT_URL_BASE = ExampleIndex.DEFAULT_URL_BASE
 
     def __init__(self, solution, sheet: GoogleSheet):
         super().__init__(solution)
         self.webserver = solution.webserver
         self.progress_bar = None
+        self.matrix_container = None
+        self.matrix_grid = None
         self.grid_container = None
         self.sheet = sheet
         self.grid = None
         self.timeout_seconds = 5.0
+        self.limits = ConcurrencyLimits(max_concurrency=10)
+        # results are shared by all sessions via the server side probe service
+        self.probe_service = self.webserver.probe_service
+        self.index: Optional[ExampleIndex] = None
+        # the rows showing the given url - links may appear more than once
+        self.rows_by_url: Dict[str, List[dict]] = {}
         self.selected_backend_name = "qlever-scholia"
 
         self.COLORS.update({"pending": "#ffffff", "checking": "#f0f0f0"})
@@ -54,14 +66,19 @@ class ExampleDashboard(Dashboard):
                 ui.select(options=backend_names, label="Backend")
                 .classes("w-48")
                 .bind_value(self, "selected_backend_name")
-                .on_value_change(lambda: self.render_grid())
+                .on_value_change(lambda: self.switch_backend())
             )
 
             with ui.row().classes("gap-2"):
                 ui.button(
-                    "Reload Sheet", icon="refresh", on_click=self.reload_sheet
+                    "Reload Sheet",
+                    icon="refresh",
+                    on_click=lambda: self.reload_sheet(force=True),
                 ).props("outline")
                 ui.button("Check Links", icon="network_check", on_click=self.check_all)
+                ui.button(
+                    "Compare Mirrors", icon="grid_on", on_click=self.check_matrix
+                ).props("outline")
 
                 ui.link(
                     "Source Sheet",
@@ -79,34 +96,58 @@ class ExampleDashboard(Dashboard):
                 timeout_slider, "value", lambda v: f"Timeout: {float(v):.1f} s"
             )
             timeout_slider.bind_value(self, "timeout_seconds")
+            ui.icon("speed")
+            concurrency_slider = ui.slider(
+                min=1, max=50, step=1, value=self.limits.max_concurrency
+            ).classes("w-64")
+            ui.label().bind_text_from(
+                concurrency_slider, "value", lambda v: f"Total concurrency: {int(v)}"
+            )
+            concurrency_slider.bind_value(self.limits, "max_concurrency")
+            # most examples point to a single host - its limit is capped by
+            # the adaptive throttle of the shared client
+            per_host_slider = ui.slider(
+                min=1,
+                max=HttpClientManager.MAX_CONNECTIONS_PER_HOST,
+                step=1,
+                value=self.limits.max_per_host,
+            ).classes("w-48")
+            ui.label().bind_text_from(
+                per_host_slider, "value", lambda v: f"Per host: {int(v)}"
+            )
+            per_host_slider.bind_value(self.limits, "max_per_host")
 
         self.progress_bar = NiceguiProgressbar(total=100, desc="Status", unit="%")
         self.progress_bar.progress.visible = False
 
+        self.matrix_container = ui.column().classes("w-full")
         self.grid_container = ui.column().classes("w-full h-full")
 
+        self.probe_service.subscribe("examples", self.on_probe)
+        self.solution.client.on_disconnect(self.on_disconnect)
         # Trigger load in background
         ui.timer(0.1, self.reload_sheet, once=True)
 
-    def get_target_url(self, original_url: str) -> str:
-        """Transforms the original URL based on the selected backend."""
-        if not original_url:
-            return ""
-
-        if not self.selected_backend_name or not self.webserver.backends:
-            return original_url
-
-        target_backend = self.webserver.backends.backends.get(
-            self.selected_backend_name
-        )
-
-        if target_backend and original_url.startswith(self.DEFAULT_URL_BASE):
-            return original_url.replace(self.DEFAULT_URL_BASE, target_backend.url)
+    def backend_url(self) -> Optional[str]:
+        """
+        get the base url of the selected backend - None for the original links
+        """
+        backend_url = None
+        if self.selected_backend_name and self.webserver.backends:
+            target_backend = self.webserver.backends.backends.get(
+                self.selected_backend_name
+            )
+            if target_backend:
+                backend_url = target_backend.url
+        return backend_url
 
-        return original_url
+    async def reload_sheet(self, force: bool = False):
+        """
+        Reload data from the Google Sheet in the background.
 
-    async def reload_sheet(self):
-        """Reload data from the Google Sheet in the background."""
+        Args:
+            force: revalidate the sheet even if the cached copy is still fresh
+        """
         self.progress_bar.progress.visible = True
         self.progress_bar.set_description("Loading Sheet Data...")
         self.progress_bar.update(0)
@@ -114,7 +155,7 @@ class ExampleDashboard(Dashboard):
         try:
             if self.sheet:
                 # NaNs are now handled inside as_lod via fillna("")
-                await run.io_bound(self.sheet.as_lod)
+                await run.io_bound(self.sheet.as_lod, force)
 
                 self.render_grid()
                 ui.notify(f"Successfully loaded {len(self.sheet.lod)} examples")
@@ -127,37 +168,58 @@ class ExampleDashboard(Dashboard):
         finally:
             self.progress_bar.progress.visible = False
 
+    def set_url(self, row: dict, url: str):
+        """
+        point the given row to the given url and show the shared result
+        of the latest probe of this url if there is one
+        """
+        row["raw_link"] = url
+        row["link_col"] = Link.create(url, "View")
+        entry = self.probe_service.get_entry("examples", url)
+        if entry is not None:
+            self.set_result(row, entry.value)
+        else:
+            row["live_status"] = "Pending"
+            row["latency"] = 0.0
+            self.set_timings(row)
+            row["color"] = self.COLORS["pending"]
+        self.rows_by_url.setdefault(url, []).append(row)
+
+    def switch_backend(self):
+        """
+        rewrite the urls of the rows in place for the selected backend
+        keeping the results of earlier checks of each backend
+        """
+        if not self.grid or self.index is None:
+            return
+        urls = self.index.urls_for(self.backend_url())
+        self.rows_by_url = {}
+        for row in self.grid.lod:
+            self.set_url(row, urls[row["example_id"]])
+        self.updater.mark_all(self.grid.lod)
+
     def render_grid(self):
         """Transform raw data and render the AG Grid."""
         self.grid_container.clear()
 
+        # only parsed again if the sheet content changed
+        self.index = ExampleIndex.for_sheet(self.sheet, self.index)
+        urls = self.index.urls_for(self.backend_url())
+        self.rows_by_url = {}
         rows = []
-        data_source = self.sheet.lod if self.sheet.lod else []
-
-        for item in data_source:
-            sheet_url = item.get("link", "")
-
-            if not sheet_url or not sheet_url.startswith("http"):
-                continue
-
-            effective_url = self.get_target_url(sheet_url)
-            link_html = Link.create(effective_url, "View")
-
-            rows.append(
-                {
-                    "raw_link": effective_url,
-                    "original_link": sheet_url,
-                    "link_col": link_html,
-                    "comment": item.get("comment", ""),
-                    "sheet_status": item.get("status", "-"),
-                    "pr": item.get("PR", ""),
-                    "github1": item.get("GitHub ticket 1", ""),
-                    "error1": item.get("error message 1", ""),
-                    "live_status": "Pending",
-                    "latency": 0.0,
-                    "color": self.COLORS["pending"],
-                }
-            )
+        for example in self.index.examples:
+            row = {
+                "example_id": example.example_id,
+                "original_link": example.original_link,
+                "comment": example.comment,
+                "sheet_status": example.sheet_status,
+                "pr": example.pr,
+                "github1": example.github1,
+                "error1": example.error1,
+            }
+            # shows the shared results of earlier probes
+            self.set_url(row, urls[example.example_id])
+            rows.append(row)
 
         column_defs = [
             {"headerName": "Link", "field": "link_col", "width": 70},
@@ -189,17 +251,20 @@ class ExampleDashboard(Dashboard):
                 "type": "numericColumn",
                 ":valueFormatter": "params.value ? params.value.toFixed(3) : ''",
             },
+            *self.timing_column_defs(),
         ]
 
         grid_options = {
             "rowSelection": "single",
             "animateRows": True,
             ":getRowStyle": """function(params) { return { background: params.data.color }; }""",
+            **GridUpdater.row_id_option("example_id"),
         }
 
         config = GridConfig(
             column_defs=column_defs,
-            key_col="raw_link",
+            # stable when the backend and thus the url changes
+            key_col="example_id",
             options=grid_options,
             html_columns=[0],
             auto_size_columns=True,
@@ -208,6 +273,8 @@ class ExampleDashboard(Dashboard):
 
         with self.grid_container:
             self.grid = ListOfDictsGrid(lod=rows, config=config)
+            self.updater = GridUpdater(self.grid, fps=self.UPDATE_FPS)
+        self.grid.update()
 
     async def check_all(self):
         """Check all links in the grid asynchronously."""
@@ -216,7 +283,9 @@ class ExampleDashboard(Dashboard):
             return
 
         rows = self.grid.lod
-        total = len(rows)
+        # duplicate links are checked once
+        targets = {row["raw_link"]: row["raw_link"] for row in rows}
+        total = len(targets)
 
         self.progress_bar.total = total
         self.progress_bar.value = 0
@@ -226,45 +295,136 @@ class ExampleDashboard(Dashboard):
         for row in rows:
             row["live_status"] = "Queued..."
             row["color"] = self.COLORS["checking"]
-        self.grid.update()
+        self.updater.mark_all(rows)
 
-        batch_size = 10
-        for i in range(0, total, batch_size):
-            batch_rows = rows[i : i + batch_size]
-            tasks = [self.check_single_row(row) for row in batch_rows]
-            await asyncio.gather(*tasks)
-            self.progress_bar.update(len(batch_rows))
-            self.grid.update()
+        await self.probe_service.refresh(
+            "examples",
+            targets=targets,
+            timeout=self.timeout_seconds,
+            limits=self.limits,
+        )
+        self.updater.flush()
 
         self.progress_bar.progress.visible = False
         ui.notify("Link checking complete")
 
+    async def check_matrix(self):
+        """
+        check every example on every backend and show the example × backend matrix
+        """
+        if self.index is None or not self.webserver.backends:
+            ui.notify("No examples or backends loaded to compare")
+            return
+        backend_urls = {
+            name: backend.url
+            for name, backend in self.webserver.backends.backends.items()
+        }
+        matrix = ProbeMatrix(self.index, backend_urls)
+        self.progress_bar.progress.visible = True
+        self.progress_bar.set_description(
+            f"Checking {len(matrix.example_ids)} examples on {len(backend_urls)} mirrors..."
+        )
+        try:
+            await matrix.sweep(
+                self.probe_service,
+                timeout=self.timeout_seconds,
+                max_per_host=self.limits.max_per_host,
+            )
+        finally:
+            self.progress_bar.progress.visible = False
+        regressions = matrix.regressions(self.probe_service.last_matrix)
+        self.probe_service.last_matrix = matrix
+        self.render_matrix(matrix, regressions)
+        ui.notify(f"Mirror comparison complete - {len(regressions)} regressions")
+
+    def render_matrix(self, matrix: ProbeMatrix, regressions: List[Regression]):
+        """
+        show the given example × backend matrix
+        """
+        self.matrix_container.clear()
+        regressed = {(r.example_id, r.backend) for r in regressions}
+        rows = []
+        for example in matrix.index.examples:
+            row = {
+                "example_id": example.example_id,
+                "path": example.path or example.original_link,
+                "aspect": matrix.aspect_of(example.path),
+            }
+            for backend in matrix.backend_names:
+                status_code, latency = matrix.get(example.example_id, backend)
+                if matrix.is_ok(status_code):
+                    text = f"✅ {latency:.3f}"
+                else:
+                    text = f"❌ {status_code or '-'}"
+                if (example.example_id, backend) in regressed:
+                    text = f"⚠️ {text}"
+                row[backend] = text
+            rows.append(row)
+        column_defs = [
+            {"headerName": "Aspect", "field": "aspect", "width": 100},
+            {"headerName": "Path", "field": "path", "width": 300},
+            *[
+                {"headerName": backend, "field": backend, "width": 140}
+                for backend in matrix.backend_names
+            ],
+        ]
+        config = GridConfig(
+            column_defs=column_defs,
+            key_col="example_id",
+            options={"rowSelection": "single"},
+            auto_size_columns=True,
+            theme="balham",
+        )
+        with self.matrix_container:
+            ui.label("Mirror comparison (latency in s)").classes("text-lg font-bold")
+            fastest = matrix.fastest_by_aspect()
+            with ui.row().classes("gap-2"):
+                for aspect, (backend, median) in fastest.items():
+                    ui.chip(f"{aspect}: {backend} {median:.3f} s", icon="bolt")
+            for regression in regressions:
+                ui.label(
+                    f"⚠️ {regression.backend}: {regression.url} "
+                    f"{regression.previous_status} → {regression.status or 'no response'}"
+                ).classes("text-sm text-red-600")
+            self.matrix_grid = ListOfDictsGrid(lod=rows, config=config)
+
+    def on_probe(self, url: str, result: StatusResult):
+        """
+        probe service callback - fill in the row of the given link
+        """
+        rows = self.rows_by_url.get(url, []) if self.grid else []
+        for row in rows:
+            self.set_result(row, result)
+            # the row is sent with the next frame of the updater
+            self.updater.mark(row)
+        if rows and self.progress_bar.progress.visible:
+            self.progress_bar.update(1)
+
+    def on_disconnect(self):
+        """
+        stop listening to the probe service when the browser session ends
+        """
+        self.probe_service.unsubscribe("examples", self.on_probe)
+
     def set_result(
         self, row: Dict[str, str], result: StatusResult, ex: Exception = None
     ):
         if ex is not None:
             row["live_status"] = "Exception"
             row["latency"] = 0
+            self.set_timings(row)
             row["color"] = self.COLORS["error"]
         elif result.is_online:
             row["latency"] = result.latency
+            self.set_timings(row, result)
             row["live_status"] = f"OK ({result.status_code})"
             row["color"] = self.COLORS["success"]
         else:
             row["latency"] = 0
+            # keep the timings of failed requests e.g. to spot slow DNS
+            self.set_timings(row, result)
             error_info = result.error or f"Http {result.status_code}"
             row["live_status"] = error_info
             row["color"] = self.COLORS["error"]
-
-    async def check_single_row(self, row: dict):
-        """Check a single row"""
-        url = row.get("raw_link")
-        if not url:
-            return
-
-        row["live_status"] = "Checking..."
-        try:
-            result = await Monitor.check(url, timeout=self.timeout_seconds)
-            self.set_result(row, result)
-        except Exception as ex:
-            self.set_result(row, None, ex)
+        if result is not None and result.attempts > 1:
+            row["live_status"] += f" after {result.attempts} attempts"
@@ -6,43 +6,302 @@ WF 2025-12-18 using Gemini Pro, Grok4, ChatGPT5 and Claude 4.5
 see our more elaborate pyGenericSpreadSheet
 """
 
-import pandas as pd
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
 
 
 class GoogleSheet:
     """
     A simple adapter for reading data from a Google Sheet.
+
+    The CSV export is cached on disk and revalidated with
+    ETag/Last-Modified once its time to live has expired so that
+    a cold start or an offline server can use the last copy.
+
+    By default the CSV is parsed with the standard library's csv module,
+    the "pandas" reader needs the optional pandas extra.
     """
 
-    def __init__(self, sheet_id: str, gid: int = 0):
+    DEFAULT_TTL = 300.0
+    # the sheet with the Scholia example queries
+    SCHOLIA_EXAMPLES_SHEET_ID = "1cbEY7P9U-1xtvEgeAiizjJiOkpuihRFdc03JL239Ixg"
+    READERS = ["csv", "pandas"]
+
+    def __init__(
+        self,
+        sheet_id: str,
+        gid: int = 0,
+        ttl: float = DEFAULT_TTL,
+        cache_dir: Optional[str] = None,
+        reader: str = "csv",
+    ):
         """
         Initialize the GoogleSheet with the given sheet ID and optional GID.
 
         Args:
             sheet_id (str): The ID of the Google Sheet.
             gid (int): The sheet tab ID (default is 0).
+            ttl (float): seconds a loaded copy is used without revalidation.
+            cache_dir (str): directory for the on-disk copy
+                (default: ~/.solutions/nicescholia/sheets).
+            reader (str): "csv" (default) or "pandas"
         """
+        if reader not in self.READERS:
+            raise ValueError(f"invalid reader {reader} - must be one of {self.READERS}")
+        self.reader = reader
         self.base_url = "https://docs.google.com/spreadsheets"
         self.sheet_id = sheet_id
         self.gid = gid
+        self.ttl = ttl
         self.lod = None
         self.sheet_url = f"{self.base_url}/d/{self.sheet_id}"
         self.export_url = f"{self.sheet_url}/export?format=csv&gid={self.gid}"
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                str(Path.home()), ".solutions", "nicescholia", "sheets"
+            )
+        self.cache_dir = cache_dir
+        self.csv_path = os.path.join(cache_dir, f"{sheet_id}_{gid}.csv")
+        self.meta_path = os.path.join(cache_dir, f"{sheet_id}_{gid}.json")
+        self.meta = self.load_meta()
+        # sha256 of the content self.lod has been parsed from
+        self.lod_hash = None
+        # the sheet is shared by all sessions and loaded in worker threads
+        self.lock = threading.Lock()
 
-    def as_lod(self) -> list[dict]:
+    def load_meta(self) -> dict:
         """
-        Fetch the sheet data as a list of dictionaries (LOD).
+        load the cache metadata (etag, last_modified, sha256, fetched)
+        """
+        meta = {}
+        if os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path, encoding="utf-8") as meta_file:
+                    meta = json.load(meta_file)
+            except Exception as _ex:
+                # a broken metadata file just means a full reload
+                meta = {}
+        return meta
 
-        replaces NaNs with empty strings to avoid "NaN horror" in downstream usage.
+    def write_atomic(self, path: str, content: bytes):
+        """
+        write the given content to the given path via a temporary file
+        so that a crash never leaves a truncated copy to be served offline
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.cache_dir, prefix=os.path.basename(path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def store(self, content: bytes):
+        """
+        store the given CSV content and my metadata on disk
+        """
+        self.write_atomic(self.csv_path, content)
+        self.store_meta()
+
+    def store_meta(self):
+        """
+        store my metadata on disk
+        """
+        content = json.dumps(self.meta, indent=2).encode("utf-8")
+        self.write_atomic(self.meta_path, content)
+
+    @property
+    def age(self) -> float:
+        """
+        seconds since the content was last fetched or revalidated
+        """
+        fetched = self.meta.get("fetched")
+        age = time.time() - fetched if fetched else float("inf")
+        return age
+
+    @property
+    def is_fresh(self) -> bool:
+        """
+        is the cached content within its time to live?
+        """
+        fresh = self.age < self.ttl and os.path.exists(self.csv_path)
+        return fresh
+
+    @staticmethod
+    def header_names(header: list[str]) -> list[str]:
+        """
+        make the given header row unique the way pandas does:
+        empty names become "Unnamed: <index>", duplicates get a ".<n>" suffix
+        """
+        names = []
+        seen = {}
+        for index, name in enumerate(header):
+            if not name:
+                name = f"Unnamed: {index}"
+            unique_name = name
+            count = seen.get(name, 0)
+            while unique_name in seen:
+                count += 1
+                unique_name = f"{name}.{count}"
+            seen[name] = count
+            seen[unique_name] = 0
+            names.append(unique_name)
+        return names
+
+    @classmethod
+    def read_csv(cls, content: bytes) -> list[dict]:
+        """
+        read the given CSV content with the standard library csv module
+
+        empty and missing cells become empty strings
+
+        Args:
+            content: the CSV bytes
 
         Returns:
-            list[dict]: The rows from the sheet as a list of dictionaries.
+            list[dict]: one dict per row
         """
-        df = pd.read_csv(self.export_url)
+        text = io.TextIOWrapper(io.BytesIO(content), encoding="utf-8-sig", newline="")
+        reader = csv.reader(text)
+        lod = []
+        header = next(reader, None)
+        if header is not None:
+            names = cls.header_names(header)
+            for values in reader:
+                if not values:
+                    # pandas skips blank lines
+                    continue
+                values = values + [""] * (len(names) - len(values))
+                lod.append(dict(zip(names, values)))
+        return lod
+
+    @staticmethod
+    def read_csv_pandas(content: bytes) -> list[dict]:
+        """
+        read the given CSV content with pandas - needs the optional pandas extra
+
+        replaces NaNs with empty strings to avoid "NaN horror" in downstream usage.
+        """
+        import pandas as pd
+
+        df = pd.read_csv(io.BytesIO(content))
 
         # Fix NaN horror: replace all NaN/None values with empty strings
         # This prevents float('nan') from crashing UI logic or showing up as text-NaN
         df = df.fillna("")
 
-        self.lod = df.to_dict("records")
+        lod = df.to_dict("records")
+        return lod
+
+    def as_dataframe(self):
+        """
+        get the sheet data as a pandas DataFrame - needs the optional pandas extra
+        """
+        import pandas as pd
+
+        lod = self.as_lod()
+        df = pd.DataFrame(lod)
+        return df
+
+    def parse(self, content: bytes) -> list[dict]:
+        """
+        parse the given CSV content to a list of dicts
+        unless it is the content self.lod is already based on
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+        if self.lod is None or content_hash != self.lod_hash:
+            if self.reader == "pandas":
+                self.lod = self.read_csv_pandas(content)
+            else:
+                self.lod = self.read_csv(content)
+            self.lod_hash = content_hash
         return self.lod
+
+    def load_cached(self) -> list[dict]:
+        """
+        load the on-disk copy
+        """
+        with open(self.csv_path, "rb") as csv_file:
+            content = csv_file.read()
+        lod = self.parse(content)
+        return lod
+
+    def fetch(self, timeout: float = 30.0) -> list[dict]:
+        """
+        revalidate / download the CSV export
+
+        Args:
+            timeout: request timeout in seconds
+        """
+        headers = {}
+        has_copy = os.path.exists(self.csv_path)
+        if has_copy and self.meta.get("etag"):
+            headers["If-None-Match"] = self.meta["etag"]
+        if has_copy and self.meta.get("last_modified"):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+        response = requests.get(self.export_url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            self.meta["fetched"] = time.time()
+            self.store_meta()
+            lod = self.load_cached()
+        else:
+            response.raise_for_status()
+            content = response.content
+            self.meta = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "fetched": time.time(),
+            }
+            self.store(content)
+            lod = self.parse(content)
+        return lod
+
+    def as_lod(self, force: bool = False) -> list[dict]:
+        """
+        Fetch the sheet data as a list of dictionaries (LOD).
+
+        Within the time to live the loaded or on-disk copy is used,
+        otherwise the export is revalidated - if Google is unreachable
+        the on-disk copy is used.
+
+        Args:
+            force: revalidate even if the copy is still fresh
+
+        Returns:
+            list[dict]: The rows from the sheet as a list of dictionaries.
+        """
+        # concurrent loads e.g. from several browser tabs are serialized
+        with self.lock:
+            if not force and self.is_fresh:
+                if self.lod is None:
+                    self.load_cached()
+            else:
+                try:
+                    self.fetch()
+                except Exception as ex:
+                    if not os.path.exists(self.csv_path):
+                        raise ex
+                    # offline: fall back to the last copy
+                    logger.warning(f"Sheet fetch failed - using cached copy: {ex}")
+                    self.load_cached()
+            lod = self.lod
+        return lod
@@ -0,0 +1,84 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Delta updates of a ListOfDictsGrid
+"""
+
+import json
+from typing import Any, Dict, Iterable
+
+from ngwidgets.lod_grid import ListOfDictsGrid
+from nicegui import ui
+
+from nscholia.metrics import Metrics
+
+
+class GridUpdater:
+    """
+    pushes only the changed rows of a ListOfDictsGrid to the browser
+
+    grid.update() re-sends the whole list of dicts over the websocket,
+    instead changed rows are collected and sent as one AG Grid
+    applyTransaction per frame - the rows are identified by the key_col
+    of the grid config which therefore needs to be unique and the grid
+    options need the getRowId of row_id_option.
+    """
+
+    def __init__(self, grid: ListOfDictsGrid, fps: float = 4.0):
+        """
+        constructor
+
+        Args:
+            grid: the grid to update
+            fps: maximum number of updates per second - 0 disables the
+                timer so that flush has to be called explicitly
+        """
+        self.grid = grid
+        self.key_col = grid.config.key_col
+        self.pending: Dict[Any, dict] = {}
+        self.timer = None
+        metrics = Metrics.get_instance()
+        self.bytes_counter = metrics.counter(
+            "nicescholia_grid_update_bytes_total",
+            "approximate JSON size of the grid rows sent to the browsers",
+        )
+        self.rows_counter = metrics.counter(
+            "nicescholia_grid_update_rows_total",
+            "number of grid rows sent to the browsers",
+        )
+        if fps > 0:
+            self.timer = ui.timer(1.0 / fps, self.flush)
+
+    @staticmethod
+    def row_id_option(key_col: str) -> Dict[str, str]:
+        """
+        get the grid option identifying rows by the given key column
+        """
+        option = {":getRowId": f"(params) => String(params.data['{key_col}'])"}
+        return option
+
+    def mark(self, row: dict):
+        """
+        mark the given row as changed
+        """
+        self.pending[row[self.key_col]] = row
+
+    def mark_all(self, rows: Iterable[dict]):
+        """
+        mark all given rows as changed
+        """
+        for row in rows:
+            self.mark(row)
+
+    def flush(self):
+        """
+        send the changed rows since the last flush
+        """
+        if self.pending and self.grid and self.grid.ag_grid:
+            rows = list(self.pending.values())
+            self.pending = {}
+            self.grid.ag_grid.run_grid_method("applyTransaction", {"update": rows})
+            self.rows_counter.inc(len(rows))
+            self.bytes_counter.inc(len(json.dumps(rows, default=str)))
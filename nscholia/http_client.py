@@ -0,0 +1,147 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Shared, pooled HTTP client for all probes
+"""
+
+import asyncio
+import importlib.util
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from nscholia.rate_limiter import HostThrottle
+
+
+class HttpClientManager:
+    """
+    Process-wide manager for a long-lived httpx.AsyncClient
+
+    Reusing one client keeps connections alive between probes so
+    that checking hundreds of links on the same host does not pay for
+    a new connection pool, DNS lookup and TLS handshake each time.
+    """
+
+    # connection pool limits - httpx only limits the pool as a whole
+    # so the per host limit is enforced with a HostThrottle per host
+    MAX_CONNECTIONS = 100
+    MAX_KEEPALIVE_CONNECTIONS = 50
+    MAX_CONNECTIONS_PER_HOST = 10
+    KEEPALIVE_EXPIRY = 30.0
+    # default requests per second per host and overrides by host name
+    HOST_RATE = 20.0
+    HOST_RATES: Dict[str, float] = {}
+
+    _client: Optional[httpx.AsyncClient] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _host_throttles: Dict[str, HostThrottle] = {}
+
+    @classmethod
+    def http2_available(cls) -> bool:
+        """
+        check whether the optional h2 package for HTTP/2 is installed
+        """
+        available = importlib.util.find_spec("h2") is not None
+        return available
+
+    @classmethod
+    def create_client(cls) -> httpx.AsyncClient:
+        """
+        create a new pooled AsyncClient
+        """
+        limits = httpx.Limits(
+            max_connections=cls.MAX_CONNECTIONS,
+            max_keepalive_connections=cls.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=cls.KEEPALIVE_EXPIRY,
+        )
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=limits,
+            http2=cls.http2_available(),
+        )
+        return client
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """
+        get the shared client for the running event loop
+
+        An AsyncClient is bound to the event loop it was first used on,
+        so a new client is created if the loop changed (e.g. in tests
+        using asyncio.run per call).
+        """
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._client.is_closed or cls._loop is not loop:
+            cls._client = cls.create_client()
+            cls._loop = loop
+            cls._host_throttles = {}
+        return cls._client
+
+    @classmethod
+    def host_throttle(cls, url: str) -> HostThrottle:
+        """
+        get the throttle limiting rate and concurrency of the requests
+        to the host of the given url
+
+        Args:
+            url: the url to get the host throttle for
+
+        Returns:
+            HostThrottle: the per host throttle
+        """
+        # make sure the throttles belong to the running loop
+        cls.get_client()
+        host = urlparse(url).netloc
+        throttle = cls._host_throttles.get(host)
+        if throttle is None:
+            rate = cls.HOST_RATES.get(host, cls.HOST_RATE)
+            throttle = HostThrottle(
+                host,
+                rate=rate,
+                burst=max(1, int(rate)),
+                max_limit=cls.MAX_CONNECTIONS_PER_HOST,
+            )
+            cls._host_throttles[host] = throttle
+        return throttle
+
+    @classmethod
+    def host_throttles(cls) -> Dict[str, HostThrottle]:
+        """
+        get the throttles of the hosts requested so far by host
+        """
+        throttles = dict(cls._host_throttles)
+        return throttles
+
+    @classmethod
+    async def request(cls, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        send a request with the shared client within the throttle of its host
+
+        Args:
+            method: the http method
+            url: the url
+            **kwargs: further arguments of httpx.AsyncClient.request
+
+        Returns:
+            httpx.Response: the response
+        """
+        client = cls.get_client()
+        async with cls.host_throttle(url).slot() as slot:
+            response = await client.request(method, url, **kwargs)
+            slot.report_response(response)
+        return response
+
+    @classmethod
+    async def close(cls):
+        """
+        close the shared client - to be called on server shutdown
+        """
+        client = cls._client
+        cls._client = None
+        cls._loop = None
+        cls._host_throttles = {}
+        if client is not None and not client.is_closed:
+            await client.aclose()
@@ -0,0 +1,330 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Instrumentation of the hot paths with a Prometheus text exposition
+- self contained so that no prometheus_client dependency is needed
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# latency buckets in seconds from 5 ms to 60 s
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Metric:
+    """
+    a named metric with values by label values
+    """
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        """
+        constructor
+
+        Args:
+            name: the metric name e.g. nicescholia_probes_total
+            help: the help text
+            labels: the names of the labels
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.lock = threading.Lock()
+
+    def key(self, label_values: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        get the key of the given label values
+        """
+        key = tuple(str(label_values.get(label, "")) for label in self.labels)
+        return key
+
+    def set(self, value: float, **label_values):
+        """
+        set the value for the given labels
+        """
+        with self.lock:
+            self.values[self.key(label_values)] = value
+
+    def clear(self):
+        """
+        remove all values e.g. before a collector sets the current ones
+        """
+        with self.lock:
+            self.values.clear()
+
+    @staticmethod
+    def escape(value: str) -> str:
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        return escaped
+
+    def label_text(self, key: Tuple[str, ...], extra: str = "") -> str:
+        """
+        get the {label="value",...} text of the given key
+        """
+        pairs = [
+            f'{label}="{self.escape(value)}"' for label, value in zip(self.labels, key)
+        ]
+        if extra:
+            pairs.append(extra)
+        text = "{" + ",".join(pairs) + "}" if pairs else ""
+        return text
+
+    def sample_lines(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        lines = [f"{self.name}{self.label_text(key)} {value:g}" for key, value in items]
+        return lines
+
+    def expose(self) -> List[str]:
+        """
+        get the lines of the text exposition format
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.sample_lines())
+        return lines
+
+
+class Counter(Metric):
+    """
+    a monotonically increasing count
+    """
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **label_values):
+        """
+        increase the count for the given labels
+        """
+        key = self.key(label_values)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    a value that goes up and down
+    """
+
+    TYPE = "gauge"
+
+
+class Histogram(Metric):
+    """
+    counts of observations in cumulative buckets with their sum
+    """
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per key: counts per bucket (+Inf last), sum
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **label_values):
+        """
+        record the given observation
+        """
+        key = self.key(label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.counts.get(key)
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+                self.counts[key] = counts
+                self.sums[key] = 0.0
+            counts[index] += 1
+            self.sums[key] += value
+
+    def clear(self):
+        with self.lock:
+            self.counts.clear()
+            self.sums.clear()
+
+    def sample_lines(self) -> List[str]:
+        with self.lock:
+            items = sorted((key, list(counts)) for key, counts in self.counts.items())
+            sums = dict(self.sums)
+        lines = []
+        for key, counts in items:
+            cumulative = 0
+            bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket{self.label_text(key, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{self.label_text(key)} {sums[key]:g}")
+            lines.append(f"{self.name}_count{self.label_text(key)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """
+    process wide registry of the metrics
+
+    Collectors are called before each exposition to set the gauges of
+    state that is cheaper to read on demand than to track on every change
+    e.g. the in-flight requests per host or the executor queue depth.
+    """
+
+    _instance: Optional["Metrics"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[["Metrics"], None]] = []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "Metrics":
+        """
+        get the process wide registry
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def register(self, metric_class, name: str, help: str, **kwargs) -> Metric:
+        """
+        get the metric with the given name - created on first use
+        """
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, help, **kwargs)
+                self.metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        counter = self.register(Counter, name, help, labels=labels)
+        return counter
+
+    def gauge(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        gauge = self.register(Gauge, name, help, labels=labels)
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = self.register(Histogram, name, help, labels=labels, buckets=buckets)
+        return histogram
+
+    def add_collector(self, collector: Callable[["Metrics"], None]):
+        """
+        add a collector called with this registry before each exposition
+        """
+        self.collectors.append(collector)
+
+    def expose(self) -> str:
+        """
+        get all metrics in the Prometheus text exposition format
+        """
+        for collector in list(self.collectors):
+            try:
+                collector(self)
+            except Exception as ex:
+                # a broken collector must not break the scrape
+                logger.exception(f"metrics collector failed: {ex}")
+        with self.lock:
+            metrics = [self.metrics[name] for name in sorted(self.metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        text = "\n".join(lines) + "\n"
+        return text
+
+
+class LoopLagMonitor:
+    """
+    measures the event loop lag as the lateness of a periodic timer
+
+    a lag well above the interval means that callbacks, e.g. websocket
+    messages of the dashboards, wait for blocking work on the loop
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None, interval: float = 0.1):
+        """
+        constructor
+
+        Args:
+            metrics: the registry to report to - default: the process wide one
+            interval: seconds between two measurements
+        """
+        if metrics is None:
+            metrics = Metrics.get_instance()
+        self.interval = interval
+        self.histogram = metrics.histogram(
+            "nicescholia_event_loop_lag_seconds",
+            "lateness of a periodic timer on the event loop",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+        )
+        self.max_gauge = metrics.gauge(
+            "nicescholia_event_loop_lag_max_seconds",
+            "maximum event loop lag since the monitor started",
+        )
+        self.max_lag = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        while True:
+            start_time = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start_time - self.interval)
+            self.histogram.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+                self.max_gauge.set(lag)
+
+    def start(self):
+        """
+        start measuring on the running loop
+        """
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """
+        stop measuring
+        """
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
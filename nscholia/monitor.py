@@ -3,20 +3,48 @@ Availability monitoring logic
 WF 2025-12-18 using Gemini Pro, Grok4, ChatGPT5 and Claude 4.5
 """
 
+import asyncio
+import random
 import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import httpx
 
+from nscholia.http_client import HttpClientManager
+from nscholia.rate_limiter import HostThrottle
+
 
 @dataclass
 class StatusResult:
     endpoint_name: str
     url: str
     status_code: int = 0
+    # total time in seconds
     latency: float = 0.0
     error: str = ""
+    # compact metadata - the body is not kept unless requested
+    method: str = ""
+    final_url: str = ""
+    redirects: int = 0
+    content_length: Optional[int] = None
+    # latency breakdown in seconds - connect and tls are 0
+    # if a pooled keep-alive connection has been reused
+    # connect includes the DNS resolution of httpcore
+    connect: float = 0.0
+    tls: float = 0.0
+    # time to first byte (response headers received)
+    ttfb: float = 0.0
+    transfer: float = 0.0
+    # seconds the server asked us to wait (429/503 Retry-After)
+    retry_after: Optional[float] = None
+    # kind of failure: "timeout", "connect", "5xx", "error" or "" if none
+    error_kind: str = ""
+    # number of requests sent including retries and hedged requests
+    attempts: int = 1
+    # True if the result is the answer of a hedged request
+    hedged: bool = False
+    # only set when the body has been captured explicitly
     response: Optional[httpx.Response] = None
 
     @property
@@ -26,6 +54,127 @@ class StatusResult:
         return online
 
 
+@dataclass
+class RetryPolicy:
+    """
+    retries of transient failures with exponential backoff and full jitter
+    and optional hedging of slow requests
+    """
+
+    # total number of attempts - 1 disables retries
+    max_attempts: int = 3
+    # backoff before the n-th retry is random in [0, base_delay * 2**n]
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    retry_timeout: bool = True
+    retry_connect: bool = True
+    # retry 5xx answers and 429 Too Many Requests
+    retry_5xx: bool = True
+    # send a second request if the first one is slower than the
+    # p95 latency of its host and keep the first good answer
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+
+    def is_retryable(self, status_result: StatusResult) -> bool:
+        """
+        check whether the given result is a failure worth retrying
+        """
+        kind = status_result.error_kind
+        if kind == "timeout":
+            retryable = self.retry_timeout
+        elif kind == "connect":
+            retryable = self.retry_connect
+        elif kind == "5xx" or status_result.status_code == 429:
+            # 501 Not Implemented is permanent
+            retryable = self.retry_5xx and status_result.status_code != 501
+        else:
+            retryable = False
+        return retryable
+
+    def backoff(
+        self, retry: int, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        get the delay before the given retry (0 based)
+
+        Args:
+            retry: the number of the retry
+            retry_after: seconds the server asked us to wait
+
+        Returns:
+            the delay in seconds or None if the server asked us to wait
+            longer than max_delay
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+
+class ProbeAttempt:
+    """
+    the progress of a single request of a check - a hedged request that is
+    cancelled before it went out must not count as sent
+    """
+
+    def __init__(self):
+        # set when the request got its slot of the host
+        self.slot_acquired = asyncio.Event()
+        # True once the request headers are being sent or the request finished
+        self.sent = False
+
+
+class RequestTrace:
+    """
+    httpcore trace extension callback collecting per phase timings
+
+    httpcore resolves the host name as part of connect_tcp so the DNS
+    time is included in the connect time - a separate lookup would add a
+    round trip to the request being measured
+    """
+
+    # httpcore trace names of the phases we are interested in
+    PHASES = {
+        "connect_tcp": "connect",
+        "start_tls": "tls",
+        "receive_response_body": "transfer",
+    }
+
+    def __init__(self, attempt: Optional[ProbeAttempt] = None):
+        self.attempt = attempt
+        self.started: Dict[str, float] = {}
+        self.durations: Dict[str, float] = {}
+
+    def add(self, phase: str, duration: float):
+        """
+        add the given duration to the given phase
+        """
+        self.durations[phase] = self.durations.get(phase, 0.0) + duration
+
+    async def __call__(self, event_name: str, info: dict):
+        # event names look like "connection.connect_tcp.started"
+        _prefix, name, event = event_name.split(".", 2)
+        if name == "send_request_headers" and self.attempt is not None:
+            self.attempt.sent = True
+        phase = self.PHASES.get(name)
+        if phase is None:
+            return
+        now = time.perf_counter()
+        if event == "started":
+            self.started[phase] = now
+        elif event in ("complete", "failed") and phase in self.started:
+            self.add(phase, now - self.started.pop(phase))
+
+    def get(self, phase: str) -> float:
+        """
+        get the rounded duration of the given phase
+        """
+        duration = round(self.durations.get(phase, 0.0), 3)
+        return duration
+
+
 class Monitor:
     """
     Checks endpoint availability
@@ -36,9 +185,18 @@ class Monitor:
         "nscholia-monitor/1.0 (https://github.com/WolfgangFahl/nscholia)"
     )
 
+    # probe modes: HEAD request or GET request that stops after the headers
+    MODES = ["head", "stream"]
+
     @staticmethod
     async def check(
-        url: str, timeout: float = 5.0, user_agent: str = None
+        url: str,
+        timeout: float = 5.0,
+        user_agent: str = None,
+        client: Optional[httpx.AsyncClient] = None,
+        mode: str = "head",
+        capture_body: bool = False,
+        retry: Optional[RetryPolicy] = None,
     ) -> StatusResult:
         """
         Check if an endpoint is available.
@@ -47,26 +205,225 @@ class Monitor:
             url: URL to check
             timeout: Request timeout in seconds
             user_agent: Custom user agent string
+            client: the client to use - default: the shared pooled client
+            mode: "head" (default) sends a HEAD request and falls back to "stream"
+                if the server does not allow HEAD, "stream" sends a GET request
+                and stops after the response headers
+            capture_body: read the full body with GET and keep the response
+                e.g. for content validation
+            retry: the retry policy - default: a single attempt
         """
         if user_agent is None:
             user_agent = Monitor.DEFAULT_USER_AGENT
+        if mode not in Monitor.MODES:
+            raise ValueError(f"invalid mode {mode} - must be one of {Monitor.MODES}")
+        if retry is None:
+            retry = RetryPolicy(max_attempts=1)
+
+        attempts = 0
+        for attempt in range(max(1, retry.max_attempts)):
+            status_result, sent = await Monitor.check_hedged(
+                url, timeout, user_agent, client, mode, capture_body, retry
+            )
+            attempts += sent
+            if attempt + 1 >= retry.max_attempts or not retry.is_retryable(
+                status_result
+            ):
+                break
+            delay = retry.backoff(attempt, status_result.retry_after)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        status_result.attempts = attempts
+        return status_result
+
+    @staticmethod
+    async def check_hedged(
+        url: str,
+        timeout: float,
+        user_agent: str,
+        client: Optional[httpx.AsyncClient],
+        mode: str,
+        capture_body: bool,
+        retry: RetryPolicy,
+    ) -> Tuple[StatusResult, int]:
+        """
+        check the given url once - hedged by a second request if the
+        first one takes longer than the latency percentile of the host
+
+        the hedge timer starts when the first request got its slot of
+        the host - time spent in the queue of the host does not count
+
+        Returns:
+            the result and the number of requests actually sent
+        """
+        hedge_after = None
+        throttle = HttpClientManager.host_throttle(url)
+        if retry.hedge:
+            hedge_after = throttle.latency_percentile(retry.hedge_percentile)
+        if hedge_after is None or hedge_after >= timeout:
+            attempt = ProbeAttempt()
+            status_result = await Monitor.check_once(
+                url, timeout, user_agent, client, mode, capture_body, attempt
+            )
+            return status_result, int(attempt.sent)
 
+        def start(attempt: ProbeAttempt):
+            task = asyncio.create_task(
+                Monitor.check_once(
+                    url, timeout, user_agent, client, mode, capture_body, attempt
+                )
+            )
+            return task
+
+        first_attempt = ProbeAttempt()
+        first = start(first_attempt)
+        # time spent waiting for a slot of the host is not slowness of the host
+        slot_waiter = asyncio.create_task(first_attempt.slot_acquired.wait())
+        try:
+            await asyncio.wait(
+                {first, slot_waiter}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            slot_waiter.cancel()
+        if not first.done():
+            await asyncio.wait({first}, timeout=hedge_after)
+        # no hedge if it would only queue behind the busy or paused host
+        if first.done() or throttle.is_saturated():
+            status_result = await first
+            return status_result, int(first_attempt.sent)
+        second_attempt = ProbeAttempt()
+        second = start(second_attempt)
+        pending = {first, second}
+        status_result = None
+        try:
+            while pending and (status_result is None or not status_result.is_online):
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # keep the first good answer - a failure only if both failed
+                for task in done:
+                    result = task.result()
+                    if status_result is None or result.is_online:
+                        status_result = result
+                        status_result.hedged = task is second
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        sent_count = int(first_attempt.sent) + int(second_attempt.sent)
+        return status_result, sent_count
+
+    @staticmethod
+    async def check_once(
+        url: str,
+        timeout: float,
+        user_agent: str,
+        client: Optional[httpx.AsyncClient],
+        mode: str,
+        capture_body: bool,
+        attempt: Optional[ProbeAttempt] = None,
+    ) -> StatusResult:
+        """
+        check the given url with a single request - with a streamed GET
+        fallback if the server does not support HEAD
+
+        Args:
+            attempt: the progress of the request to report to
+        """
         headers = {"User-Agent": user_agent}
-        start_time = time.time()
+        method = "GET" if capture_body or mode == "stream" else "HEAD"
 
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(url, headers=headers, timeout=timeout)
-                duration = time.time() - start_time
-                status_result = StatusResult(
-                    endpoint_name="",  # Filled by caller
-                    url=url,
-                    status_code=response.status_code,
-                    latency=round(duration, 3),
-                    response=response,
+            if client is None:
+                client = HttpClientManager.get_client()
+            # politeness: rate limit and adaptive concurrency per host
+            async with HttpClientManager.host_throttle(url).slot() as slot:
+                if attempt is not None:
+                    attempt.slot_acquired.set()
+                status_result = await Monitor.probe(
+                    client, url, method, headers, timeout, capture_body, attempt
                 )
+                if method == "HEAD" and status_result.status_code in (405, 501):
+                    # HEAD not supported - retry with a streamed GET
+                    status_result = await Monitor.probe(
+                        client, url, "GET", headers, timeout, False, attempt
+                    )
+                slot.report(
+                    status_result.status_code,
+                    status_result.latency,
+                    status_result.retry_after,
+                )
+            if status_result.status_code >= 500:
+                status_result.error_kind = "5xx"
         except httpx.TimeoutException:
-            status_result = StatusResult(endpoint_name="", url=url, error="Timeout")
+            status_result = StatusResult(
+                endpoint_name="", url=url, error="Timeout", error_kind="timeout"
+            )
+        except httpx.ConnectError as e:
+            status_result = StatusResult(
+                endpoint_name="", url=url, error=str(e), error_kind="connect"
+            )
         except Exception as e:
-            status_result = StatusResult(endpoint_name="", url=url, error=str(e))
+            status_result = StatusResult(
+                endpoint_name="", url=url, error=str(e), error_kind="error"
+            )
+        if attempt is not None and attempt.slot_acquired.is_set():
+            # a finished or failed request counts even without trace events
+            # e.g. on a mock transport - only a cancelled one might not
+            attempt.sent = True
+        return status_result
+
+    @staticmethod
+    async def probe(
+        client: httpx.AsyncClient,
+        url: str,
+        method: str,
+        headers: dict,
+        timeout: float,
+        capture_body: bool,
+        attempt: Optional[ProbeAttempt] = None,
+    ) -> StatusResult:
+        """
+        send a single request and collect the compact metadata of the response
+        """
+        trace = RequestTrace(attempt)
+        start_time = time.perf_counter()
+        async with client.stream(
+            method,
+            url,
+            headers=headers,
+            timeout=timeout,
+            extensions={"trace": trace},
+        ) as response:
+            ttfb = time.perf_counter() - start_time
+            if capture_body:
+                await response.aread()
+            duration = time.perf_counter() - start_time
+        content_length = response.headers.get("Content-Length")
+        if capture_body and not content_length:
+            content_length = str(len(response.content))
+        status_result = StatusResult(
+            endpoint_name="",  # Filled by caller
+            url=url,
+            status_code=response.status_code,
+            latency=round(duration, 3),
+            method=method,
+            final_url=str(response.url),
+            redirects=len(response.history),
+            content_length=(
+                int(content_length)
+                if content_length and content_length.isdigit()
+                else None
+            ),
+            connect=trace.get("connect"),
+            tls=trace.get("tls"),
+            ttfb=round(ttfb, 3),
+            transfer=trace.get("transfer"),
+            retry_after=HostThrottle.parse_retry_after(
+                response.headers.get("Retry-After")
+            ),
+            response=response if capture_body else None,
+        )
         return status_result
@@ -0,0 +1,199 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Cross mirror comparison: every example checked on every backend
+"""
+
+import statistics
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from nscholia.example_index import ExampleIndex
+from nscholia.scheduler import ConcurrencyLimits
+
+
+@dataclass
+class Regression:
+    """
+    an example that worked on a backend in the previous sweep but fails now
+    """
+
+    example_id: str
+    backend: str
+    url: str
+    previous_status: int
+    status: int
+
+
+class ProbeMatrix:
+    """
+    compact example × backend matrix of status codes and latencies
+
+    the cells are kept row major in two flat arrays so that
+    hundreds of examples on a handful of mirrors stay a few KB
+    """
+
+    def __init__(self, index: ExampleIndex, backend_urls: Dict[str, str]):
+        """
+        constructor
+
+        Args:
+            index: the examples
+            backend_urls: base url by backend name
+        """
+        self.index = index
+        self.backend_names = list(backend_urls)
+        self.backend_urls = backend_urls
+        self.example_ids = [example.example_id for example in index.examples]
+        size = len(self.example_ids) * len(self.backend_names)
+        # 0: not checked (yet) or no http response
+        self.status_codes = array("H", [0] * size)
+        self.latencies = array("f", [0.0] * size)
+        self.row_of = {example_id: i for i, example_id in enumerate(self.example_ids)}
+        self.col_of = {backend: j for j, backend in enumerate(self.backend_names)}
+
+    def cell(self, example_id: str, backend: str) -> int:
+        """
+        get the position of the given cell in the flat arrays
+        """
+        pos = self.row_of[example_id] * len(self.backend_names) + self.col_of[backend]
+        return pos
+
+    def url(self, example_id: str, backend: str) -> str:
+        """
+        get the url of the given example on the given backend
+        """
+        example = self.index.examples_by_id[example_id]
+        url = example.url_for(self.backend_urls[backend])
+        return url
+
+    def cells_by_url(self) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        get the (example_id, backend) cells by url - a link that can
+        not be rewritten is the same url on all backends
+        """
+        cells = {}
+        for example_id in self.example_ids:
+            for backend in self.backend_names:
+                url = self.url(example_id, backend)
+                cells.setdefault(url, []).append((example_id, backend))
+        return cells
+
+    def set(self, example_id: str, backend: str, result):
+        """
+        set the cell of the given example and backend from the given StatusResult
+        """
+        pos = self.cell(example_id, backend)
+        self.status_codes[pos] = result.status_code if result is not None else 0
+        self.latencies[pos] = result.latency if result is not None else 0.0
+
+    def get(self, example_id: str, backend: str) -> Tuple[int, float]:
+        """
+        get the status code and latency of the given cell
+        """
+        pos = self.cell(example_id, backend)
+        return self.status_codes[pos], self.latencies[pos]
+
+    @staticmethod
+    def is_ok(status_code: int) -> bool:
+        ok = 200 <= status_code < 400
+        return ok
+
+    @staticmethod
+    def aspect_of(path: Optional[str]) -> str:
+        """
+        get the Scholia aspect (author, work, topic, ...) of the given path
+        """
+        aspect = "other"
+        if path:
+            segments = [segment for segment in path.split("?")[0].split("/") if segment]
+            if segments:
+                aspect = segments[0]
+        return aspect
+
+    def fastest_by_aspect(self) -> Dict[str, Tuple[str, float]]:
+        """
+        get the backend with the lowest median latency of successful checks per aspect
+
+        Returns:
+            Dict: (backend, median latency) by aspect
+        """
+        latencies: Dict[str, Dict[str, List[float]]] = {}
+        for example in self.index.examples:
+            aspect = self.aspect_of(example.path)
+            for backend in self.backend_names:
+                status_code, latency = self.get(example.example_id, backend)
+                if self.is_ok(status_code):
+                    by_backend = latencies.setdefault(aspect, {})
+                    by_backend.setdefault(backend, []).append(latency)
+        fastest = {}
+        for aspect, by_backend in sorted(latencies.items()):
+            medians = {
+                backend: statistics.median(values)
+                for backend, values in by_backend.items()
+            }
+            backend = min(medians, key=medians.get)
+            fastest[aspect] = (backend, round(medians[backend], 3))
+        return fastest
+
+    def regressions(self, previous: Optional["ProbeMatrix"]) -> List[Regression]:
+        """
+        get the cells that were ok in the previous sweep and fail now
+        """
+        regressions = []
+        if previous is None:
+            return regressions
+        for example_id in self.example_ids:
+            if example_id not in previous.row_of:
+                continue
+            for backend in self.backend_names:
+                if backend not in previous.col_of:
+                    continue
+                previous_status, _ = previous.get(example_id, backend)
+                status, _ = self.get(example_id, backend)
+                if self.is_ok(previous_status) and not self.is_ok(status):
+                    regressions.append(
+                        Regression(
+                            example_id=example_id,
+                            backend=backend,
+                            url=self.url(example_id, backend),
+                            previous_status=previous_status,
+                            status=status,
+                        )
+                    )
+        return regressions
+
+    async def sweep(
+        self,
+        probe_service,
+        timeout: Optional[float] = None,
+        max_per_host: int = 6,
+    ):
+        """
+        check all cells concurrently
+
+        the fan-out is bounded per mirror host so that N examples × M
+        mirrors never hit a single mirror with more than max_per_host requests
+
+        Args:
+            probe_service: the ProbeService to check the urls with
+            timeout: request timeout in seconds
+            max_per_host: maximum concurrent requests per mirror
+        """
+        cells_by_url = self.cells_by_url()
+        limits = ConcurrencyLimits(
+            max_concurrency=max_per_host * max(1, len(self.backend_names)),
+            max_per_host=max_per_host,
+        )
+        results = await probe_service.refresh(
+            "examples",
+            targets={url: url for url in cells_by_url},
+            timeout=timeout,
+            limits=limits,
+        )
+        for url, cells in cells_by_url.items():
+            for example_id, backend in cells:
+                self.set(example_id, backend, results.get(url))
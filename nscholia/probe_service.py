@@ -0,0 +1,617 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Server side background probing with a shared result cache
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from nscholia.metrics import Metrics
+from nscholia.monitor import Monitor, RetryPolicy, StatusResult
+from nscholia.probe_store import ProbeSample, ProbeStore
+from nscholia.scheduler import BoundedScheduler, ConcurrencyLimits
+from nscholia.ttl_cache import CacheEntry, TtlCache
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    # snapquery and lodstorage are only loaded when endpoints are probed
+    from nscholia.endpoints import Endpoints, UpdateState
+
+
+@dataclass
+class EndpointProbe:
+    """
+    the availability and update state of a SPARQL endpoint
+    """
+
+    status: StatusResult
+    update_state: Optional["UpdateState"] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BackendProbe:
+    """
+    the result of fetching the /backend config of a Scholia mirror
+    """
+
+    backend: Any = None
+    success: bool = False
+    error: Optional[str] = None
+    latency: float = 0.0
+
+
+@dataclass
+class ProbeConfig:
+    """
+    intervals, timeouts and limits of the background probes
+    """
+
+    # probe intervals in seconds by kind - 0 disables the periodic probe
+    intervals: Dict[str, float] = field(
+        default_factory=lambda: {
+            "endpoints": 300.0,
+            "backends": 300.0,
+            "examples": 3600.0,
+        }
+    )
+    # request timeouts in seconds by kind
+    timeouts: Dict[str, float] = field(
+        default_factory=lambda: {
+            "endpoints": 5.0,
+            "backends": 2.0,
+            "examples": 10.0,
+        }
+    )
+    limits: ConcurrencyLimits = field(default_factory=ConcurrencyLimits)
+    # retries of transient failures so that a single dropped request
+    # does not show up as an outage
+    retry: RetryPolicy = field(default_factory=lambda: RetryPolicy(hedge=True))
+    # seconds between writes of the buffered results to the probe store
+    flush_interval: float = 10.0
+
+    @staticmethod
+    def parse(specs: Optional[List[str]], seconds: Dict[str, float], name: str):
+        """
+        apply the given command line settings to the given seconds by kind
+
+        Args:
+            specs: list of kind=seconds e.g. ["examples=600"]
+            seconds: the seconds by kind to update
+            name: the name of the setting for the error message
+        """
+        for spec in specs or []:
+            kind, _, value = spec.partition("=")
+            try:
+                value = float(value)
+            except ValueError:
+                value = -1.0
+            if kind not in seconds or value < 0:
+                raise ValueError(
+                    f"invalid probe {name} {spec} - expected kind=seconds with kind one of {list(seconds)}"
+                )
+            seconds[kind] = value
+
+    def apply(
+        self,
+        intervals: Optional[List[str]] = None,
+        timeouts: Optional[List[str]] = None,
+    ):
+        """
+        apply the given command line intervals and timeouts
+
+        Args:
+            intervals: list of kind=seconds e.g. ["examples=600"]
+            timeouts: list of kind=seconds e.g. ["backends=5"]
+        """
+        self.parse(intervals, self.intervals, "interval")
+        self.parse(timeouts, self.timeouts, "timeout")
+
+
+class ProbeService:
+    """
+    probes endpoints, backends and examples on the server side and
+    shares the results with all browser sessions and the REST API
+
+    Dashboards subscribe to a kind of probe and get called back
+    per finished target - a refresh triggered while a probe of the same
+    target is in flight joins the running probe instead of starting
+    another one.
+    """
+
+    KINDS = ["endpoints", "backends", "examples"]
+
+    def __init__(
+        self,
+        webserver,
+        config: Optional[ProbeConfig] = None,
+        store: Optional[ProbeStore] = None,
+    ):
+        """
+        constructor
+
+        Args:
+            webserver: the webserver providing the sheet and backends
+            config: the probe configuration
+            store: optional persistent store for the history of the results
+        """
+        self.webserver = webserver
+        self.store = store
+        if config is None:
+            config = ProbeConfig()
+        self.config = config
+        self.caches: Dict[str, TtlCache] = {kind: TtlCache() for kind in self.KINDS}
+        self.apply_ttls()
+        self.subscribers: Dict[str, List[Callable[[str, Any], None]]] = {
+            kind: [] for kind in self.KINDS
+        }
+        self.in_flight: Dict[tuple, asyncio.Future] = {}
+        self.periodic_tasks: List[asyncio.Task] = []
+        # revalidations running in the background - referenced to keep them alive
+        self.background_tasks: set = set()
+        # the latest cross mirror sweep of the examples - see ProbeMatrix
+        self.last_matrix = None
+        metrics = Metrics.get_instance()
+        self.latency_histogram = metrics.histogram(
+            "nicescholia_probe_latency_seconds",
+            "latency of the finished probes",
+            labels=("kind",),
+        )
+        self.probe_counter = metrics.counter(
+            "nicescholia_probes_total",
+            "number of finished probes",
+            labels=("kind", "ok"),
+        )
+
+    def subscribe(self, kind: str, callback: Callable[[str, Any], None]):
+        """
+        subscribe to the results of the given kind
+
+        Args:
+            kind: endpoints, backends or examples
+            callback: callback(key, result) called per finished probe
+        """
+        self.subscribers[kind].append(callback)
+
+    def unsubscribe(self, kind: str, callback: Callable[[str, Any], None]):
+        """
+        remove the given subscription
+        """
+        if callback in self.subscribers[kind]:
+            self.subscribers[kind].remove(callback)
+
+    def publish(self, kind: str, key: str, result: Any):
+        """
+        store the given result and notify the subscribers
+        """
+        self.caches[kind].set(key, result)
+        if self.store is not None:
+            self.store.record(self.as_sample(kind, key, result))
+        self.observe(kind, result)
+        for callback in list(self.subscribers[kind]):
+            try:
+                callback(key, result)
+            except Exception as ex:
+                # a broken subscriber e.g. a closed browser tab must not stop the probe
+                logger.warning(f"probe subscriber failed: {ex}", exc_info=ex)
+
+    def observe(self, kind: str, result: Any):
+        """
+        record the latency and outcome of the given probe result in the metrics
+        """
+        # endpoint probes wrap a StatusResult, backend probes have their own latency
+        status = getattr(result, "status", result)
+        latency = getattr(status, "latency", None)
+        if latency is not None:
+            ok = result.success if kind == "backends" else status.is_online
+            self.latency_histogram.observe(latency, kind=kind)
+            self.probe_counter.inc(kind=kind, ok=str(ok).lower())
+
+    @staticmethod
+    def as_sample(kind: str, key: str, result: Any) -> ProbeSample:
+        """
+        convert the given probe result to a sample for the probe store
+        """
+        if kind == "endpoints":
+            status = result.status
+            update_state = result.update_state
+            triples = None
+            if update_state is not None and update_state.success:
+                triples = update_state.triples
+            sample = ProbeSample(
+                kind=kind,
+                target=key,
+                ok=status.is_online,
+                latency=status.latency,
+                status_code=status.status_code,
+                value=triples,
+            )
+        elif kind == "backends":
+            sample = ProbeSample(
+                kind=kind, target=key, ok=result.success, latency=result.latency
+            )
+        else:
+            sample = ProbeSample(
+                kind=kind,
+                target=key,
+                ok=result.is_online,
+                latency=result.latency,
+                status_code=result.status_code,
+            )
+        return sample
+
+    def get_entry(self, kind: str, key: str) -> Optional[CacheEntry]:
+        """
+        get the cache entry of the latest result for the given target
+        """
+        entry = self.caches[kind].get_entry(key)
+        return entry
+
+    def get_result(self, kind: str, key: str, max_age: float = None) -> Any:
+        """
+        get the cached result for the given target if it is fresh
+        """
+        result = self.caches[kind].get(key, max_age=max_age)
+        return result
+
+    def get_endpoints(self) -> "Endpoints":
+        """
+        get the shared endpoints
+        """
+        from nscholia.endpoints import Endpoints
+
+        endpoints = Endpoints.get_instance()
+        return endpoints
+
+    def targets(self, kind: str) -> Dict[str, Any]:
+        """
+        get the probe targets of the given kind by key
+        """
+        targets = {}
+        if kind == "endpoints":
+            targets = dict(self.get_endpoints().get_endpoints())
+        elif kind == "backends":
+            if self.webserver.backends is not None:
+                targets = dict(self.webserver.backends.backends)
+        elif kind == "examples":
+            sheet = self.webserver.sheet
+            lod = sheet.lod if sheet is not None and sheet.lod else []
+            for item in lod:
+                link = str(item.get("link", ""))
+                if link.startswith("http"):
+                    targets[link] = link
+        return targets
+
+    @staticmethod
+    def url_of(kind: str, target: Any) -> str:
+        """
+        get the url of the given target for the per host limits
+        """
+        if kind == "endpoints":
+            url = getattr(target, "website", None) or getattr(target, "endpoint", "")
+        elif kind == "backends":
+            url = target.url
+        else:
+            url = target
+        return url
+
+    async def probe_endpoint(self, key: str, ep, timeout: float) -> EndpointProbe:
+        """
+        check the availability and update state of the given endpoint
+        """
+        url = self.url_of("endpoints", ep)
+        status = await Monitor.check(url, timeout=timeout, retry=self.config.retry)
+        status.endpoint_name = key
+        probe = EndpointProbe(status=status)
+        if status.is_online:
+            from nscholia.endpoints import UpdateState
+
+            try:
+                probe.update_state = await UpdateState.from_endpoint_async(
+                    self.get_endpoints(), ep
+                )
+            except Exception as ex:
+                probe.error = str(ex)
+        return probe
+
+    async def probe_backend(self, key: str, backend, timeout: float) -> BackendProbe:
+        """
+        fetch the /backend config of the given Scholia mirror
+        """
+        # enrich a copy - the configured backends are shared by all sessions
+        backend = copy.copy(backend)
+        probe = BackendProbe(backend=backend)
+        start_time = time.perf_counter()
+        try:
+            probe.success = await backend.fetch_config_async(timeout)
+        except Exception as ex:
+            probe.error = str(ex)
+        probe.latency = round(time.perf_counter() - start_time, 3)
+        return probe
+
+    async def probe_example(self, url: str, timeout: float) -> StatusResult:
+        """
+        check the given example link
+        """
+        status = await Monitor.check(url, timeout=timeout, retry=self.config.retry)
+        return status
+
+    async def probe_once(
+        self, kind: str, key: str, probe: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        run the given probe unless a probe of the same target is already in flight
+
+        Args:
+            kind: the kind of probe
+            key: the key of the target
+            probe: factory of the probe coroutine
+
+        Returns:
+            the probe result
+        """
+        task_key = (kind, key)
+        task = self.in_flight.get(task_key)
+        if task is None:
+
+            async def run_and_publish():
+                result = await probe()
+                self.publish(kind, key, result)
+                return result
+
+            task = asyncio.ensure_future(run_and_publish())
+            self.in_flight[task_key] = task
+            task.add_done_callback(lambda _task: self.in_flight.pop(task_key, None))
+        # shield so that a cancelled page does not cancel the shared probe
+        result = await asyncio.shield(task)
+        return result
+
+    async def refresh(
+        self,
+        kind: str,
+        targets: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        limits: Optional[ConcurrencyLimits] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        re-probe all targets of the given kind
+
+        Args:
+            kind: endpoints, backends or examples
+            targets: optional targets by key - default: all configured targets
+            timeout: optional request timeout overriding the configured one
+            limits: optional concurrency limits overriding the configured ones
+            on_result: optional callback(key, result) called per finished target
+                of this refresh - result is None if the probe failed
+
+        Returns:
+            Dict: the results by key
+        """
+        if targets is None:
+            targets = self.targets(kind)
+        if timeout is None:
+            timeout = self.config.timeouts.get(kind, 5.0)
+        probe_funcs = {
+            "endpoints": self.probe_endpoint,
+            "backends": self.probe_backend,
+            "examples": lambda key, url, timeout: self.probe_example(url, timeout),
+        }
+        probe_func = probe_funcs[kind]
+
+        async def work(item):
+            key, target = item
+            result = await self.probe_once(
+                kind, key, lambda: probe_func(key, target, timeout)
+            )
+            return result
+
+        def on_done(item, result, _error):
+            if on_result is not None:
+                key, _target = item
+                on_result(key, result)
+
+        if limits is None:
+            limits = self.config.limits
+        scheduler = BoundedScheduler(limits)
+        items = list(targets.items())
+        results = await scheduler.run(
+            items,
+            work,
+            url_of=lambda item: self.url_of(kind, item[1]),
+            on_done=on_done,
+        )
+        results_by_key = {key: result for (key, _target), result in zip(items, results)}
+        return results_by_key
+
+    async def stream(
+        self,
+        kind: str,
+        targets: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        probe the targets of the given kind and yield each result
+        as soon as its probe has finished
+
+        Args:
+            kind: endpoints, backends or examples
+            targets: optional targets by key - default: all configured targets
+            timeout: optional request timeout overriding the configured one
+            max_age: if set, fresh cached results of at most this age in seconds
+                are yielded first and only the other targets are probed
+
+        Yields:
+            Tuple[str, Any]: the key and result per target in order of completion
+        """
+        if targets is None:
+            targets = self.targets(kind)
+        targets = dict(targets)
+        if max_age is not None:
+            for key in list(targets):
+                result = self.get_result(kind, key, max_age=max_age)
+                if result is not None:
+                    del targets[key]
+                    yield key, result
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(
+            self.refresh(
+                kind,
+                targets,
+                timeout=timeout,
+                on_result=lambda key, result: queue.put_nowait((key, result)),
+            )
+        )
+        # the end marker follows the results of all targets
+        task.add_done_callback(lambda _task: queue.put_nowait(None))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            # raise a failure of the refresh itself
+            await task
+        finally:
+            # a closed stream stops scheduling - probes in flight are shielded
+            # and still publish their results to the cache
+            if not task.done():
+                task.cancel()
+
+    async def get_results(
+        self,
+        kind: str,
+        max_age: Optional[float] = None,
+        targets: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, CacheEntry]:
+        """
+        get the results of the given kind with stale-while-revalidate semantics
+
+        fresh results are returned as is, stale results are returned
+        immediately and re-probed in the background, missing results are
+        probed concurrently before returning
+
+        Args:
+            kind: endpoints, backends or examples
+            max_age: optional maximum age in seconds of a fresh result
+                - default: the time to live of the cache
+            targets: optional targets by key - default: all configured targets
+            timeout: optional request timeout overriding the configured one
+
+        Returns:
+            Dict[str, CacheEntry]: the cache entries by key
+        """
+        if targets is None:
+            targets = self.targets(kind)
+        cache = self.caches[kind]
+        stale = {}
+        missing = {}
+        for key, target in targets.items():
+            if cache.get(key, max_age=max_age) is None:
+                if cache.get_entry(key) is None:
+                    missing[key] = target
+                else:
+                    stale[key] = target
+        if stale:
+            task = asyncio.ensure_future(self.refresh(kind, stale, timeout=timeout))
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
+        if missing:
+            await self.refresh(kind, missing, timeout=timeout)
+        entries = {}
+        for key in targets:
+            entry = cache.get_entry(key)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    async def run_periodic(self, kind: str, interval: float):
+        """
+        probe the given kind every interval seconds
+        """
+        while True:
+            try:
+                await self.refresh(kind)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                logger.exception(f"background {kind} probe failed: {ex}")
+            await asyncio.sleep(interval)
+
+    async def run_flush(self):
+        """
+        write the buffered results to the probe store periodically
+        """
+        while True:
+            await asyncio.sleep(self.config.flush_interval)
+            try:
+                await asyncio.to_thread(self.store.flush)
+            except Exception as ex:
+                logger.exception(f"probe store flush failed: {ex}")
+
+    def apply_ttls(self):
+        """
+        let the cached results live for one probe interval of their kind
+        """
+        for kind, cache in self.caches.items():
+            cache.default_ttl = self.config.intervals.get(kind) or 300.0
+
+    def configure(
+        self,
+        intervals: Optional[List[str]] = None,
+        timeouts: Optional[List[str]] = None,
+    ):
+        """
+        apply the given command line intervals and timeouts
+        - to be called before start
+
+        Args:
+            intervals: list of kind=seconds e.g. ["examples=600"]
+            timeouts: list of kind=seconds e.g. ["backends=5"]
+        """
+        self.config.apply(intervals=intervals, timeouts=timeouts)
+        self.apply_ttls()
+
+    def start(self):
+        """
+        start the periodic probes - to be called on server startup
+        """
+        for kind in self.KINDS:
+            interval = self.config.intervals.get(kind, 0)
+            if interval and interval > 0:
+                task = asyncio.ensure_future(self.run_periodic(kind, interval))
+                self.periodic_tasks.append(task)
+        if self.store is not None:
+            self.periodic_tasks.append(asyncio.ensure_future(self.run_flush()))
+
+    async def stop(self):
+        """
+        stop the periodic probes - to be called on server shutdown
+        """
+        tasks = self.periodic_tasks + list(self.background_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.periodic_tasks = []
+        if self.store is not None:
+            await asyncio.to_thread(self.store.close)
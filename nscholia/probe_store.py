@@ -0,0 +1,438 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Persistent time series store of probe results
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class LatencyHistogram:
+    """
+    log-bucketed latency histogram in the spirit of HdrHistogram
+
+    bucket i covers latencies up to MIN_LATENCY * GROWTH**i so each
+    percentile is reported with a relative error of at most GROWTH-1
+    """
+
+    MIN_LATENCY = 0.001
+    GROWTH = 1.05
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = counts or {}
+
+    @classmethod
+    def bucket_of(cls, latency: float) -> int:
+        """
+        get the bucket index for the given latency in seconds
+        """
+        if latency <= cls.MIN_LATENCY:
+            bucket = 0
+        else:
+            bucket = math.ceil(math.log(latency / cls.MIN_LATENCY, cls.GROWTH))
+        return bucket
+
+    @classmethod
+    def upper_bound(cls, bucket: int) -> float:
+        """
+        get the upper bound latency of the given bucket
+        """
+        bound = cls.MIN_LATENCY * cls.GROWTH**bucket
+        return bound
+
+    def add(self, latency: float, count: int = 1):
+        """
+        add the given latency
+        """
+        bucket = self.bucket_of(latency)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def merge(self, other: "LatencyHistogram"):
+        """
+        merge the other histogram into this one
+        """
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    @property
+    def total(self) -> int:
+        total = sum(self.counts.values())
+        return total
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        get the given percentile (0-100) of the latencies in seconds
+        """
+        total = self.total
+        if total == 0:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * total))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return round(self.upper_bound(bucket), 3)
+        return None
+
+    def to_json(self) -> str:
+        return json.dumps(self.counts)
+
+    @classmethod
+    def from_json(cls, json_str: Optional[str]) -> "LatencyHistogram":
+        counts = {}
+        if json_str:
+            counts = {int(k): v for k, v in json.loads(json_str).items()}
+        return cls(counts)
+
+
+@dataclass
+class WindowStats:
+    """
+    availability and latency statistics of a target over a time window
+    """
+
+    target: str
+    count: int = 0
+    errors: int = 0
+    latency_min: Optional[float] = None
+    latency_max: Optional[float] = None
+    latency_mean: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+    resolution: int = 0
+
+    @property
+    def error_rate(self) -> Optional[float]:
+        error_rate = self.errors / self.count if self.count else None
+        return error_rate
+
+    @property
+    def uptime(self) -> Optional[float]:
+        uptime = 1.0 - self.errors / self.count if self.count else None
+        return uptime
+
+
+@dataclass
+class ProbeSample:
+    """
+    a single probe result
+    """
+
+    kind: str
+    target: str
+    ok: bool
+    latency: float = 0.0
+    status_code: int = 0
+    # optional value e.g. the triple count of an endpoint
+    value: Optional[float] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+class ProbeStore:
+    """
+    append-only SQLite (WAL mode) store of probe results with
+    rollups to 1 minute, 1 hour and 1 day buckets
+
+    samples are buffered and written in batches, each batch also updates the
+    rollups so that statistics over long windows never scan the raw samples
+    """
+
+    # rollup resolutions in seconds
+    RESOLUTIONS = [60, 3600, 86400]
+    # retention in seconds of the raw samples (key 0) and the rollups
+    RETENTION = {
+        0: 2 * 86400,
+        60: 7 * 86400,
+        3600: 90 * 86400,
+        86400: 5 * 365 * 86400,
+    }
+    BATCH_SIZE = 100
+    EVICT_INTERVAL = 3600
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: Optional[int] = None):
+        """
+        constructor
+
+        Args:
+            db_path: path of the SQLite database
+                (default: ~/.solutions/nicescholia/probes.db)
+            batch_size: number of buffered samples that triggers a write
+                (default: BATCH_SIZE) - 0 leaves flushing to the caller
+        """
+        if batch_size is None:
+            batch_size = self.BATCH_SIZE
+        self.batch_size = batch_size
+        if db_path is None:
+            db_path = os.path.join(
+                str(Path.home()), ".solutions", "nicescholia", "probes.db"
+            )
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.buffer: List[ProbeSample] = []
+        self.last_evict = 0.0
+        self.connect_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # open now so that a broken database path fails early
+        self.connect()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        the database connection
+        """
+        connection = self.connect()
+        return connection
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        open the database if it is not open - it is reopened after close
+        since the routes of the webserver outlive a server shutdown
+        """
+        with self.connect_lock:
+            if self._connection is None:
+                connection = sqlite3.connect(self.db_path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                self._connection = connection
+                self.create_tables()
+            return self._connection
+
+    def create_tables(self):
+        """
+        create the samples and rollups tables if they do not exist
+        """
+        connection = self._connection
+        with connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS samples (
+                    ts REAL NOT NULL,
+                    kind TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    ok INTEGER NOT NULL,
+                    latency REAL,
+                    status_code INTEGER,
+                    value REAL
+                )""")
+            connection.execute("CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    resolution INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    errors INTEGER NOT NULL,
+                    latency_sum REAL NOT NULL,
+                    latency_min REAL,
+                    latency_max REAL,
+                    histogram TEXT,
+                    PRIMARY KEY (resolution, kind, target, bucket)
+                )""")
+
+    def record(self, sample: ProbeSample):
+        """
+        buffer the given sample - the buffer is written when it is full
+        """
+        with self.lock:
+            self.buffer.append(sample)
+            full = self.batch_size > 0 and len(self.buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        write the buffered samples and update the rollups in one transaction
+        """
+        with self.lock:
+            samples = self.buffer
+            self.buffer = []
+            if samples:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT INTO samples VALUES (?,?,?,?,?,?,?)",
+                        [
+                            (
+                                s.timestamp,
+                                s.kind,
+                                s.target,
+                                int(s.ok),
+                                s.latency,
+                                s.status_code,
+                                s.value,
+                            )
+                            for s in samples
+                        ],
+                    )
+                    for resolution in self.RESOLUTIONS:
+                        self.update_rollups(resolution, samples)
+            now = time.time()
+            if now - self.last_evict > self.EVICT_INTERVAL:
+                self.evict(now)
+                self.last_evict = now
+
+    def update_rollups(self, resolution: int, samples: List[ProbeSample]):
+        """
+        merge the given samples into the rollups of the given resolution
+        """
+        groups: Dict[Tuple[int, str, str], List[ProbeSample]] = {}
+        for sample in samples:
+            bucket = int(sample.timestamp // resolution * resolution)
+            groups.setdefault((bucket, sample.kind, sample.target), []).append(sample)
+        for (bucket, kind, target), group in groups.items():
+            row = self.connection.execute(
+                """SELECT count, errors, latency_sum, latency_min, latency_max, histogram
+                FROM rollups WHERE resolution=? AND kind=? AND target=? AND bucket=?""",
+                (resolution, kind, target, bucket),
+            ).fetchone()
+            if row:
+                count, errors, latency_sum, latency_min, latency_max, hist_json = row
+                histogram = LatencyHistogram.from_json(hist_json)
+            else:
+                count, errors, latency_sum = 0, 0, 0.0
+                latency_min, latency_max = None, None
+                histogram = LatencyHistogram()
+            for sample in group:
+                count += 1
+                if not sample.ok:
+                    errors += 1
+                    continue
+                # latency statistics only cover successful probes
+                latency = sample.latency
+                latency_sum += latency
+                latency_min = (
+                    latency if latency_min is None else min(latency_min, latency)
+                )
+                latency_max = (
+                    latency if latency_max is None else max(latency_max, latency)
+                )
+                histogram.add(latency)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO rollups VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (
+                    resolution,
+                    bucket,
+                    kind,
+                    target,
+                    count,
+                    errors,
+                    latency_sum,
+                    latency_min,
+                    latency_max,
+                    histogram.to_json(),
+                ),
+            )
+
+    def evict(self, now: float):
+        """
+        delete the samples and rollups older than their retention
+        """
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM samples WHERE ts < ?", (now - self.RETENTION[0],)
+            )
+            for resolution in self.RESOLUTIONS:
+                self.connection.execute(
+                    "DELETE FROM rollups WHERE resolution=? AND bucket < ?",
+                    (resolution, now - self.RETENTION[resolution]),
+                )
+
+    def resolution_for(self, start: float, end: float) -> int:
+        """
+        get the coarsest rollup resolution that still gives
+        at least 24 buckets for the given window
+        """
+        span = end - start
+        resolution = self.RESOLUTIONS[0]
+        for candidate in self.RESOLUTIONS:
+            if span >= 24 * candidate:
+                resolution = candidate
+        return resolution
+
+    def stats(
+        self,
+        kind: str,
+        start: float,
+        end: Optional[float] = None,
+        target: Optional[str] = None,
+    ) -> Dict[str, WindowStats]:
+        """
+        get the statistics per target for the given window from the rollups
+
+        Args:
+            kind: endpoints, backends or examples
+            start: start of the window (epoch seconds)
+            end: end of the window (epoch seconds) - default: now
+            target: optional single target
+
+        Returns:
+            Dict[str, WindowStats]: the statistics by target
+        """
+        if end is None:
+            end = time.time()
+        self.flush()
+        resolution = self.resolution_for(start, end)
+        # buckets overlapping the window
+        first_bucket = int(start // resolution * resolution)
+        sql = """SELECT target, count, errors, latency_sum, latency_min, latency_max, histogram
+            FROM rollups WHERE resolution=? AND kind=? AND bucket>=? AND bucket<=?"""
+        params = [resolution, kind, first_bucket, end]
+        if target is not None:
+            sql += " AND target=?"
+            params.append(target)
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        stats_by_target: Dict[str, WindowStats] = {}
+        histograms: Dict[str, LatencyHistogram] = {}
+        latency_sums: Dict[str, float] = {}
+        for row_target, count, errors, latency_sum, lmin, lmax, hist_json in rows:
+            stats = stats_by_target.get(row_target)
+            if stats is None:
+                stats = WindowStats(target=row_target, resolution=resolution)
+                stats_by_target[row_target] = stats
+                histograms[row_target] = LatencyHistogram()
+                latency_sums[row_target] = 0.0
+            stats.count += count
+            stats.errors += errors
+            latency_sums[row_target] += latency_sum
+            if lmin is not None:
+                stats.latency_min = (
+                    lmin if stats.latency_min is None else min(stats.latency_min, lmin)
+                )
+            if lmax is not None:
+                stats.latency_max = (
+                    lmax if stats.latency_max is None else max(stats.latency_max, lmax)
+                )
+            histograms[row_target].merge(LatencyHistogram.from_json(hist_json))
+        for row_target, stats in stats_by_target.items():
+            histogram = histograms[row_target]
+            if histogram.total:
+                stats.latency_mean = round(
+                    latency_sums[row_target] / histogram.total, 3
+                )
+            stats.p50 = histogram.percentile(50)
+            stats.p95 = histogram.percentile(95)
+            stats.p99 = histogram.percentile(99)
+        return stats_by_target
+
+    def close(self):
+        """
+        flush the buffer and close the database - a later use reopens it
+        """
+        self.flush()
+        with self.lock, self.connect_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,244 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Per host politeness: token bucket rate limit and adaptive (AIMD) concurrency
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+
+@dataclass
+class ThrottleSlot:
+    """
+    the outcome of a request made within a slot of a HostThrottle
+    """
+
+    status_code: int = 0
+    latency: float = 0.0
+    # seconds the server asked us to wait
+    retry_after: Optional[float] = None
+    timeout: bool = False
+
+    def report(
+        self,
+        status_code: int,
+        latency: float = 0.0,
+        retry_after: Optional[float] = None,
+    ):
+        """
+        report the outcome of the request
+        """
+        self.status_code = status_code
+        self.latency = latency
+        self.retry_after = retry_after
+
+    def report_response(self, response: httpx.Response):
+        """
+        report the outcome of the given response
+        """
+        try:
+            latency = response.elapsed.total_seconds()
+        except RuntimeError:
+            # elapsed is only available once the response has been closed
+            latency = 0.0
+        self.report(
+            response.status_code,
+            latency,
+            HostThrottle.parse_retry_after(response.headers.get("Retry-After")),
+        )
+
+
+class HostThrottle:
+    """
+    politeness towards a single host
+
+    - a token bucket limits the request rate
+    - the number of concurrent requests adapts AIMD style: it grows by one
+      per "round trip" while latencies stay healthy and is halved on
+      429/503 answers and timeouts
+    - a Retry-After header pauses all requests to the host
+    """
+
+    # multiplicative decrease factor on overload
+    DECREASE_FACTOR = 0.5
+    # minimum seconds between two decreases so that a burst of failures
+    # of requests that were in flight together counts once
+    DECREASE_COOLDOWN = 1.0
+    # latencies up to this factor of the baseline are considered healthy
+    LATENCY_TOLERANCE = 2.0
+    # weight of a new latency in the moving baseline
+    BASELINE_ALPHA = 0.1
+    # upper bound of a Retry-After pause in seconds
+    MAX_RETRY_AFTER = 300.0
+    OVERLOAD_STATUS_CODES = (429, 503)
+    # number of recent latencies kept for the percentiles
+    LATENCY_WINDOW = 100
+    # minimum number of latencies for a meaningful percentile
+    MIN_LATENCY_SAMPLES = 20
+
+    def __init__(
+        self,
+        host: str,
+        rate: float = 20.0,
+        burst: int = 20,
+        initial_limit: float = 4.0,
+        min_limit: float = 1.0,
+        max_limit: float = 10.0,
+    ):
+        """
+        constructor
+
+        Args:
+            host: the host name
+            rate: requests per second
+            burst: maximum number of requests sent at once
+            initial_limit: initial number of concurrent requests
+            min_limit: lower bound of the concurrency limit
+            max_limit: upper bound of the concurrency limit
+        """
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.active = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.baseline: Optional[float] = None
+        self.released = asyncio.Event()
+        self.throttled = 0
+        # latencies of the recent successful requests
+        self.recent = deque(maxlen=self.LATENCY_WINDOW)
+
+    @classmethod
+    def parse_retry_after(cls, value: Optional[str]) -> Optional[float]:
+        """
+        parse the given Retry-After header - delay seconds or an HTTP date
+        """
+        retry_after = None
+        if value:
+            value = value.strip()
+            if value.isdigit():
+                retry_after = float(value)
+            else:
+                try:
+                    retry_date = parsedate_to_datetime(value)
+                    retry_after = max(0.0, retry_date.timestamp() - time.time())
+                except (TypeError, ValueError):
+                    retry_after = None
+        return retry_after
+
+    def refill(self, now: float):
+        """
+        add the tokens earned since the last refill
+        """
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.last_refill) * self.rate
+        )
+        self.last_refill = now
+
+    async def acquire(self):
+        """
+        wait for a token and a free concurrency slot
+        """
+        while True:
+            now = time.monotonic()
+            wait = None
+            if now < self.blocked_until:
+                wait = self.blocked_until - now
+            elif self.active < max(1, int(self.limit)):
+                self.refill(now)
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self.active += 1
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            if wait is None:
+                # wait for a running request to finish
+                self.released.clear()
+                await self.released.wait()
+            else:
+                await asyncio.sleep(wait)
+
+    def is_saturated(self) -> bool:
+        """
+        check whether a new request would have to wait - the host is paused
+        by a Retry-After, all concurrency slots are taken or no token is left
+        """
+        now = time.monotonic()
+        self.refill(now)
+        saturated = (
+            now < self.blocked_until
+            or self.active >= max(1, int(self.limit))
+            or self.tokens < 1.0
+        )
+        return saturated
+
+    def release(self, slot: ThrottleSlot):
+        """
+        free the slot and adapt to its outcome
+        """
+        self.active -= 1
+        now = time.monotonic()
+        if slot.timeout or slot.status_code in self.OVERLOAD_STATUS_CODES:
+            self.throttled += 1
+            if now - self.last_decrease >= self.DECREASE_COOLDOWN:
+                self.limit = max(self.min_limit, self.limit * self.DECREASE_FACTOR)
+                self.last_decrease = now
+            if slot.retry_after is not None:
+                pause = min(slot.retry_after, self.MAX_RETRY_AFTER)
+                self.blocked_until = max(self.blocked_until, now + pause)
+        elif slot.status_code and slot.latency > 0:
+            self.recent.append(slot.latency)
+            if self.baseline is None:
+                self.baseline = slot.latency
+            healthy = slot.latency <= self.LATENCY_TOLERANCE * self.baseline
+            self.baseline += self.BASELINE_ALPHA * (slot.latency - self.baseline)
+            if healthy:
+                # additive increase: about one more slot per round of limit requests
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self.released.set()
+
+    def latency_percentile(self, p: float) -> Optional[float]:
+        """
+        get the given percentile (0-100) of the recent latencies
+
+        Returns:
+            the latency in seconds or None if there are not enough samples
+        """
+        percentile = None
+        if len(self.recent) >= self.MIN_LATENCY_SAMPLES:
+            latencies = sorted(self.recent)
+            rank = max(1, math.ceil(p / 100.0 * len(latencies)))
+            percentile = latencies[rank - 1]
+        return percentile
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        run a request to my host within a slot - the request should
+        report its outcome on the yielded ThrottleSlot
+        """
+        await self.acquire()
+        slot = ThrottleSlot()
+        try:
+            yield slot
+        except httpx.TimeoutException:
+            slot.timeout = True
+            raise
+        finally:
+            self.release(slot)
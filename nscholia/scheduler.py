@@ -0,0 +1,113 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Bounded concurrency scheduling of probes
+"""
+
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+
+@dataclass
+class ConcurrencyLimits:
+    """
+    global and per host concurrency limits
+    """
+
+    max_concurrency: int = 20
+    max_per_host: int = 6
+    # overrides of max_per_host by host name e.g. {"qlever.scholia.wiki": 10}
+    per_host: Dict[str, int] = field(default_factory=dict)
+
+    def for_host(self, host: str) -> int:
+        """
+        get the concurrency limit for the given host
+        """
+        limit = self.per_host.get(host, self.max_per_host)
+        return limit
+
+
+class BoundedScheduler:
+    """
+    sliding window scheduler - starts the next item as soon as
+    any slot is free instead of waiting for fixed batches to complete
+    """
+
+    def __init__(self, limits: Optional[ConcurrencyLimits] = None):
+        """
+        constructor
+
+        Args:
+            limits: the concurrency limits to apply
+        """
+        if limits is None:
+            limits = ConcurrencyLimits()
+        self.limits = limits
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """
+        get the host of the given url
+        """
+        host = urlparse(url).netloc if url else ""
+        return host
+
+    def host_semaphore(self, host: str) -> asyncio.Semaphore:
+        """
+        get the semaphore for the given host
+        """
+        semaphore = self.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(int(self.limits.for_host(host)))
+            self.host_semaphores[host] = semaphore
+        return semaphore
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        work: Callable[[Any], Awaitable[Any]],
+        url_of: Callable[[Any], str] = None,
+        on_done: Callable[[Any, Any, Optional[Exception]], Any] = None,
+    ) -> List[Any]:
+        """
+        run the given work for all items with bounded concurrency
+
+        Args:
+            items: the items to work on
+            work: async function to call for each item
+            url_of: function to get the url of an item for the per host limit
+            on_done: callback(item, result, exception) called per completed item
+                may be a plain function or a coroutine function
+
+        Returns:
+            List: the results in the order of the items
+        """
+        items = list(items)
+        global_semaphore = asyncio.Semaphore(int(self.limits.max_concurrency))
+
+        async def run_item(item):
+            host = self.host_of(url_of(item)) if url_of else ""
+            result = None
+            error = None
+            # acquire the host slot first so that items waiting
+            # for a busy host do not block a global slot
+            async with self.host_semaphore(host):
+                async with global_semaphore:
+                    try:
+                        result = await work(item)
+                    except Exception as ex:
+                        error = ex
+            if on_done:
+                done = on_done(item, result, error)
+                if inspect.isawaitable(done):
+                    await done
+            return result
+
+        results = await asyncio.gather(*[run_item(item) for item in items])
+        return results
@@ -0,0 +1,57 @@
+"""
+Command line interface of the webserver
+"""
+
+from argparse import ArgumentParser
+
+from ngwidgets.cmd import WebserverCmd
+
+from nscholia.google_sheet import GoogleSheet
+
+
+class ScholiaCmd(WebserverCmd):
+    """
+    Command Line Interface
+    """
+
+    def getArgParser(self, description: str, version_msg) -> ArgumentParser:
+        """
+        get the argument parser
+        """
+        parser = super().getArgParser(description, version_msg)
+        parser.add_argument(
+            "--sheet-id",
+            dest="sheet_id",
+            default=GoogleSheet.SCHOLIA_EXAMPLES_SHEET_ID,
+            help="Google Sheet ID for Scholia examples (CSV export will be used)",
+        )
+        parser.add_argument(
+            "--sheet-gid",
+            dest="sheet_gid",
+            type=int,
+            default=0,
+            help="Google Sheet GID (tab id), default: 0",
+        )
+        parser.add_argument(
+            "--api-limit",
+            dest="api_limits",
+            action="append",
+            metavar="ROUTE=N",
+            help="maximum concurrent requests of a REST API route e.g. endpoints=8 (repeatable)",
+        )
+        parser.add_argument(
+            "--probe-interval",
+            dest="probe_intervals",
+            action="append",
+            metavar="KIND=SECONDS",
+            help="interval of the background probes of a kind e.g. examples=600 - 0 disables them (repeatable)",
+        )
+        parser.add_argument(
+            "--probe-timeout",
+            dest="probe_timeouts",
+            action="append",
+            metavar="KIND=SECONDS",
+            help="request timeout of the probes of a kind e.g. backends=5 (repeatable)",
+        )
+
+        return parser
@@ -0,0 +1,399 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+Headless sweeps of examples, backends and endpoints e.g. from cron
+- uses the ProbeService without the NiceGUI webserver
+"""
+
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional
+
+from nscholia.backend import Backends
+from nscholia.example_index import ExampleIndex
+from nscholia.google_sheet import GoogleSheet
+from nscholia.http_client import HttpClientManager
+from nscholia.probe_service import ProbeService
+from nscholia.probe_store import ProbeStore
+from nscholia.scheduler import ConcurrencyLimits
+
+
+@dataclass
+class SweepRecord:
+    """
+    the outcome of probing a single target in a sweep
+    """
+
+    kind: str
+    key: str
+    url: str = ""
+    ok: bool = False
+    status_code: int = 0
+    latency: float = 0.0
+    attempts: int = 1
+    error: Optional[str] = None
+    # triple count of an endpoint
+    triples: Optional[int] = None
+
+    @classmethod
+    def from_result(cls, kind: str, key: str, result: Any) -> "SweepRecord":
+        """
+        create a record from the given probe result
+
+        Args:
+            kind: endpoints, backends or examples
+            key: the key of the target
+            result: the probe result - None if the probe failed
+        """
+        record = cls(kind=kind, key=key)
+        if result is None:
+            record.error = "probe failed"
+        elif kind == "backends":
+            record.url = result.backend.url
+            record.ok = result.success
+            record.latency = result.latency
+            record.error = result.error
+        else:
+            status = result.status if kind == "endpoints" else result
+            record.url = status.url
+            record.ok = status.is_online
+            record.status_code = status.status_code
+            record.latency = status.latency
+            record.attempts = status.attempts
+            record.error = status.error or None
+            if kind == "endpoints":
+                update_state = result.update_state
+                if update_state is not None and update_state.success:
+                    record.triples = update_state.triples
+                elif record.ok:
+                    record.error = result.error or (
+                        update_state.error if update_state else None
+                    )
+        return record
+
+
+@dataclass
+class SweepReport:
+    """
+    the records of a sweep with its throughput and regressions
+    """
+
+    kind: str
+    records: List[SweepRecord] = field(default_factory=list)
+    duration: float = 0.0
+    # failed targets that were ok in the baseline - or all failed targets
+    # if there is no baseline
+    regressions: List[SweepRecord] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        failed = sum(1 for record in self.records if not record.ok)
+        return failed
+
+    @property
+    def throughput(self) -> float:
+        """
+        the number of probed targets per second
+        """
+        throughput = len(self.records) / self.duration if self.duration > 0 else 0.0
+        return throughput
+
+    def find_regressions(self, baseline: Optional[Dict[str, bool]] = None):
+        """
+        find the failed targets that were ok in the given baseline
+
+        Args:
+            baseline: ok by key of an earlier sweep - if None every
+                failed target is a regression
+        """
+        self.regressions = [
+            record
+            for record in self.records
+            if not record.ok and (baseline is None or baseline.get(record.key, False))
+        ]
+
+    @staticmethod
+    def load_baseline(path: str) -> Optional[Dict[str, bool]]:
+        """
+        load ok by key from the JSON output of an earlier sweep
+
+        Returns:
+            the baseline or None if the file does not exist
+        """
+        baseline = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as json_file:
+                sweep_record = json.load(json_file)
+            baseline = {
+                record["key"]: record.get("ok", False)
+                for record in sweep_record.get("records", [])
+            }
+        return baseline
+
+    def summary(self) -> str:
+        """
+        get a one line summary of the sweep
+        """
+        summary = (
+            f"{self.kind}: {len(self.records)} checked, {self.failed} failed, "
+            f"{len(self.regressions)} regressions in {self.duration:.1f} s "
+            f"({self.throughput:.1f}/s)"
+        )
+        return summary
+
+    def write(self, path: str, format: Optional[str] = None):
+        """
+        write the records to the given path
+
+        Args:
+            path: the output file
+            format: json or csv - default: derived from the file extension
+        """
+        if format is None:
+            format = "csv" if path.lower().endswith(".csv") else "json"
+        with open(path, "w", encoding="utf-8", newline="") as out_file:
+            if format == "csv":
+                field_names = [f.name for f in fields(SweepRecord)]
+                writer = csv.DictWriter(out_file, fieldnames=field_names)
+                writer.writeheader()
+                for record in self.records:
+                    writer.writerow(asdict(record))
+            else:
+                sweep_record = {
+                    "kind": self.kind,
+                    "timestamp": time.time(),
+                    "duration": round(self.duration, 3),
+                    "throughput": round(self.throughput, 3),
+                    "failed": self.failed,
+                    "regressions": [record.key for record in self.regressions],
+                    "records": [asdict(record) for record in self.records],
+                }
+                json.dump(sweep_record, out_file, indent=2)
+
+
+class SweepSources:
+    """
+    the sources of the probe targets - stands in for the webserver
+    the ProbeService usually gets its sheet and backends from
+    """
+
+    def __init__(self, sheet=None, backends=None):
+        self.sheet = sheet
+        self.backends = backends
+
+
+class Sweep:
+    """
+    probe all targets of a kind with high concurrency and collect a report
+    """
+
+    def __init__(self, kind: str, probe_service: ProbeService):
+        """
+        constructor
+
+        Args:
+            kind: endpoints, backends or examples
+            probe_service: the probe service to use
+        """
+        if kind not in ProbeService.KINDS:
+            raise ValueError(
+                f"invalid kind {kind} - must be one of {ProbeService.KINDS}"
+            )
+        self.kind = kind
+        self.probe_service = probe_service
+
+    async def run(
+        self,
+        targets: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        on_record: Optional[Callable[[SweepRecord], None]] = None,
+    ) -> SweepReport:
+        """
+        run the sweep
+
+        Args:
+            targets: optional targets by key - default: all configured targets
+            timeout: optional request timeout in seconds
+            on_record: optional callback per finished target
+
+        Returns:
+            the report with the records in order of completion
+        """
+        report = SweepReport(kind=self.kind)
+        start_time = time.perf_counter()
+        results = self.probe_service.stream(self.kind, targets, timeout=timeout)
+        async for key, result in results:
+            record = SweepRecord.from_result(self.kind, key, result)
+            report.records.append(record)
+            if on_record is not None:
+                on_record(record)
+        report.duration = time.perf_counter() - start_time
+        return report
+
+
+class SweepCmd:
+    """
+    command line interface for headless sweeps
+    """
+
+    def get_arg_parser(self) -> ArgumentParser:
+        """
+        get the argument parser
+        """
+        parser = ArgumentParser(
+            prog="nicescholia-sweep",
+            description="check Scholia examples, backends or SPARQL endpoints without the web UI",
+        )
+        parser.add_argument("kind", choices=ProbeService.KINDS, help="what to check")
+        parser.add_argument(
+            "-o",
+            "--output",
+            help="write the results to this file - .csv for CSV, JSON otherwise",
+        )
+        parser.add_argument(
+            "--format", choices=["json", "csv"], help="format of the output file"
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON output of an earlier sweep - only targets that were ok there count as regressions (may be the same file as --output)",
+        )
+        parser.add_argument("--timeout", type=float, help="request timeout in seconds")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="maximum concurrent requests (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--per-host",
+            dest="per_host",
+            type=int,
+            default=6,
+            help="maximum concurrent requests per host (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--backend",
+            help="check the examples on the backend with this key instead of their original host",
+        )
+        parser.add_argument(
+            "--sheet-id",
+            dest="sheet_id",
+            default=GoogleSheet.SCHOLIA_EXAMPLES_SHEET_ID,
+            help="Google Sheet ID for Scholia examples",
+        )
+        parser.add_argument(
+            "--sheet-gid",
+            dest="sheet_gid",
+            type=int,
+            default=0,
+            help="Google Sheet GID (tab id), default: 0",
+        )
+        parser.add_argument(
+            "--store",
+            action="store_true",
+            help="record the results in the persistent probe history",
+        )
+        parser.add_argument(
+            "-q", "--quiet", action="store_true", help="only print the summary"
+        )
+        return parser
+
+    def get_sources(self, args) -> SweepSources:
+        """
+        load the sheet and backends needed for the given kind
+        """
+        sources = SweepSources()
+        if args.kind == "backends" or args.backend:
+            sources.backends = Backends.from_yaml_path()
+        if args.kind == "examples":
+            sources.sheet = GoogleSheet(sheet_id=args.sheet_id, gid=args.sheet_gid)
+            sources.sheet.as_lod()
+        return sources
+
+    def get_targets(self, args, sources: SweepSources) -> Optional[Dict[str, Any]]:
+        """
+        get the example urls rewritten to the selected backend
+        - None for all configured targets
+        """
+        targets = None
+        if args.kind == "examples" and args.backend:
+            backend = sources.backends.backends.get(args.backend)
+            if backend is None:
+                raise ValueError(
+                    f"unknown backend {args.backend} - must be one of {list(sources.backends.backends)}"
+                )
+            index = ExampleIndex.for_sheet(sources.sheet)
+            targets = {url: url for url in index.urls_for(backend.url).values()}
+        return targets
+
+    async def sweep(self, args) -> SweepReport:
+        """
+        run the sweep for the given arguments
+        """
+        sources = self.get_sources(args)
+        targets = self.get_targets(args, sources)
+        store = None
+        if args.store:
+            store = ProbeStore(batch_size=0)
+        probe_service = ProbeService(sources, store=store)
+        probe_service.config.limits = ConcurrencyLimits(
+            max_concurrency=args.concurrency, max_per_host=args.per_host
+        )
+
+        def show(record: SweepRecord):
+            if not args.quiet:
+                state = (
+                    "OK" if record.ok else f"FAIL {record.error or record.status_code}"
+                )
+                print(f"{record.latency:7.3f} s {state:<10} {record.key}")
+
+        try:
+            report = await Sweep(args.kind, probe_service).run(
+                targets, timeout=args.timeout, on_record=show
+            )
+        finally:
+            await probe_service.stop()
+            await HttpClientManager.close()
+        return report
+
+    def main(self, argv: Optional[List[str]] = None) -> int:
+        """
+        run a sweep
+
+        Returns:
+            0 if ok, 1 if there are regressions, 2 on errors
+        """
+        args = self.get_arg_parser().parse_args(argv)
+        try:
+            baseline = None
+            if args.baseline:
+                baseline = SweepReport.load_baseline(args.baseline)
+            report = asyncio.run(self.sweep(args))
+            report.find_regressions(baseline)
+            if args.output:
+                report.write(args.output, args.format)
+        except Exception as ex:
+            print(f"sweep failed: {ex}", file=sys.stderr)
+            return 2
+        print(report.summary())
+        for record in report.regressions:
+            print(f"regression: {record.key} {record.error or record.status_code}")
+        exit_code = 1 if report.regressions else 0
+        return exit_code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    exit_code = SweepCmd().main(argv)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+simple in-memory cache with time to live
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional
+
+
+@dataclass
+class CacheEntry:
+    """
+    a cached value with the time it was stored
+    """
+
+    value: Any
+    ttl: float
+    timestamp: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        """
+        the age of this entry in seconds
+        """
+        age = time.monotonic() - self.timestamp
+        return age
+
+    @property
+    def is_fresh(self) -> bool:
+        """
+        is this entry still within its time to live?
+        """
+        fresh = self.age < self.ttl
+        return fresh
+
+
+class TtlCache:
+    """
+    thread safe key value cache where each entry expires after its time to live
+    """
+
+    def __init__(self, default_ttl: float = 60.0):
+        """
+        constructor
+
+        Args:
+            default_ttl: the default time to live in seconds
+        """
+        self.default_ttl = default_ttl
+        self.entries: Dict[Hashable, CacheEntry] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        get the entry for the given key - fresh or stale
+
+        Args:
+            key: the key to look up
+
+        Returns:
+            CacheEntry: the entry or None if there is none
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        return entry
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        get the value for the given key if it is fresh
+
+        Args:
+            key: the key to look up
+            max_age: optional maximum age in seconds overriding the entry's ttl
+
+        Returns:
+            the cached value or None if missing or expired
+        """
+        entry = self.get_entry(key)
+        value = None
+        if entry is not None:
+            fresh = entry.is_fresh if max_age is None else entry.age < max_age
+            if fresh:
+                value = entry.value
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        store the given value
+
+        Args:
+            key: the key to store the value for
+            value: the value to store
+            ttl: time to live in seconds - default: the cache's default_ttl
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        with self.lock:
+            self.entries[key] = CacheEntry(value=value, ttl=ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        remove the entry for the given key or all entries if no key is given
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
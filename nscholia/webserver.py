@@ -1,26 +1,48 @@
 """
 Webserver definition
+
+The dashboards and the SPARQL endpoint handling with snapquery and lodstorage
+are imported on first use to keep the startup of the server fast.
 """
 
+import asyncio
+import json
+import logging
+import sys
+import time
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import asdict
-from typing import Any, Dict, List
+from contextlib import AsyncExitStack
+from dataclasses import asdict, replace
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from ngwidgets.input_webserver import InputWebserver, InputWebSolution, WebserverConfig
-from nicegui import Client, app, ui
+from nicegui import Client, app, run, ui
+from starlette.background import BackgroundTask
 
+from nscholia.api_limits import ApiLimits, RouteLimiter
 from nscholia.backend import Backends
-from nscholia.backend_dashboard import BackendDashboard
-from nscholia.endpoint_dashboard import EndpointDashboard
-from nscholia.endpoints import Endpoints, UpdateState
-from nscholia.examples_dashboard import ExampleDashboard
 from nscholia.google_sheet import GoogleSheet
+from nscholia.http_client import HttpClientManager
+from nscholia.metrics import LoopLagMonitor, Metrics
+from nscholia.monitor import StatusResult
+from nscholia.probe_service import EndpointProbe, ProbeService
+from nscholia.probe_store import ProbeStore
 from nscholia.version import Version
 
+logger = logging.getLogger(__name__)
+
 # Endpoint fields that must never be exposed via the REST API (credentials/
 # internal connection details) - see SECURITY handling for /api/endpoints.
 ENDPOINT_SECRET_FIELDS = {"auth", "user", "password", "host", "port"}
 
+# media types of the streaming probe responses by format
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
 
 def compact(record: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -29,11 +51,40 @@ def compact(record: Dict[str, Any]) -> Dict[str, Any]:
     return {key: value for key, value in record.items() if value is not None}
 
 
+def status_record(status: StatusResult) -> Dict[str, Any]:
+    """
+    get the JSON record of the given status result without a captured body
+    """
+    record = compact(asdict(replace(status, response=None)))
+    return record
+
+
+def endpoint_update_state(name: str, endpoint_probe: EndpointProbe):
+    """
+    get the update state of the given endpoint probe - for an offline
+    or failed probe an unsuccessful UpdateState with the error
+    """
+    from nscholia.endpoints import UpdateState
+
+    update_state = endpoint_probe.update_state
+    if update_state is None:
+        update_state = UpdateState(
+            endpoint_name=name,
+            error=endpoint_probe.error
+            or endpoint_probe.status.error
+            or f"HTTP {endpoint_probe.status.status_code}",
+        )
+    return update_state
+
+
 class ScholiaWebserver(InputWebserver):
     """
     The main webserver class
     """
 
+    # worker threads of the default executor used by asyncio.to_thread
+    EXECUTOR_WORKERS = 16
+
     @classmethod
     def get_config(cls) -> WebserverConfig:
         config = WebserverConfig(
@@ -51,20 +102,45 @@ class ScholiaWebserver(InputWebserver):
         super().__init__(config=ScholiaWebserver.get_config())
         self.sheet = None
         self.backends = None
-        self.endpoints = None
+        # background probes with results shared by all sessions and the API
+        # and a persistent history of the results
+        self.probe_service = ProbeService(self, store=ProbeStore(batch_size=0))
+        # loads the sheet and backends after the server accepts connections
+        self.preload_task: Optional[asyncio.Task] = None
+        # instrumentation exposed at /metrics
+        self.metrics = Metrics.get_instance()
+        self.lag_monitor = LoopLagMonitor(self.metrics)
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # per route concurrency limits of the REST API
+        self.api_limits = ApiLimits()
+        self.route_limiters: Dict[str, RouteLimiter] = {}
+        # the routes and hooks on the global NiceGUI app outlive this instance
+        # e.g. in tests - they resolve the current instance on each call
+        app.state.scholia_webserver = self
         version = self.config.version
         # OpenAPI metadata so /docs shows nicescholia instead of FastAPI defaults
         app.title = version.name
         app.version = version.version
         app.description = version.description
+        if not getattr(app.state, "scholia_hooks", False):
+            app.state.scholia_hooks = True
+            app.on_startup(ScholiaWebserver.on_startup)
+            app.on_shutdown(ScholiaWebserver.on_shutdown)
+            # release the pooled connections of the shared probe client
+            app.on_shutdown(HttpClientManager.close)
+            self.metrics.add_collector(ScholiaWebserver.on_collect)
 
         @ui.page("/examples")
         async def examples(client: Client):
-            return await self.page(client, ScholiaSolution.examples)
+            return await ScholiaWebserver.current().page(
+                client, ScholiaSolution.examples
+            )
 
         @ui.page("/backends")
         async def backends(client: Client):
-            return await self.page(client, ScholiaSolution.backends)
+            return await ScholiaWebserver.current().page(
+                client, ScholiaSolution.backends
+            )
 
         @app.get("/api/version", tags=["nicescholia"])
         def api_version() -> Dict[str, Any]:
@@ -83,86 +159,275 @@ class ScholiaWebserver(InputWebserver):
             return version_record
 
         @app.get("/api/backends", tags=["nicescholia"])
-        def api_backends(probe: bool = False, timeout: float = 2.0) -> Dict[str, Any]:
+        async def api_backends(
+            probe: bool = False,
+            timeout: Optional[float] = None,
+            max_age: Optional[float] = None,
+        ) -> Dict[str, Any]:
             """
             Get the configured Scholia mirror backends.
 
             Args:
                 probe: if true, live-enrich each backend from its /backend
-                    endpoint (concurrently) - mirrors the /backends GUI dashboard.
-                timeout: per-backend request timeout in seconds when probing.
+                    endpoint from the shared probe results - mirrors the
+                    /backends GUI dashboard.
+                timeout: optional request timeout in seconds per backend.
+                max_age: maximum age in seconds of a probe result to be
+                    considered fresh - older results are returned and
+                    re-probed in the background, missing ones are probed
+                    concurrently (default: the probe interval).
 
             Returns:
                 mapping of backend key to its config; None fields are omitted
                 to avoid null-noise (raw config has most fields unset).
             """
-            return self.get_backends_record(probe=probe, timeout=timeout)
+            ws = ScholiaWebserver.current()
+            async with ws.limiter("backends").slot():
+                return await ws.get_backends_record(
+                    probe=probe, timeout=timeout, max_age=max_age
+                )
 
         @app.get("/api/endpoints", tags=["nicescholia"])
-        def api_endpoints(probe: bool = False) -> Dict[str, Any]:
+        async def api_endpoints(
+            probe: bool = False, max_age: Optional[float] = None
+        ) -> Dict[str, Any]:
             """
             Get the configured SPARQL endpoints - REST counterpart of the
             endpoint (home) dashboard.
 
             Args:
                 probe: if true, add the live UpdateState (triples, timestamp)
-                    per endpoint - this runs SPARQL queries and is slow.
+                    per endpoint from the shared probe results.
+                max_age: maximum age in seconds of a probe result to be
+                    considered fresh - older results are returned and
+                    re-probed in the background, missing ones are probed
+                    concurrently (default: the probe interval).
 
             Returns:
                 mapping of endpoint key to a credential-stripped record; when
-                probing, an "update_state" object is added per endpoint.
+                probing, an "update_state" object and the "probe_age" in seconds
+                are added per endpoint.
             """
-            return self.get_endpoints_record(probe=probe)
+            ws = ScholiaWebserver.current()
+            async with ws.limiter("endpoints").slot():
+                return await ws.get_endpoints_record(probe=probe, max_age=max_age)
 
         @app.get("/api/examples", tags=["nicescholia"])
-        def api_examples() -> List[Dict[str, Any]]:
+        async def api_examples() -> List[Dict[str, Any]]:
             """
             Get the Scholia example queries - REST counterpart of the
             examples dashboard. Returns an empty list if the source Google
             Sheet is not loaded.
             """
-            return self.get_examples_record()
+            ws = ScholiaWebserver.current()
+            async with ws.limiter("examples").slot():
+                return ws.get_examples_record()
+
+        @app.get("/metrics", tags=["nicescholia"], response_class=PlainTextResponse)
+        def metrics() -> PlainTextResponse:
+            """
+            Get the event loop lag, executor queue depth, in-flight probes per
+            host, probe latency histograms, cache hit counts, grid update bytes
+            and connected clients in the Prometheus text format.
+            """
+            ws = ScholiaWebserver.current()
+            response = PlainTextResponse(
+                ws.metrics.expose(), media_type="text/plain; version=0.0.4"
+            )
+            return response
+
+        @app.get("/api/stats/{kind}", tags=["nicescholia"])
+        async def api_stats(
+            kind: str, window: float = 86400.0, target: Optional[str] = None
+        ) -> Dict[str, Any]:
+            """
+            Get latency percentiles, error rate and uptime per target
+            from the pre-aggregated probe history.
+
+            Args:
+                kind: endpoints, backends or examples
+                window: the time window in seconds up to now (default: one day)
+                target: optional single target key
+
+            Returns:
+                the window and a mapping of target key to its statistics
+            """
+            ws = ScholiaWebserver.current()
+            if kind not in ProbeService.KINDS:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"unknown kind {kind} - must be one of {ProbeService.KINDS}",
+                )
+            async with ws.limiter("stats").slot():
+                return await ws.get_stats_record(kind, window=window, target=target)
+
+        @app.get("/api/endpoints/probe/stream", tags=["nicescholia"])
+        async def api_endpoints_probe_stream(
+            format: str = "ndjson",
+            timeout: Optional[float] = None,
+            max_age: Optional[float] = None,
+        ) -> StreamingResponse:
+            """
+            Probe the SPARQL endpoints and stream one record per endpoint
+            as soon as its probe has finished.
+
+            Args:
+                format: ndjson (one JSON object per line) or sse (Server-Sent Events)
+                timeout: optional request timeout in seconds
+                max_age: if set, fresh shared probe results of at most this age
+                    in seconds are sent first and only the other endpoints are probed
 
-    def get_backends_record(
-        self, probe: bool = False, timeout: float = 2.0
+            Returns:
+                per endpoint its key, "status" and "update_state"
+            """
+            ws = ScholiaWebserver.current()
+            return await ws.stream_response(
+                "endpoints", format, timeout=timeout, max_age=max_age
+            )
+
+        @app.get("/api/backends/probe/stream", tags=["nicescholia"])
+        async def api_backends_probe_stream(
+            format: str = "ndjson",
+            timeout: Optional[float] = None,
+            max_age: Optional[float] = None,
+        ) -> StreamingResponse:
+            """
+            Fetch the /backend config of the Scholia mirrors and stream one
+            record per backend as soon as it has answered.
+
+            Args:
+                format: ndjson (one JSON object per line) or sse (Server-Sent Events)
+                timeout: optional request timeout in seconds
+                max_age: if set, fresh shared probe results of at most this age
+                    in seconds are sent first and only the other backends are probed
+            """
+            ws = ScholiaWebserver.current()
+            return await ws.stream_response(
+                "backends", format, timeout=timeout, max_age=max_age
+            )
+
+        @app.get("/api/examples/check/stream", tags=["nicescholia"])
+        async def api_examples_check_stream(
+            format: str = "ndjson",
+            timeout: Optional[float] = None,
+            max_age: Optional[float] = None,
+        ) -> StreamingResponse:
+            """
+            Check the links of the Scholia examples and stream one StatusResult
+            record per link as soon as its check has finished.
+
+            Args:
+                format: ndjson (one JSON object per line) or sse (Server-Sent Events)
+                timeout: optional request timeout in seconds
+                max_age: if set, fresh shared check results of at most this age
+                    in seconds are sent first and only the other links are checked
+            """
+            ws = ScholiaWebserver.current()
+            return await ws.stream_response(
+                "examples", format, timeout=timeout, max_age=max_age
+            )
+
+    @staticmethod
+    def current() -> "ScholiaWebserver":
+        """
+        get the webserver instance serving the routes - the latest one created
+        """
+        webserver = app.state.scholia_webserver
+        return webserver
+
+    @staticmethod
+    def on_startup():
+        """
+        start the background work of the current instance
+        """
+        ScholiaWebserver.current().start_background()
+
+    @staticmethod
+    async def on_shutdown():
+        """
+        stop the background work of the current instance
+        """
+        await ScholiaWebserver.current().stop_background()
+
+    @staticmethod
+    def on_collect(metrics: Metrics):
+        """
+        set the gauges of the current instance before an exposition
+        """
+        ScholiaWebserver.current().collect_metrics(metrics)
+
+    def limiter(self, route: str) -> RouteLimiter:
+        """
+        get the concurrency limiter of the given API route
+        """
+        limiter = self.route_limiters.get(route)
+        if limiter is None:
+            limiter = RouteLimiter(route, self.api_limits.routes[route])
+            self.route_limiters[route] = limiter
+        return limiter
+
+    async def get_backends_record(
+        self,
+        probe: bool = False,
+        timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Build the /api/backends response.
 
         Args:
             probe: live-enrich each backend from its /backend endpoint.
-            timeout: per-backend request timeout in seconds when probing.
+            timeout: optional request timeout in seconds per backend.
+            max_age: maximum age in seconds of a fresh probe result.
         """
         if self.backends is None:
-            self.backends = Backends.from_yaml_path()
-        backends = self.backends.backends
+            self.backends = await asyncio.to_thread(Backends.from_yaml_path)
+        backends = dict(self.backends.backends)
         if probe and backends:
-            with ThreadPoolExecutor(max_workers=len(backends)) as executor:
-                for backend in backends.values():
-                    executor.submit(backend.fetch_config, timeout)
+            # concurrent identical requests share the in-flight probes
+            entries = await self.probe_service.get_results(
+                "backends", max_age=max_age, targets=backends, timeout=timeout
+            )
+            for key, entry in entries.items():
+                backend_probe = entry.value
+                if backend_probe is not None and backend_probe.backend is not None:
+                    # the enriched copy of the probe
+                    backends[key] = backend_probe.backend
         backends_record = {
             key: compact(asdict(backend)) for key, backend in backends.items()
         }
         return backends_record
 
-    def get_endpoints_record(self, probe: bool = False) -> Dict[str, Any]:
+    async def get_endpoints_record(
+        self, probe: bool = False, max_age: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         Build the /api/endpoints response with credential fields removed.
 
         Args:
             probe: add the live UpdateState (triples, timestamp) per endpoint.
+            max_age: maximum age in seconds of a fresh probe result.
         """
-        if self.endpoints is None:
-            self.endpoints = Endpoints()
-        endpoints = self.endpoints.get_endpoints()
+        # the first use builds the instance from YAML and the sample database
+        em = await asyncio.to_thread(self.probe_service.get_endpoints)
+        endpoints = em.get_endpoints()
+        entries = {}
+        if probe:
+            # concurrent identical requests share the in-flight probes
+            entries = await self.probe_service.get_results(
+                "endpoints", max_age=max_age, targets=dict(endpoints)
+            )
         endpoints_record = {}
         for key, ep in endpoints.items():
             record = compact(asdict(ep))
             for secret in ENDPOINT_SECRET_FIELDS:
                 record.pop(secret, None)
-            if probe:
-                update_state = UpdateState.from_endpoint(self.endpoints, ep)
+            entry = entries.get(key)
+            if entry is not None:
+                endpoint_probe = entry.value
+                update_state = endpoint_update_state(ep.name, endpoint_probe)
                 record["update_state"] = compact(asdict(update_state))
+                record["probe_age"] = round(entry.age, 1)
             endpoints_record[key] = record
         return endpoints_record
 
@@ -188,6 +453,136 @@ class ScholiaWebserver(InputWebserver):
             )
         return examples
 
+    async def get_stats_record(
+        self, kind: str, window: float = 86400.0, target: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the /api/stats/{kind} response from the probe store rollups.
+
+        Args:
+            kind: endpoints, backends or examples
+            window: the time window in seconds up to now
+            target: optional single target key
+        """
+        end = time.time()
+        start = end - window
+        stats_record = {"kind": kind, "start": start, "end": end, "targets": {}}
+        store = self.probe_service.store
+        if store is not None:
+            # the rollups are read from SQLite
+            stats_by_target = await asyncio.to_thread(
+                store.stats, kind, start, end, target
+            )
+            for key, stats in stats_by_target.items():
+                record = compact(asdict(stats))
+                record["error_rate"] = stats.error_rate
+                record["uptime"] = stats.uptime
+                stats_record["targets"][key] = record
+        return stats_record
+
+    @staticmethod
+    def get_stream_record(kind: str, key: str, result: Any) -> Dict[str, Any]:
+        """
+        get the JSON record of a single streamed probe result
+
+        Args:
+            kind: endpoints, backends or examples
+            key: the key of the target
+            result: the probe result - None if the probe failed
+        """
+        stream_record = {"kind": kind, "key": key}
+        if result is None:
+            stream_record["error"] = "probe failed"
+        elif kind == "endpoints":
+            stream_record["status"] = status_record(result.status)
+            update_state = endpoint_update_state(key, result)
+            stream_record["update_state"] = compact(asdict(update_state))
+        elif kind == "backends":
+            stream_record["success"] = result.success
+            stream_record["latency"] = result.latency
+            if result.error:
+                stream_record["error"] = result.error
+            stream_record["backend"] = compact(asdict(result.backend))
+        else:
+            stream_record.update(status_record(result))
+        return stream_record
+
+    @staticmethod
+    def encode_stream_record(
+        record: Dict[str, Any], format: str, event: str = "result"
+    ) -> str:
+        """
+        encode the given record as an NDJSON line or a Server-Sent Event
+        """
+        data = json.dumps(record, default=str)
+        if format == "sse":
+            text = f"event: {event}\ndata: {data}\n\n"
+        else:
+            text = f"{data}\n"
+        return text
+
+    async def stream_response(
+        self,
+        kind: str,
+        format: str,
+        timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ) -> StreamingResponse:
+        """
+        Build a streaming response with one record per finished probe
+        of the given kind.
+
+        Args:
+            kind: endpoints, backends or examples
+            format: ndjson or sse
+            timeout: optional request timeout in seconds
+            max_age: maximum age in seconds of cached results to send first
+        """
+        media_type = STREAM_MEDIA_TYPES.get(format)
+        if media_type is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"invalid format {format} - must be one of {list(STREAM_MEDIA_TYPES)}",
+            )
+        # acquire the slot before the response starts so that a rejection
+        # is a proper 429/503 - it is held until the stream is finished
+        # and released by the generator or - if the client went away before
+        # the body started - by the background task of the response
+        exit_stack = AsyncExitStack()
+        await exit_stack.enter_async_context(self.limiter("stream").slot())
+        try:
+            # the first use of the endpoints builds them from YAML
+            targets = await asyncio.to_thread(self.probe_service.targets, kind)
+        except BaseException:
+            await exit_stack.aclose()
+            raise
+
+        async def records() -> AsyncIterator[str]:
+            try:
+                count = 0
+                results = self.probe_service.stream(
+                    kind, targets, timeout=timeout, max_age=max_age
+                )
+                async for key, result in results:
+                    count += 1
+                    record = self.get_stream_record(kind, key, result)
+                    yield self.encode_stream_record(record, format)
+                if format == "sse":
+                    # tell EventSource clients not to reconnect
+                    done = {"kind": kind, "count": count}
+                    yield self.encode_stream_record(done, format, event="done")
+            finally:
+                # closing an already closed exit stack does nothing
+                await exit_stack.aclose()
+
+        response = StreamingResponse(
+            records(),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(exit_stack.aclose),
+        )
+        return response
+
     def configure_run(self):
         """
         configure me
@@ -195,19 +590,167 @@ class ScholiaWebserver(InputWebserver):
         super().configure_run()
         self.sheet_id = self.args.sheet_id
         self.sheet_gid = self.args.sheet_gid
-        # Preload sheet on server startup for better performance
-        try:
-            self.sheet = GoogleSheet(sheet_id=self.sheet_id, gid=self.sheet_gid)
-            self.sheet.as_lod()
-            print(f"Preloaded Google Sheet: {len(self.sheet.lod)} rows")
-        except Exception as ex:
-            # Non-fatal: UI can still load/reload on demand
-            print(f"Sheet preload failed: {ex}")
-        # Preload backends on server startup
+        self.api_limits.apply(self.args.api_limits)
+        self.probe_service.configure(
+            intervals=self.args.probe_intervals, timeouts=self.args.probe_timeouts
+        )
+        # the content is preloaded in the background - see start_background
+        self.sheet = GoogleSheet(sheet_id=self.sheet_id, gid=self.sheet_gid)
+
+    def preload(self):
+        """
+        Preload the sheet and backends for better performance
+        """
+        if self.sheet is not None:
+            try:
+                self.sheet.as_lod()
+                logger.info(f"Preloaded Google Sheet: {len(self.sheet.lod)} rows")
+            except Exception as ex:
+                # Non-fatal: UI can still load/reload on demand
+                logger.warning(f"Sheet preload failed: {ex}", exc_info=ex)
         try:
             self.backends = Backends.from_yaml_path()
         except Exception as ex:
-            print(f"Backends preload failed: {ex}")
+            logger.warning(f"Backends preload failed: {ex}", exc_info=ex)
+
+    async def run_background(self):
+        """
+        preload and then start the background probes which need the
+        sheet and the backends as their targets
+        """
+        await asyncio.to_thread(self.preload)
+        self.probe_service.start()
+
+    def start_background(self):
+        """
+        start the preload on server startup without delaying the startup
+        - the server answers requests while the sheet is being fetched
+        """
+        # a named default executor with a known size instead of the implicit
+        # one so that its queue depth can be reported
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.EXECUTOR_WORKERS, thread_name_prefix="nicescholia"
+        )
+        asyncio.get_running_loop().set_default_executor(self.executor)
+        self.lag_monitor.start()
+        self.preload_task = asyncio.ensure_future(self.run_background())
+
+    async def stop_background(self):
+        """
+        stop the preload and the background probes on server shutdown
+        """
+        if self.preload_task is not None and not self.preload_task.done():
+            self.preload_task.cancel()
+        await self.lag_monitor.stop()
+        await self.probe_service.stop()
+
+    @staticmethod
+    def executor_stats(executor) -> Optional[tuple]:
+        """
+        get the queue depth and number of threads of the given ThreadPoolExecutor
+        """
+        stats = None
+        work_queue = getattr(executor, "_work_queue", None)
+        if work_queue is not None:
+            stats = (work_queue.qsize(), len(getattr(executor, "_threads", ())))
+        return stats
+
+    def collect_metrics(self, metrics: Metrics):
+        """
+        set the gauges of the current state before an exposition
+        """
+        in_flight = metrics.gauge(
+            "nicescholia_host_in_flight", "requests in flight per host", ("host",)
+        )
+        limit = metrics.gauge(
+            "nicescholia_host_concurrency_limit",
+            "adaptive concurrency limit per host",
+            ("host",),
+        )
+        throttled = metrics.counter(
+            "nicescholia_host_throttled_total",
+            "requests that had to wait for the throttle of their host",
+            ("host",),
+        )
+        for gauge in [in_flight, limit, throttled]:
+            gauge.clear()
+        for host, throttle in HttpClientManager.host_throttles().items():
+            in_flight.set(throttle.active, host=host)
+            limit.set(throttle.limit, host=host)
+            throttled.set(throttle.throttled, host=host)
+
+        probes_in_flight = metrics.gauge(
+            "nicescholia_probes_in_flight", "probes in flight per kind", ("kind",)
+        )
+        for kind in ProbeService.KINDS:
+            count = sum(
+                1
+                for task_kind, _key in self.probe_service.in_flight
+                if task_kind == kind
+            )
+            probes_in_flight.set(count, kind=kind)
+
+        caches = {
+            f"probe_{kind}": cache for kind, cache in self.probe_service.caches.items()
+        }
+        # only if the endpoints have already been loaded
+        endpoints_module = sys.modules.get("nscholia.endpoints")
+        if endpoints_module is not None:
+            caches["triple_count"] = endpoints_module.Endpoints.count_cache
+        hits = metrics.counter("nicescholia_cache_hits_total", "cache hits", ("cache",))
+        misses = metrics.counter(
+            "nicescholia_cache_misses_total", "cache misses", ("cache",)
+        )
+        hit_ratio = metrics.gauge(
+            "nicescholia_cache_hit_ratio", "cache hits per lookup", ("cache",)
+        )
+        for name, cache in caches.items():
+            hits.set(cache.hits, cache=name)
+            misses.set(cache.misses, cache=name)
+            lookups = cache.hits + cache.misses
+            hit_ratio.set(cache.hits / lookups if lookups else 0.0, cache=name)
+
+        queue_depth = metrics.gauge(
+            "nicescholia_executor_queue_depth",
+            "work items waiting for a thread",
+            ("executor",),
+        )
+        threads = metrics.gauge(
+            "nicescholia_executor_threads", "threads started", ("executor",)
+        )
+        executors = {
+            "default": self.executor,
+            "nicegui_io": getattr(run, "thread_pool", None),
+        }
+        for name, executor in executors.items():
+            stats = self.executor_stats(executor)
+            if stats is not None:
+                queue_depth.set(stats[0], executor=name)
+                threads.set(stats[1], executor=name)
+
+        route_active = metrics.gauge(
+            "nicescholia_api_active", "REST requests being handled", ("route",)
+        )
+        route_waiting = metrics.gauge(
+            "nicescholia_api_waiting", "REST requests waiting for a slot", ("route",)
+        )
+        route_rejected = metrics.counter(
+            "nicescholia_api_rejected_total", "rejected REST requests", ("route",)
+        )
+        for route, limiter in self.route_limiters.items():
+            route_active.set(limiter.active, route=route)
+            route_waiting.set(limiter.waiting, route=route)
+            route_rejected.set(limiter.rejected, route=route)
+
+        clients = metrics.gauge(
+            "nicescholia_connected_clients", "browser sessions with a websocket"
+        )
+        connected = [
+            client
+            for client in list(Client.instances.values())
+            if getattr(client, "has_socket_connection", False)
+        ]
+        clients.set(len(connected))
 
 
 class ScholiaSolution(InputWebSolution):
@@ -244,6 +787,8 @@ class ScholiaSolution(InputWebSolution):
         Examples page using Google Sheet with selector for different dashboards
         """
 
+        from nscholia.examples_dashboard import ExampleDashboard
+
         async def show():
             self.dashboard = ExampleDashboard(self, sheet=self.webserver.sheet)
             self.dashboard.setup_ui()
@@ -255,6 +800,8 @@ class ScholiaSolution(InputWebSolution):
         Backends status page
         """
 
+        from nscholia.backend_dashboard import BackendDashboard
+
         async def show():
             # No path arg needed here, it uses the class default from Backends
             self.dashboard = BackendDashboard(self)
@@ -267,6 +814,8 @@ class ScholiaSolution(InputWebSolution):
         The main page content
         """
 
+        from nscholia.endpoint_dashboard import EndpointDashboard
+
         def show():
             # Instantiate the View Component
             self.endpoint_dashboard = EndpointDashboard(self)
@@ -0,0 +1,247 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+local stand-in for Scholia mirrors and SPARQL endpoints to benchmark
+the probes reproducibly without hitting the live services
+"""
+
+import asyncio
+import json
+import math
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urlparse
+
+
+@dataclass
+class LatencyProfile:
+    """
+    distribution of the simulated server side latency
+    """
+
+    # constant, uniform or lognormal
+    distribution: str = "lognormal"
+    # median latency in seconds
+    median: float = 0.02
+    # spread: sigma of the lognormal or the +/- range of the uniform distribution
+    spread: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        draw a latency in seconds
+        """
+        if self.distribution == "constant":
+            latency = self.median
+        elif self.distribution == "uniform":
+            latency = rng.uniform(
+                max(0.0, self.median - self.spread), self.median + self.spread
+            )
+        else:
+            latency = rng.lognormvariate(math.log(self.median), self.spread)
+        return latency
+
+
+@dataclass
+class FakeServerConfig:
+    """
+    the behaviour of the fake server
+    """
+
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    # fraction of requests answered with 500 Internal Server Error
+    error_rate: float = 0.0
+    # fraction of requests answered with 503 and a Retry-After header
+    overload_rate: float = 0.0
+    # seconds before the first answer on a new connection - stands in
+    # for a slow TLS handshake without the need for certificates
+    handshake_delay: float = 0.0
+    # number of listening ports - each one is a separate host for the
+    # per host limits of the probes
+    hosts: int = 1
+    # size of the HTML page body in bytes
+    body_size: int = 2048
+    triples: int = 123456789
+    seed: int = 42
+
+
+class FakeServer:
+    """
+    minimal HTTP/1.1 keep-alive server on its own thread and event loop
+
+    - /backend answers with the JSON config of a Scholia mirror
+    - ?cmd=stats answers with QLever index statistics
+    - POST requests answer with SPARQL JSON results having a tripleCount
+      and an update timestamp
+    - any other path answers with an HTML page
+    """
+
+    REASONS = {
+        200: "OK",
+        404: "Not Found",
+        500: "Internal Server Error",
+        503: "Service Unavailable",
+    }
+
+    def __init__(self, config: Optional[FakeServerConfig] = None):
+        if config is None:
+            config = FakeServerConfig()
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.ports: List[int] = []
+        self.requests = 0
+        self.connections = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.servers = []
+        self.thread: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+
+    def url(self, index: int, path: str = "") -> str:
+        """
+        get the url of the given path on the host of the given index
+        - indices wrap around the available hosts
+        """
+        port = self.ports[index % len(self.ports)]
+        url = f"http://127.0.0.1:{port}/{path.lstrip('/')}"
+        return url
+
+    def body_for(self, method: str, target: str) -> tuple:
+        """
+        get the content type and body for the given request
+        """
+        parsed = urlparse(target)
+        if parsed.path.rstrip("/").endswith("/backend"):
+            content_type = "application/json"
+            data = {
+                "sparql_endpoint": "https://qlever.example.org/api/wikidata",
+                "sparql_endpoint_name": "fake",
+                "text_to_topic_q_text_enabled": False,
+                "third_parties_enabled": False,
+                "version": "fake-1.0",
+            }
+        elif "cmd=stats" in parsed.query:
+            content_type = "application/json"
+            data = {"num-triples-normal": self.config.triples}
+        elif method == "POST":
+            content_type = "application/sparql-results+json"
+            binding = {
+                "tripleCount": {"type": "literal", "value": str(self.config.triples)},
+                "timestamp": {"type": "literal", "value": "2026-10-16T00:00:00Z"},
+                "updates_complete_until": {
+                    "type": "literal",
+                    "value": "2026-10-16T00:00:00Z",
+                },
+            }
+            data = {
+                "head": {"vars": list(binding)},
+                "results": {"bindings": [binding]},
+            }
+        else:
+            content_type = "text/html"
+            return content_type, b"<html>" + b"x" * self.config.body_size + b"</html>"
+        return content_type, json.dumps(data).encode()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        serve the requests of a single connection
+        """
+        self.connections += 1
+        first = True
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _version = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0") or 0)
+                if length:
+                    await reader.readexactly(length)
+                self.requests += 1
+                delay = self.config.latency.sample(self.rng)
+                if first:
+                    delay += self.config.handshake_delay
+                    first = False
+                await asyncio.sleep(delay)
+                extra_headers = ""
+                roll = self.rng.random()
+                if roll < self.config.error_rate:
+                    status_code, content_type, body = 500, "text/plain", b"error"
+                elif roll < self.config.error_rate + self.config.overload_rate:
+                    status_code, content_type, body = 503, "text/plain", b"overloaded"
+                    extra_headers = "Retry-After: 1\r\n"
+                else:
+                    status_code = 200
+                    content_type, body = self.body_for(method, target)
+                response_head = (
+                    f"HTTP/1.1 {status_code} {self.REASONS[status_code]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"{extra_headers}"
+                    "Connection: keep-alive\r\n\r\n"
+                )
+                writer.write(response_head.encode())
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        for _i in range(self.config.hosts):
+            server = await asyncio.start_server(
+                self.handle, "127.0.0.1", 0, backlog=1024
+            )
+            self.servers.append(server)
+            self.ports.append(server.sockets[0].getsockname()[1])
+        self.ready.set()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.serve())
+        self.loop.run_forever()
+        for server in self.servers:
+            server.close()
+        # end the connections that are still open
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    def start(self) -> "FakeServer":
+        """
+        start serving in a background thread
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout=10)
+        return self
+
+    def stop(self):
+        """
+        stop serving
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_args):
+        self.stop()
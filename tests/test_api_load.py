@@ -0,0 +1,168 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+load test harness for the REST API
+
+run against a live server to compare throughput across versions e.g.
+python tests/test_api_load.py http://localhost:9000 "/api/endpoints?probe=true" 500 50
+"""
+
+import asyncio
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import httpx
+from ngwidgets.webserver_test import WebserverTest
+
+from nscholia.api_limits import ApiLimits, RouteLimit
+from nscholia.cmd import ScholiaCmd
+from nscholia.endpoints import Endpoints, UpdateState
+from nscholia.monitor import StatusResult
+from nscholia.probe_service import EndpointProbe
+from nscholia.webserver import ScholiaWebserver
+
+
+@dataclass
+class LoadResult:
+    """
+    the result of a load test run
+    """
+
+    path: str
+    requests: int
+    concurrency: int
+    duration: float = 0.0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        throughput = self.requests / self.duration if self.duration else 0.0
+        return throughput
+
+    def percentile(self, p: float) -> float:
+        latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(p / 100.0 * len(latencies)))
+        value = latencies[index] if latencies else 0.0
+        return value
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.path}: {self.requests} requests at concurrency {self.concurrency} "
+            f"{self.throughput:.0f} req/s p50 {self.percentile(50)*1000:.1f} ms "
+            f"p99 {self.percentile(99)*1000:.1f} ms status {self.status_counts}"
+        )
+        return text
+
+
+async def run_load(
+    client: httpx.AsyncClient, path: str, requests: int, concurrency: int
+) -> LoadResult:
+    """
+    send the given number of GET requests with the given concurrency
+    """
+    result = LoadResult(path=path, requests=requests, concurrency=concurrency)
+    counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get():
+        async with semaphore:
+            start_time = time.perf_counter()
+            response = await client.get(path)
+            result.latencies.append(time.perf_counter() - start_time)
+            counter[response.status_code] += 1
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[get() for _i in range(requests)])
+    result.duration = time.perf_counter() - start_time
+    result.status_counts = dict(counter)
+    return result
+
+
+class TestApiLoad(WebserverTest):
+    """
+    load tests of the REST API
+    """
+
+    def setUp(self, debug=False, profile=True):
+        WebserverTest.setUp(
+            self, ScholiaWebserver, ScholiaCmd, debug=debug, profile=profile
+        )
+
+    async def load(self, path: str, requests: int, concurrency: int) -> LoadResult:
+        """
+        run a load test in process against the webserver's app
+        """
+        transport = httpx.ASGITransport(app=self.ws.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            result = await run_load(client, path, requests, concurrency)
+        if self.debug:
+            print(result)
+        return result
+
+    def test_endpoints_probe_throughput(self):
+        """
+        test the throughput of /api/endpoints?probe=true served from
+        the shared probe results
+        """
+        ws = self.ws
+        em = Endpoints.get_instance()
+        for key, ep in em.get_endpoints().items():
+            probe = EndpointProbe(
+                status=StatusResult(
+                    endpoint_name=key, url=ep.endpoint, status_code=200
+                ),
+                update_state=UpdateState(endpoint_name=ep.name, success=True),
+            )
+            ws.probe_service.caches["endpoints"].set(key, probe)
+        ws.api_limits.routes["endpoints"] = RouteLimit(
+            max_concurrency=8, max_queue=1000
+        )
+        ws.route_limiters.clear()
+        result = asyncio.run(self.load("/api/endpoints?probe=true", 200, 20))
+        self.assertEqual({200: 200}, result.status_counts)
+
+    def test_backpressure(self):
+        """
+        test that an overloaded route answers with 429/503 instead of queueing
+        """
+
+        async def slow_stats_record(kind, window=86400.0, target=None):
+            await asyncio.sleep(0.2)
+            return {"kind": kind}
+
+        ws = self.ws
+        ws.get_stats_record = slow_stats_record
+        ws.api_limits.routes["stats"] = RouteLimit(
+            max_concurrency=1, max_queue=2, queue_timeout=0.3
+        )
+        ws.route_limiters.clear()
+        result = asyncio.run(self.load("/api/stats/endpoints", 10, 10))
+        counts = result.status_counts
+        self.assertEqual(10, sum(counts.values()))
+        self.assertGreaterEqual(counts.get(200, 0), 1)
+        # beyond the queue limit requests are rejected immediately
+        self.assertGreaterEqual(counts.get(429, 0), 7)
+        self.assertEqual(
+            10, counts.get(200, 0) + counts.get(429, 0) + counts.get(503, 0)
+        )
+        del ws.get_stats_record
+        ws.api_limits = ApiLimits()
+        ws.route_limiters.clear()
+
+
+async def main(base_url: str, path: str, requests: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        result = await run_load(client, path, requests, concurrency)
+    print(result)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])))
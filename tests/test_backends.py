@@ -4,6 +4,7 @@ Created on 2025-12-19
 @author: wf
 """
 
+import asyncio
 from pathlib import Path
 
 from basemkit.basetest import Basetest
@@ -30,3 +31,14 @@ class TestBackends(Basetest):
             backend.fetch_config()
             if self.debug:
                 print(f"{name}:{backend}")
+
+    def test_probe_all(self):
+        """
+        Test probing all backends concurrently under one time budget
+        """
+        backends = Backends.from_yaml_path()
+        results = asyncio.run(backends.probe_all(timeout=5.0))
+        if self.debug:
+            for name, success in results.items():
+                print(f"{name}:{success} {backends.backends[name].version}")
+        self.assertEqual(set(backends.backends.keys()), set(results.keys()))
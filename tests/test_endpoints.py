@@ -4,14 +4,17 @@ Created on 17.12.2025
 @author: wf
 """
 
+import asyncio
 import os
 import traceback
 from pathlib import Path
 
+import httpx
 from basemkit.basetest import Basetest
 from lodstorage.query import Endpoint, QueryManager
 
-from nscholia.endpoints import Endpoints, UpdateState
+from nscholia.endpoints import Endpoints, TripleCountStrategy, UpdateState
+from nscholia.http_client import HttpClientManager
 from tests.action_stats import ActionStats
 
 
@@ -83,3 +86,106 @@ class TestUpdateState(Basetest):
         )
 
         return results_by_endpoint
+
+    def test_triple_count_strategies(self):
+        """
+        test the fallback to the cached expensive count
+        """
+        endpoint = Endpoint()
+        endpoint.name = "test-virtuoso"
+        endpoint.endpoint = "https://example.org/sparql"
+        endpoint.database = "virtuoso"
+        calls = []
+
+        def run_query(query):
+            calls.append(query.name)
+            if query.name == "VoidTripleCount":
+                return [{"tripleCount": None}]
+            return [{"tripleCount": 42}]
+
+        self.em.runQuery = run_query
+        self.em.count_ttl[endpoint.name] = 60.0
+        Endpoints.count_cache.invalidate()
+        for _i in range(2):
+            triples, source = self.em.triple_count_for_endpoint(endpoint)
+            self.assertEqual(42, triples)
+            self.assertEqual("count", source)
+        # the expensive count only ran once
+        self.assertEqual(["VoidTripleCount", "TripleCount", "VoidTripleCount"], calls)
+        self.assertEqual(60.0, self.em.count_ttl_for_endpoint(endpoint))
+
+    def test_update_state_async(self):
+        """
+        test the async update state on the shared client against a mocked QLever
+        """
+        endpoint = Endpoint()
+        endpoint.name = "wikidata-qlever-test"
+        endpoint.endpoint = "https://qlever.example.org/api/wikidata"
+        endpoint.database = "qlever"
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request.method)
+            if request.url.params.get("cmd") == "stats":
+                return httpx.Response(200, json={"num-triples-normal": 12345})
+            bindings = [
+                {
+                    "updates_complete_until": {
+                        "type": "literal",
+                        "value": "2026-10-16T00:00:00Z",
+                    }
+                }
+            ]
+            return httpx.Response(200, json={"results": {"bindings": bindings}})
+
+        async def update_state():
+            HttpClientManager._client = httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            )
+            HttpClientManager._loop = asyncio.get_running_loop()
+            try:
+                return await UpdateState.from_endpoint_async(self.em, endpoint)
+            finally:
+                await HttpClientManager.close()
+
+        state = asyncio.run(update_state())
+        if self.debug:
+            print(state)
+        self.assertTrue(state.success)
+        self.assertEqual(12345, state.triples)
+        self.assertEqual("qlever-stats", state.source)
+        self.assertEqual("2026-10-16T00:00:00Z", state.timestamp)
+        self.assertEqual(["GET", "POST"], requests)
+
+    def test_get_instance(self):
+        """
+        test the process wide Endpoints instance is only rebuilt on changes
+        """
+        em1 = Endpoints.get_instance()
+        em2 = Endpoints.get_instance()
+        self.assertIs(em1, em2)
+        yaml_path = str(Endpoints.yaml_path())
+        stat = os.stat(yaml_path)
+        try:
+            os.utime(yaml_path, (stat.st_atime, stat.st_mtime + 1))
+            em3 = Endpoints.get_instance()
+            self.assertIsNot(em1, em3)
+        finally:
+            os.utime(yaml_path, (stat.st_atime, stat.st_mtime))
+
+    def test_get_query_copies(self):
+        """
+        test that the bound queries share no state with the cached ones
+        and that the abstract strategy can not be used
+        """
+        endpoint = Endpoint()
+        endpoint.name = "test-qlever"
+        endpoint.endpoint = "https://example.org/sparql"
+        query_name = next(iter(self.em.qm.queriesByName))
+        query = self.em.get_query(query_name, endpoint)
+        cached = self.em.qm.queriesByName[query_name]
+        self.assertEqual(endpoint.endpoint, query.endpoint)
+        self.assertIsNot(cached, query)
+        self.assertIsNot(cached.params, query.params)
+        with self.assertRaises(TypeError):
+            TripleCountStrategy()
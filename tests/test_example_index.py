@@ -0,0 +1,69 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+from types import SimpleNamespace
+
+from basemkit.basetest import Basetest
+
+from nscholia.example_index import ExampleIndex
+
+
+class TestExampleIndex(Basetest):
+    """
+    Test the parsed index of the Scholia examples
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.lod = [
+            {"link": "https://qlever.scholia.wiki/author/Q80", "comment": "TBL"},
+            {"link": "", "comment": "no link"},
+            {"link": "https://example.org/other?x=1", "status": "ok"},
+            {"link": "https://qlever.scholia.wiki/author/Q80", "PR": 42},
+        ]
+
+    def test_url_for(self):
+        """
+        test rewriting the example urls for a backend
+        """
+        index = ExampleIndex.from_lod(self.lod)
+        ids = ["/author/Q80", "https://example.org/other?x=1", "/author/Q80@2"]
+        self.assertEqual(ids, list(index.examples_by_id))
+        example = index.examples_by_id["/author/Q80"]
+        self.assertEqual("/author/Q80", example.path)
+        self.assertEqual(
+            "https://scholia.toolforge.org/author/Q80",
+            example.url_for("https://scholia.toolforge.org/"),
+        )
+        self.assertEqual(example.original_link, example.url_for(None))
+        urls = index.urls_for("https://scholia.example.org")
+        # links on other hosts are not rewritten
+        self.assertEqual("https://example.org/other?x=1", urls[ids[1]])
+        self.assertEqual("https://scholia.example.org/author/Q80", urls[ids[2]])
+        self.assertEqual(42, index.examples_by_id[ids[2]].pr)
+
+    def test_stable_ids(self):
+        """
+        test that the ids do not depend on the row position in the sheet
+        """
+        index = ExampleIndex.from_lod(self.lod)
+        inserted = [{"link": "https://qlever.scholia.wiki/work/Q1"}] + self.lod[2:]
+        reloaded = ExampleIndex.from_lod(inserted)
+        for example_id in ["https://example.org/other?x=1", "/author/Q80"]:
+            self.assertEqual(
+                index.examples_by_id[example_id].original_link,
+                reloaded.examples_by_id[example_id].original_link,
+            )
+
+    def test_for_sheet(self):
+        """
+        test that the index is only rebuilt when the sheet content changed
+        """
+        sheet = SimpleNamespace(lod=self.lod, lod_hash="a")
+        index = ExampleIndex.for_sheet(sheet)
+        self.assertIs(index, ExampleIndex.for_sheet(sheet, index))
+        sheet.lod_hash = "b"
+        self.assertIsNot(index, ExampleIndex.for_sheet(sheet, index))
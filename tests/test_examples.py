@@ -6,8 +6,10 @@ Created on 2025-12-19
 
 import asyncio
 import socket
+import tempfile
+import time
 
-import pandas as pd
+import httpx
 from basemkit.basetest import Basetest
 
 from nscholia.google_sheet import GoogleSheet
@@ -74,9 +76,7 @@ class TestExamples(Basetest):
         scholia_links = [
             ex
             for ex in examples
-            if "link" in ex
-            and pd.notna(ex["link"])
-            and "qlever.scholia.wiki" in str(ex["link"])
+            if "link" in ex and ex["link"] and "qlever.scholia.wiki" in str(ex["link"])
         ]
 
         if self.debug:
@@ -85,3 +85,56 @@ class TestExamples(Basetest):
                 print(f"{i}. {example['link']}")
 
         self.assertGreater(len(scholia_links), 100)
+
+    def test_sheet_cache(self):
+        """
+        test that a fresh on-disk copy is used without network access
+        and that unchanged content is not parsed again
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            sheet = GoogleSheet(sheet_id="test-sheet", cache_dir=cache_dir)
+            content = b"link,comment\nhttps://qlever.scholia.wiki/author,\n"
+            sheet.meta = {"fetched": time.time()}
+            sheet.store(content)
+            # a new instance for a cold start from disk
+            sheet = GoogleSheet(sheet_id="test-sheet", cache_dir=cache_dir)
+            self.assertTrue(sheet.is_fresh)
+            lod = sheet.as_lod()
+            self.assertEqual(1, len(lod))
+            self.assertEqual("", lod[0]["comment"])
+            self.assertIs(lod, sheet.parse(content))
+
+    def test_lean_probe(self):
+        """
+        test that the lean probe falls back from HEAD to GET
+        and keeps only compact metadata
+        """
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/old":
+                return httpx.Response(301, headers={"Location": "/author"})
+            if request.method == "HEAD":
+                return httpx.Response(405)
+            return httpx.Response(200, content=b"<html>" + b"x" * 10000)
+
+        async def check(capture_body: bool):
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(
+                transport=transport, follow_redirects=True
+            ) as client:
+                result = await Monitor.check(
+                    "https://scholia.example.org/old",
+                    client=client,
+                    capture_body=capture_body,
+                )
+            return result
+
+        result = asyncio.run(check(capture_body=False))
+        self.assertTrue(result.is_online)
+        self.assertEqual("GET", result.method)
+        self.assertEqual(1, result.redirects)
+        self.assertEqual("https://scholia.example.org/author", result.final_url)
+        self.assertIsNone(result.response)
+        result = asyncio.run(check(capture_body=True))
+        self.assertEqual(10006, result.content_length)
+        self.assertEqual(10006, len(result.response.content))
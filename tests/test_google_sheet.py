@@ -0,0 +1,69 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from basemkit.basetest import Basetest
+
+from nscholia.google_sheet import GoogleSheet
+
+
+class TestGoogleSheet(Basetest):
+    """
+    Test the on-disk cache of the GoogleSheet
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.cache_dir = tempfile.mkdtemp()
+        self.sheet = GoogleSheet("test-sheet", cache_dir=self.cache_dir)
+
+    def test_atomic_store(self):
+        """
+        test that a failing write keeps the previous copy intact
+        and leaves no temporary files behind
+        """
+        self.sheet.store(b"link,comment\nhttps://example.org,first\n")
+        with self.assertRaises(TypeError):
+            self.sheet.write_atomic(self.sheet.csv_path, "not bytes")
+        self.assertEqual(
+            [{"link": "https://example.org", "comment": "first"}],
+            self.sheet.load_cached(),
+        )
+        self.assertEqual(
+            sorted([os.path.basename(self.sheet.csv_path), "test-sheet_0.json"]),
+            sorted(os.listdir(self.cache_dir)),
+        )
+
+    def test_concurrent_as_lod(self):
+        """
+        test that concurrent loads of a stale sheet fetch only once
+        """
+        fetches = []
+        active = threading.Event()
+
+        def fetch(timeout: float = 30.0):
+            if active.is_set():
+                raise RuntimeError("concurrent fetch")
+            active.set()
+            fetches.append(1)
+            time.sleep(0.05)
+            self.sheet.meta = {"fetched": time.time()}
+            self.sheet.store(b"link\nhttps://example.org\n")
+            lod = self.sheet.load_cached()
+            active.clear()
+            return lod
+
+        self.sheet.fetch = fetch
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _i: self.sheet.as_lod(), range(4)))
+        self.assertEqual(1, len(fetches))
+        for lod in results:
+            self.assertEqual([{"link": "https://example.org"}], lod)
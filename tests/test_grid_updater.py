@@ -0,0 +1,47 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+from types import SimpleNamespace
+
+from basemkit.basetest import Basetest
+
+from nscholia.grid_updater import GridUpdater
+
+
+class TestGridUpdater(Basetest):
+    """
+    Test the delta updates of a ListOfDictsGrid
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_flush(self):
+        """
+        test that only the changed rows are sent - once per flush
+        """
+        calls = []
+        ag_grid = SimpleNamespace(
+            run_grid_method=lambda name, *args: calls.append((name, args))
+        )
+        grid = SimpleNamespace(config=SimpleNamespace(key_col="key"), ag_grid=ag_grid)
+        rows = [{"key": f"row{i}", "status": "Pending"} for i in range(100)]
+        updater = GridUpdater(grid, fps=0)
+        updater.flush()
+        self.assertEqual([], calls)
+        for row in rows[:3]:
+            row["status"] = "OK"
+            updater.mark(row)
+        # marking a row twice within a frame sends it once
+        updater.mark(rows[0])
+        updater.flush()
+        updater.flush()
+        self.assertEqual(1, len(calls))
+        name, args = calls[0]
+        self.assertEqual("applyTransaction", name)
+        self.assertEqual({"update": rows[:3]}, args[0])
+        option = GridUpdater.row_id_option("key")
+        self.assertIn("params.data['key']", option[":getRowId"])
@@ -0,0 +1,49 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+
+from basemkit.basetest import Basetest
+
+from nscholia.http_client import HttpClientManager
+
+
+class TestHttpClient(Basetest):
+    """
+    Test the shared pooled http client
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_client_reuse(self):
+        """
+        test that the client is shared within a loop and renewed for a new loop
+        """
+
+        async def get_clients():
+            client1 = HttpClientManager.get_client()
+            client2 = HttpClientManager.get_client()
+            limit1 = HttpClientManager.host_throttle(
+                "https://qlever.scholia.wiki/author"
+            )
+            limit2 = HttpClientManager.host_throttle(
+                "https://qlever.scholia.wiki/venue"
+            )
+            self.assertIs(client1, client2)
+            self.assertIs(limit1, limit2)
+            return client1
+
+        client_a = asyncio.run(get_clients())
+        client_b = asyncio.run(get_clients())
+        self.assertIsNot(client_a, client_b)
+
+        async def close():
+            client = HttpClientManager.get_client()
+            await HttpClientManager.close()
+            self.assertTrue(client.is_closed)
+
+        asyncio.run(close())
@@ -0,0 +1,110 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+from typing import Dict, List
+
+from basemkit.basetest import Basetest
+
+
+class TestImportTime(Basetest):
+    """
+    Test the import time of the entry points with python -X importtime
+    """
+
+    # the web UI import the headless entry points are compared with
+    REFERENCE = "nscholia.webserver"
+    # maximum share of the reference import time by module - relative
+    # so that a loaded CI machine slows down both sides alike
+    BUDGETS = {
+        "nscholia.cmd": 0.25,
+        "nscholia.sweep": 0.5,
+    }
+    # the best of a few runs is taken to smooth out scheduling noise
+    RUNS = 3
+    # modules the headless entry points must not load
+    HEAVY_MODULES = ["nicegui", "ngwidgets", "snapquery", "pandas"]
+
+    def import_times(self, module: str) -> Dict[str, float]:
+        """
+        import the given module in a fresh interpreter
+
+        Returns:
+            the cumulative import time in seconds by imported module
+        """
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        times = {}
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:"):
+                continue
+            parts = line[len("import time:") :].split("|")
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                times[parts[2].strip()] = int(parts[1]) / 1e6
+        return times
+
+    def import_time(self, module: str) -> float:
+        """
+        get the best cumulative import time of the given module in seconds
+        """
+        import_time = min(
+            self.import_times(module)[module] for _run in range(self.RUNS)
+        )
+        return import_time
+
+    def loaded_modules(self, module: str) -> List[str]:
+        """
+        get the names in sys.modules after importing the given module
+        in a fresh interpreter
+        """
+        code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = json.loads(process.stdout.strip().splitlines()[-1])
+        return modules
+
+    def test_import_budget(self):
+        """
+        test that the entry points import within their share
+        of the web UI import time
+        """
+        try:
+            reference_time = self.import_time(self.REFERENCE)
+        except subprocess.CalledProcessError as ex:
+            raise unittest.SkipTest(f"{self.REFERENCE} can not be imported: {ex}")
+        for module, share in self.BUDGETS.items():
+            import_time = self.import_time(module)
+            if self.debug:
+                print(
+                    f"{module}: {import_time:.3f} s / {self.REFERENCE}: {reference_time:.3f} s"
+                )
+            self.assertLessEqual(
+                import_time,
+                share * reference_time,
+                f"import of {module} exceeds {share:.0%} of {self.REFERENCE}",
+            )
+
+    def test_headless_imports(self):
+        """
+        test that the cli entry point and the headless sweep
+        do not load the web UI or snapquery
+        """
+        for module in ["nscholia.cmd", "nscholia.sweep"]:
+            modules = self.loaded_modules(module)
+            for heavy in self.HEAVY_MODULES:
+                self.assertNotIn(heavy, modules, f"{module} imports {heavy}")
@@ -0,0 +1,106 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+import time
+
+from basemkit.basetest import Basetest
+
+from nscholia.metrics import LoopLagMonitor, Metrics
+
+
+class TestMetrics(Basetest):
+    """
+    Test the Prometheus text exposition of the metrics
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        # a fresh registry instead of the process wide one
+        self.metrics = Metrics()
+
+    def test_counter_and_gauge(self):
+        """
+        test counters, gauges, labels and their escaping
+        """
+        counter = self.metrics.counter(
+            "test_requests_total", "requests", ("host", "ok")
+        )
+        counter.inc(host="a.example.org", ok=True)
+        counter.inc(2, host="a.example.org", ok=True)
+        gauge = self.metrics.gauge("test_label", "escaping", ("name",))
+        gauge.set(1.5, name='say "hi"\n')
+        # registering again returns the same metric
+        self.assertIs(counter, self.metrics.counter("test_requests_total", "requests"))
+        text = self.metrics.expose()
+        if self.debug:
+            print(text)
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{host="a.example.org",ok="True"} 3', text)
+        self.assertIn('test_label{name="say \\"hi\\"\\n"} 1.5', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_histogram(self):
+        """
+        test the cumulative buckets, sum and count of a histogram
+        """
+        histogram = self.metrics.histogram(
+            "test_latency_seconds", "latency", ("kind",), buckets=(0.1, 1.0)
+        )
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value, kind="examples")
+        lines = self.metrics.expose().splitlines()
+        for expected in [
+            'test_latency_seconds_bucket{kind="examples",le="0.1"} 2',
+            'test_latency_seconds_bucket{kind="examples",le="1"} 3',
+            'test_latency_seconds_bucket{kind="examples",le="+Inf"} 4',
+            'test_latency_seconds_sum{kind="examples"} 2.65',
+            'test_latency_seconds_count{kind="examples"} 4',
+        ]:
+            self.assertIn(expected, lines)
+
+    def test_collector(self):
+        """
+        test that collectors set their gauges before each exposition
+        and that a failing collector does not break it
+        """
+        calls = []
+
+        def collect(metrics: Metrics):
+            calls.append(metrics)
+            metrics.gauge("test_clients", "clients").set(len(calls))
+
+        def broken(_metrics: Metrics):
+            raise ValueError("broken")
+
+        self.metrics.add_collector(broken)
+        self.metrics.add_collector(collect)
+        self.metrics.expose()
+        text = self.metrics.expose()
+        self.assertIn("test_clients 2", text)
+
+    def test_loop_lag(self):
+        """
+        test that the lag monitor measures a blocking call on the loop
+        """
+
+        async def run():
+            monitor = LoopLagMonitor(self.metrics, interval=0.01)
+            monitor.start()
+            await asyncio.sleep(0.03)
+            # block the loop
+            time.sleep(0.2)
+            await asyncio.sleep(0.03)
+            await monitor.stop()
+            return monitor
+
+        monitor = asyncio.run(run())
+        if self.debug:
+            print(f"max lag: {monitor.max_lag:.3f} s")
+        self.assertGreaterEqual(monitor.max_lag, 0.15)
+        text = self.metrics.expose()
+        self.assertIn("nicescholia_event_loop_lag_seconds_count", text)
+        self.assertIn("# TYPE nicescholia_event_loop_lag_max_seconds gauge", text)
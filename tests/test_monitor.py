@@ -0,0 +1,195 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+
+import httpx
+from basemkit.basetest import Basetest
+
+from nscholia.http_client import HttpClientManager
+from nscholia.monitor import Monitor, RetryPolicy
+from tests.fake_server import FakeServer, FakeServerConfig, LatencyProfile
+
+
+class TestMonitor(Basetest):
+    """
+    Test the retries and hedged requests of the Monitor
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.url = "https://mirror.example.org/author/Q80"
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+
+    def run_check(self, handler, policy: RetryPolicy, timeout: float = 2.0):
+        """
+        check my url against a mock transport with the given handler
+        """
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            result = await Monitor.check(
+                self.url, timeout=timeout, client=client, retry=policy
+            )
+            await client.aclose()
+            return result
+
+        result = asyncio.run(run())
+        return result
+
+    def test_retry(self):
+        """
+        test that 5xx answers and connect failures are retried
+        but other client errors are not
+        """
+        calls = []
+
+        def flaky(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("connection refused", request=request)
+            if len(calls) == 2:
+                return httpx.Response(502)
+            return httpx.Response(200)
+
+        result = self.run_check(flaky, self.policy)
+        self.assertTrue(result.is_online)
+        self.assertEqual(3, result.attempts)
+
+        calls.clear()
+        result = self.run_check(lambda request: httpx.Response(404), self.policy)
+        self.assertEqual(404, result.status_code)
+        self.assertEqual(1, result.attempts)
+
+        # connect failures only retried if asked for
+        def refused(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        result = self.run_check(refused, self.policy)
+        self.assertEqual("connect", result.error_kind)
+        self.assertEqual(3, result.attempts)
+        policy = RetryPolicy(base_delay=0.01, retry_connect=False)
+        result = self.run_check(refused, policy)
+        self.assertEqual(1, result.attempts)
+
+        # a Retry-After longer than the maximum delay is not waited for
+        result = self.run_check(
+            lambda request: httpx.Response(503, headers={"Retry-After": "120"}),
+            self.policy,
+        )
+        self.assertEqual("5xx", result.error_kind)
+        self.assertEqual(1, result.attempts)
+
+    def test_backoff(self):
+        """
+        test the exponential backoff with full jitter
+        """
+        policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+        for retry in range(6):
+            delay = policy.backoff(retry)
+            self.assertGreaterEqual(delay, 0.0)
+            self.assertLessEqual(delay, min(4.0, 0.5 * 2**retry))
+        self.assertEqual(2.0, policy.backoff(0, retry_after=2.0))
+        self.assertIsNone(policy.backoff(0, retry_after=10.0))
+
+    def test_hedge(self):
+        """
+        test that a slow request is hedged by a second one
+        """
+        calls = []
+
+        async def slow_first(request):
+            calls.append(request)
+            # the trace events httpcore sends for a request on the wire
+            trace = request.extensions["trace"]
+            await trace("http11.send_request_headers.started", {})
+            if len(calls) == 1:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200)
+
+        async def run():
+            # seed the latency history of the host: p95 is 0.05 s
+            throttle = HttpClientManager.host_throttle(self.url)
+            for _i in range(throttle.MIN_LATENCY_SAMPLES):
+                throttle.recent.append(0.05)
+            client = httpx.AsyncClient(transport=httpx.MockTransport(slow_first))
+            result = await Monitor.check(
+                self.url, timeout=2.0, client=client, retry=RetryPolicy(hedge=True)
+            )
+            await client.aclose()
+            return result
+
+        result = asyncio.run(run())
+        if self.debug:
+            print(result)
+        self.assertTrue(result.is_online)
+        self.assertTrue(result.hedged)
+        self.assertEqual(2, result.attempts)
+        self.assertLess(result.latency, 1.0)
+
+    def test_no_hedge_while_queued(self):
+        """
+        test that requests waiting for a slot of their host are not hedged
+        and that only the requests actually sent are counted as attempts
+        """
+        config = FakeServerConfig(
+            latency=LatencyProfile(distribution="constant", median=0.05)
+        )
+        with FakeServer(config) as server:
+            url = server.url(0, "author/Q80")
+
+            async def run():
+                policy = RetryPolicy(max_attempts=1, hedge=True)
+                # warm up the latency history of the host
+                for _i in range(
+                    HttpClientManager.host_throttle(url).MIN_LATENCY_SAMPLES
+                ):
+                    await Monitor.check(url, timeout=5.0, retry=policy)
+                requests_before = server.requests
+                results = await asyncio.gather(
+                    *[Monitor.check(url, timeout=5.0, retry=policy) for _i in range(60)]
+                )
+                await HttpClientManager.close()
+                return results, server.requests - requests_before
+
+            results, requests = asyncio.run(run())
+        hedged = sum(1 for result in results if result.hedged)
+        attempts = sum(result.attempts for result in results)
+        if self.debug:
+            print(f"hedged={hedged} attempts={attempts} requests={requests}")
+        self.assertTrue(all(result.is_online for result in results))
+        self.assertEqual(requests, attempts)
+        self.assertLessEqual(hedged, 3)
+
+    def test_single_dns_lookup(self):
+        """
+        test that the timing trace does not resolve the host a second time
+        """
+        with FakeServer() as server:
+            port = server.ports[0]
+            url = f"http://localhost:{port}/author/Q80"
+
+            async def run():
+                loop = asyncio.get_running_loop()
+                lookups = []
+                getaddrinfo = loop.getaddrinfo
+
+                async def counting_getaddrinfo(host, *args, **kwargs):
+                    lookups.append(host)
+                    return await getaddrinfo(host, *args, **kwargs)
+
+                loop.getaddrinfo = counting_getaddrinfo
+                client = httpx.AsyncClient()
+                result = await Monitor.check(url, client=client)
+                await client.aclose()
+                return result, lookups
+
+            result, lookups = asyncio.run(run())
+        if self.debug:
+            print(result, lookups)
+        self.assertTrue(result.is_online)
+        self.assertEqual(1, len(lookups))
+        self.assertGreater(result.connect, 0.0)
@@ -0,0 +1,363 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+
+benchmark of the probing engine against the local FakeServer
+
+the results are appended to a JSON lines file together with the git commit
+so that runs can be compared across commits e.g.
+python -m tests.test_probe_benchmark --sizes 10 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from basemkit.basetest import Basetest
+
+from nscholia.backend import Backend
+from nscholia.http_client import HttpClientManager
+from nscholia.probe_service import ProbeService
+from nscholia.scheduler import ConcurrencyLimits
+from nscholia.sweep import Sweep, SweepSources
+from tests.fake_server import FakeServer, FakeServerConfig, LatencyProfile
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    the measurements of a single benchmark run
+    """
+
+    case: str
+    size: int
+    duration: float = 0.0
+    # probed targets per second
+    throughput: float = 0.0
+    p50_latency: float = 0.0
+    p99_latency: float = 0.0
+    failed: int = 0
+    attempts: int = 0
+    # lateness of a 10 ms timer while the sweep runs
+    max_loop_lag: float = 0.0
+    p99_loop_lag: float = 0.0
+    # growth of the peak resident set size of the process
+    rss_growth_kb: int = 0
+    commit: str = ""
+    timestamp: float = 0.0
+    python: str = platform.python_version()
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.case:9} {self.size:6}: {self.throughput:8.1f}/s "
+            f"p50 {self.p50_latency*1000:7.1f} ms p99 {self.p99_latency*1000:7.1f} ms "
+            f"lag max {self.max_loop_lag*1000:6.1f} ms p99 {self.p99_loop_lag*1000:6.1f} ms "
+            f"rss +{self.rss_growth_kb/1024:6.1f} MB failed {self.failed}"
+        )
+        return text
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    get the given percentile (0-100) of the given values
+    """
+    values = sorted(values)
+    index = min(len(values) - 1, int(p / 100.0 * len(values)))
+    value = values[index] if values else 0.0
+    return value
+
+
+class LoopLagMonitor:
+    """
+    measures the event loop lag as the lateness of a periodic timer
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        while True:
+            start_time = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start_time - self.interval
+            self.lags.append(max(0.0, lag))
+
+    def start(self):
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+
+class ProbeBenchmark:
+    """
+    sweeps Monitor.check (examples), the Backends config fetch and
+    UpdateState.from_endpoint against a FakeServer
+    """
+
+    CASES = ["monitor", "backends", "endpoints"]
+    KIND_BY_CASE = {
+        "monitor": "examples",
+        "backends": "backends",
+        "endpoints": "endpoints",
+    }
+    RESULTS_PATH = os.path.join(
+        str(Path.home()), ".solutions", "nicescholia", "benchmarks", "probes.jsonl"
+    )
+
+    def __init__(self, server: FakeServer, results_path: Optional[str] = None):
+        """
+        constructor
+
+        Args:
+            server: the running fake server
+            results_path: the JSON lines file to store the results in
+        """
+        self.server = server
+        if results_path is None:
+            results_path = self.RESULTS_PATH
+        self.results_path = results_path
+        self.commit = self.get_commit()
+
+    @staticmethod
+    def get_commit() -> str:
+        """
+        get the git commit of the working tree
+        """
+        try:
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                cwd=root,
+                check=True,
+            ).stdout.strip()
+        except Exception:
+            commit = "unknown"
+        return commit
+
+    def targets(self, case: str, size: int) -> Dict[str, Any]:
+        """
+        get the given number of probe targets on the fake server
+        """
+        if case == "monitor":
+            urls = [self.server.url(i, f"author/Q{i}") for i in range(size)]
+            targets = {url: url for url in urls}
+        elif case == "backends":
+            targets = {
+                f"mirror{i}": Backend(url=self.server.url(i, f"mirror{i}"))
+                for i in range(size)
+            }
+        else:
+            from nscholia.endpoints import Endpoints
+
+            em = Endpoints.get_instance()
+            # a QLever Wikidata endpoint has the stats and update state queries
+            template = next(
+                ep
+                for ep in em.get_endpoints().values()
+                if ep.database == "qlever" and "wikidata" in ep.name.lower()
+            )
+            targets = {}
+            for i in range(size):
+                ep = copy.copy(template)
+                ep.name = f"wikidata-fake-{i}"
+                ep.endpoint = self.server.url(i, f"sparql/{i}")
+                ep.website = self.server.url(i, f"ui/{i}")
+                targets[ep.name] = ep
+        return targets
+
+    async def run_case(self, case: str, size: int) -> BenchmarkResult:
+        """
+        sweep the given number of targets of the given case
+        """
+        targets = self.targets(case, size)
+        probe_service = ProbeService(SweepSources())
+        probe_service.config.limits = ConcurrencyLimits(
+            max_concurrency=200, max_per_host=50
+        )
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        lag_monitor = LoopLagMonitor()
+        lag_monitor.start()
+        try:
+            sweep = Sweep(self.KIND_BY_CASE[case], probe_service)
+            report = await sweep.run(targets, timeout=10.0)
+        finally:
+            await lag_monitor.stop()
+            await HttpClientManager.close()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        latencies = [record.latency for record in report.records]
+        result = BenchmarkResult(
+            case=case,
+            size=size,
+            duration=round(report.duration, 3),
+            throughput=round(report.throughput, 1),
+            p50_latency=percentile(latencies, 50),
+            p99_latency=percentile(latencies, 99),
+            failed=report.failed,
+            attempts=sum(record.attempts for record in report.records),
+            max_loop_lag=round(max(lag_monitor.lags, default=0.0), 4),
+            p99_loop_lag=round(percentile(lag_monitor.lags, 99), 4),
+            # ru_maxrss is in KB on Linux
+            rss_growth_kb=rss_after - rss_before,
+            commit=self.commit,
+            timestamp=time.time(),
+        )
+        return result
+
+    def run(self, cases: List[str], sizes: List[int]) -> List[BenchmarkResult]:
+        """
+        run the given cases at the given sizes - smallest first
+        """
+        # the politeness limits are not what is measured here
+        host_rates = HttpClientManager.HOST_RATES
+        HttpClientManager.HOST_RATES = {
+            f"127.0.0.1:{port}": 100000.0 for port in self.server.ports
+        }
+        results = []
+        try:
+            for case in cases:
+                for size in sorted(sizes):
+                    result = asyncio.run(self.run_case(case, size))
+                    results.append(result)
+        finally:
+            HttpClientManager.HOST_RATES = host_rates
+        return results
+
+    def store(self, results: List[BenchmarkResult]):
+        """
+        append the given results to my results file
+        """
+        os.makedirs(os.path.dirname(self.results_path), exist_ok=True)
+        with open(self.results_path, "a", encoding="utf-8") as results_file:
+            for result in results:
+                results_file.write(json.dumps(asdict(result)) + "\n")
+
+    def previous(self, result: BenchmarkResult) -> Optional[Dict[str, Any]]:
+        """
+        get the latest stored result of the same case and size of another commit
+        """
+        previous = None
+        if os.path.exists(self.results_path):
+            with open(self.results_path, encoding="utf-8") as results_file:
+                for line in results_file:
+                    record = json.loads(line)
+                    if (
+                        record["case"] == result.case
+                        and record["size"] == result.size
+                        and record["commit"] != result.commit
+                    ):
+                        previous = record
+        return previous
+
+    def compare(self, result: BenchmarkResult) -> str:
+        """
+        compare the given result with the previous commit's result
+        """
+        previous = self.previous(result)
+        if previous is None or not previous["throughput"]:
+            comparison = "no previous run"
+        else:
+            change = result.throughput / previous["throughput"] - 1.0
+            comparison = f"{change:+.0%} throughput vs {previous['commit']}"
+        return comparison
+
+
+class TestProbeBenchmark(Basetest):
+    """
+    benchmark the probing engine against a local fake server
+    """
+
+    def setUp(self, debug=True, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_benchmark(self):
+        """
+        benchmark small sweeps of all cases without errors
+        """
+        config = FakeServerConfig(
+            latency=LatencyProfile(median=0.01, spread=0.3), hosts=4
+        )
+        cases = ProbeBenchmark.CASES
+        with FakeServer(config) as server, tempfile.TemporaryDirectory() as tmp_dir:
+            benchmark = ProbeBenchmark(
+                server, results_path=os.path.join(tmp_dir, "probes.jsonl")
+            )
+            results = benchmark.run(cases, [10, 100])
+            benchmark.store(results)
+            for result in results:
+                if self.debug:
+                    print(result)
+                self.assertEqual(0, result.failed)
+                self.assertGreater(result.throughput, 0)
+            with open(benchmark.results_path) as results_file:
+                self.assertEqual(len(results), len(results_file.readlines()))
+
+    def test_errors_and_slow_handshake(self):
+        """
+        test that server errors are retried and counted as failures
+        and that a slow handshake shows up in the latency
+        """
+        config = FakeServerConfig(
+            latency=LatencyProfile(distribution="constant", median=0.005),
+            error_rate=1.0,
+            handshake_delay=0.2,
+        )
+        with FakeServer(config) as server:
+            benchmark = ProbeBenchmark(server)
+            result = benchmark.run(["monitor"], [5])[0]
+        if self.debug:
+            print(result)
+        self.assertEqual(5, result.failed)
+        self.assertGreater(result.attempts, 5)
+        self.assertGreaterEqual(result.p99_latency, 0.2)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="benchmark the probing engine")
+    parser.add_argument(
+        "--cases", nargs="+", choices=ProbeBenchmark.CASES, default=ProbeBenchmark.CASES
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--hosts", type=int, default=8, help="number of fake hosts")
+    parser.add_argument(
+        "--median", type=float, default=0.02, help="median latency in s"
+    )
+    parser.add_argument("--spread", type=float, default=0.5, help="lognormal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--overload-rate", type=float, default=0.0)
+    parser.add_argument("--handshake-delay", type=float, default=0.0)
+    parser.add_argument("--results", help="JSON lines file to append the results to")
+    args = parser.parse_args(argv)
+    config = FakeServerConfig(
+        latency=LatencyProfile(median=args.median, spread=args.spread),
+        error_rate=args.error_rate,
+        overload_rate=args.overload_rate,
+        handshake_delay=args.handshake_delay,
+        hosts=args.hosts,
+    )
+    with FakeServer(config) as server:
+        benchmark = ProbeBenchmark(server, results_path=args.results)
+        results = benchmark.run(args.cases, args.sizes)
+    for result in results:
+        print(f"{result} - {benchmark.compare(result)}")
+    benchmark.store(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from basemkit.basetest import Basetest
+
+from nscholia.example_index import ExampleIndex
+from nscholia.monitor import StatusResult
+from nscholia.probe_matrix import ProbeMatrix
+from nscholia.probe_service import ProbeService
+
+
+class TestProbeMatrix(Basetest):
+    """
+    Test the cross mirror comparison matrix
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        lod = [
+            {"link": f"https://qlever.scholia.wiki/{aspect}/Q{i}"}
+            for i, aspect in enumerate(["author", "author", "work", "topic"])
+        ]
+        self.index = ExampleIndex.from_lod(lod)
+        self.backend_urls = {
+            "fast": "https://fast.example.org",
+            "slow": "https://slow.example.org/",
+        }
+        webserver = SimpleNamespace(sheet=None, backends=None)
+        self.probe_service = ProbeService(webserver)
+        self.broken = set()
+        self.active = {}
+        self.max_active = {}
+
+        async def probe_example(url, timeout):
+            host = url.split("/")[2]
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+            latency = 0.01 if host.startswith("fast") else 0.03
+            await asyncio.sleep(latency)
+            self.active[host] -= 1
+            status_code = 500 if url in self.broken else 200
+            return StatusResult(
+                endpoint_name="", url=url, status_code=status_code, latency=latency
+            )
+
+        self.probe_service.probe_example = probe_example
+
+    def sweep(self) -> ProbeMatrix:
+        matrix = ProbeMatrix(self.index, self.backend_urls)
+        asyncio.run(matrix.sweep(self.probe_service, timeout=1.0, max_per_host=2))
+        return matrix
+
+    def test_sweep(self):
+        """
+        test the sweep, the fastest mirror per aspect and the regressions
+        """
+        matrix = self.sweep()
+        self.assertEqual(8, len(matrix.status_codes))
+        self.assertEqual(
+            (200, 0.01), tuple(round(v, 3) for v in matrix.get("/author/Q0", "fast"))
+        )
+        self.assertEqual(
+            "https://slow.example.org/work/Q2", matrix.url("/work/Q2", "slow")
+        )
+        # the per host limit holds for the N×M fan-out
+        self.assertLessEqual(max(self.max_active.values()), 2)
+        fastest = matrix.fastest_by_aspect()
+        self.assertEqual(["author", "topic", "work"], list(fastest))
+        for backend, _median in fastest.values():
+            self.assertEqual("fast", backend)
+        self.assertEqual([], matrix.regressions(None))
+        self.broken.add("https://slow.example.org/topic/Q3")
+        self.probe_service.caches["examples"].invalidate()
+        next_matrix = self.sweep()
+        regressions = next_matrix.regressions(matrix)
+        if self.debug:
+            print(regressions)
+        self.assertEqual(1, len(regressions))
+        self.assertEqual(
+            ("/topic/Q3", "slow", 200, 500),
+            (
+                regressions[0].example_id,
+                regressions[0].backend,
+                regressions[0].previous_status,
+                regressions[0].status,
+            ),
+        )
+
+    def test_regressions_after_sheet_edit(self):
+        """
+        test that a row inserted into the sheet between two sweeps
+        does not shift the comparison to other examples
+        """
+        matrix = self.sweep()
+        lod = [{"link": "https://qlever.scholia.wiki/venue/Q9"}] + [
+            {"link": example.original_link} for example in self.index.examples
+        ]
+        self.index = ExampleIndex.from_lod(lod)
+        self.broken.add("https://slow.example.org/venue/Q9")
+        self.probe_service.caches["examples"].invalidate()
+        next_matrix = self.sweep()
+        # the new example has no previous result to regress from
+        self.assertEqual([], next_matrix.regressions(matrix))
@@ -0,0 +1,188 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from basemkit.basetest import Basetest
+
+from nscholia.backend import Backend
+from nscholia.http_client import HttpClientManager
+from nscholia.probe_service import ProbeService
+from tests.fake_server import FakeServer
+
+
+class TestProbeService(Basetest):
+    """
+    Test the shared background probe service
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        webserver = SimpleNamespace(sheet=None, backends=None)
+        self.probe_service = ProbeService(webserver)
+
+    def test_coalesced_probe(self):
+        """
+        test that concurrent probes of the same target share one computation
+        and that subscribers get the result
+        """
+        calls = []
+        published = []
+
+        async def probe():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def probe_twice():
+            results = await asyncio.gather(
+                self.probe_service.probe_once("examples", "url", probe),
+                self.probe_service.probe_once("examples", "url", probe),
+            )
+            return results
+
+        self.probe_service.subscribe(
+            "examples", lambda key, result: published.append((key, result))
+        )
+        results = asyncio.run(probe_twice())
+        self.assertEqual(["ok", "ok"], results)
+        self.assertEqual(1, len(calls))
+        self.assertEqual([("url", "ok")], published)
+        self.assertEqual("ok", self.probe_service.get_result("examples", "url"))
+
+    def test_stale_while_revalidate(self):
+        """
+        test that missing results are probed, fresh ones are served from the
+        cache and stale ones are served immediately and re-probed in the background
+        """
+        calls = []
+
+        async def probe_example(url, timeout):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return f"result {len(calls)}"
+
+        self.probe_service.probe_example = probe_example
+        targets = {"url": "url"}
+
+        async def get_results():
+            service = self.probe_service
+            missing = await service.get_results("examples", targets=targets)
+            fresh = await service.get_results("examples", max_age=60, targets=targets)
+            concurrent = await asyncio.gather(
+                service.get_results("examples", max_age=0, targets=targets),
+                service.get_results("examples", max_age=0, targets=targets),
+            )
+            await asyncio.gather(*service.background_tasks)
+            revalidated = await service.get_results(
+                "examples", max_age=60, targets=targets
+            )
+            return missing, fresh, concurrent, revalidated
+
+        missing, fresh, concurrent, revalidated = asyncio.run(get_results())
+        self.assertEqual("result 1", missing["url"].value)
+        self.assertEqual("result 1", fresh["url"].value)
+        # the stale result is served and the revalidation is coalesced
+        for entries in concurrent:
+            self.assertEqual("result 1", entries["url"].value)
+        self.assertEqual("result 2", revalidated["url"].value)
+        self.assertEqual(2, len(calls))
+
+    def test_stream(self):
+        """
+        test that streamed results arrive in order of completion
+        and that fresh cached results are sent first without a probe
+        """
+        calls = []
+
+        async def probe_example(url, timeout):
+            calls.append(url)
+            await asyncio.sleep(float(url))
+            return f"result {url}"
+
+        self.probe_service.probe_example = probe_example
+        targets = {"0.05": "0.05", "0.01": "0.01", "0.03": "0.03"}
+
+        async def collect(max_age=None):
+            streamed = []
+            async for key, result in self.probe_service.stream(
+                "examples", targets, max_age=max_age
+            ):
+                streamed.append((key, result))
+            return streamed
+
+        streamed = asyncio.run(collect())
+        self.assertEqual(["0.01", "0.03", "0.05"], [key for key, _ in streamed])
+        self.assertEqual("result 0.01", streamed[0][1])
+        self.assertEqual(3, len(calls))
+        calls.clear()
+        streamed = asyncio.run(collect(max_age=60))
+        self.assertEqual(3, len(streamed))
+        self.assertEqual(0, len(calls))
+
+    def test_backend_probes(self):
+        """
+        test that concurrent backend probes are coalesced and enrich a copy
+        instead of the shared configured backend
+        """
+        with FakeServer() as server:
+            backend = Backend(url=server.url(0, "mirror"))
+
+            async def get_results():
+                targets = {"mirror": backend}
+                results = await asyncio.gather(
+                    *[
+                        self.probe_service.get_results("backends", targets=targets)
+                        for _i in range(5)
+                    ]
+                )
+                await HttpClientManager.close()
+                return results
+
+            results = asyncio.run(get_results())
+            requests = server.requests
+        self.assertEqual(1, requests)
+        probe = results[0]["mirror"].value
+        self.assertTrue(probe.success)
+        self.assertEqual("fake-1.0", probe.backend.version)
+        self.assertIsNone(backend.version)
+        for entries in results:
+            self.assertIs(probe, entries["mirror"].value)
+
+    def test_failing_subscriber_logged(self):
+        """
+        test that a failing subscriber is logged and does not stop the others
+        """
+        published = []
+
+        def broken(key, result):
+            raise ValueError("closed tab")
+
+        self.probe_service.subscribe("examples", broken)
+        self.probe_service.subscribe(
+            "examples", lambda key, result: published.append(key)
+        )
+        with self.assertLogs("nscholia.probe_service", level="WARNING") as logs:
+            self.probe_service.publish("examples", "url", "ok")
+        self.assertIn("probe subscriber failed: closed tab", logs.output[0])
+        self.assertEqual(["url"], published)
+
+    def test_configure(self):
+        """
+        test the command line probe intervals and timeouts
+        """
+        self.probe_service.configure(
+            intervals=["examples=600", "endpoints=0"], timeouts=["backends=5"]
+        )
+        config = self.probe_service.config
+        self.assertEqual(600.0, config.intervals["examples"])
+        self.assertEqual(0.0, config.intervals["endpoints"])
+        self.assertEqual(5.0, config.timeouts["backends"])
+        self.assertEqual(600.0, self.probe_service.caches["examples"].default_ttl)
+        for spec in ["sheet=60", "examples=soon", "examples=-1"]:
+            with self.assertRaises(ValueError):
+                self.probe_service.configure(intervals=[spec])
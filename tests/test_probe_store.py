@@ -0,0 +1,105 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import os
+import tempfile
+import time
+from dataclasses import replace
+
+from basemkit.basetest import Basetest
+
+from nscholia.probe_store import LatencyHistogram, ProbeSample, ProbeStore
+
+
+class TestProbeStore(Basetest):
+    """
+    Test the persistent time series store of probe results
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_histogram(self):
+        """
+        test the relative error of the log bucketed percentiles
+        """
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.add(i / 1000.0)
+        self.assertEqual(1000, histogram.total)
+        for p, expected in [(50, 0.5), (95, 0.95), (99, 0.99)]:
+            value = histogram.percentile(p)
+            self.assertLessEqual(abs(value - expected) / expected, 0.05)
+        restored = LatencyHistogram.from_json(histogram.to_json())
+        self.assertEqual(histogram.counts, restored.counts)
+
+    def test_stats(self):
+        """
+        test recording samples and the statistics over a window
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "probes.db")
+            store = ProbeStore(db_path, batch_size=10)
+            # align to the hour so that the window boundaries match the buckets
+            now = time.time() // 3600 * 3600
+            # two days of one probe per 10 minutes - every 10th probe fails
+            for i in range(288):
+                store.record(
+                    ProbeSample(
+                        kind="endpoints",
+                        target="wikidata",
+                        ok=i % 10 != 0,
+                        latency=0.1 + (i % 5) * 0.1,
+                        status_code=200,
+                        timestamp=now - 2 * 86400 + i * 600,
+                    )
+                )
+            store.close()
+            # reopen to check persistence
+            store = ProbeStore(db_path)
+            hour_stats = store.stats("endpoints", now - 3600, now)
+            day_stats = store.stats("endpoints", now - 86400, now)
+            week_stats = store.stats("endpoints", now - 7 * 86400, now)
+            store.close()
+        stats = day_stats["wikidata"]
+        if self.debug:
+            print(stats)
+        self.assertEqual(3600, stats.resolution)
+        self.assertEqual(144, stats.count)
+        self.assertAlmostEqual(0.9, stats.uptime, delta=0.01)
+        self.assertAlmostEqual(0.1, stats.latency_min, places=3)
+        self.assertAlmostEqual(0.5, stats.latency_max, places=3)
+        self.assertAlmostEqual(0.3, stats.p50, delta=0.3 * 0.05)
+        hour = hour_stats["wikidata"]
+        self.assertEqual(60, hour.resolution)
+        self.assertEqual(6, hour.count)
+        week = week_stats["wikidata"]
+        self.assertEqual(3600, week.resolution)
+        self.assertEqual(288, week.count)
+        self.assertEqual(29, week.errors)
+
+    def test_reopen(self):
+        """
+        test that a closed store is reopened on its next use
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = ProbeStore(os.path.join(tmpdir, "probes.db"), batch_size=0)
+            now = time.time()
+            sample = ProbeSample(
+                kind="backends",
+                target="qlever-scholia",
+                ok=True,
+                latency=0.2,
+                status_code=200,
+                timestamp=now,
+            )
+            store.record(sample)
+            store.close()
+            # e.g. a route of the webserver after a server shutdown
+            store.record(replace(sample, timestamp=now + 1))
+            stats = store.stats("backends", now - 60, now + 60)
+            store.close()
+        self.assertEqual(2, stats["qlever-scholia"].count)
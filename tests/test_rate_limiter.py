@@ -0,0 +1,89 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+import time
+from email.utils import formatdate
+
+from basemkit.basetest import Basetest
+
+from nscholia.rate_limiter import HostThrottle
+
+
+class TestRateLimiter(Basetest):
+    """
+    Test the per host token bucket and adaptive concurrency
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_token_bucket(self):
+        """
+        test that the request rate is limited
+        """
+
+        async def run():
+            throttle = HostThrottle("example.org", rate=50.0, burst=1, initial_limit=10)
+            start = time.monotonic()
+            for _i in range(10):
+                async with throttle.slot() as slot:
+                    slot.report(200, 0.01)
+            return time.monotonic() - start
+
+        duration = asyncio.run(run())
+        if self.debug:
+            print(f"10 requests at 50/s took {duration:.3f} s")
+        # the first token is available immediately
+        self.assertGreaterEqual(duration, 9 / 50.0 * 0.9)
+
+    def test_aimd(self):
+        """
+        test additive increase on healthy latencies, multiplicative decrease
+        on overload and the Retry-After pause
+        """
+
+        async def run():
+            throttle = HostThrottle(
+                "example.org", rate=1000.0, burst=1000, initial_limit=2, max_limit=8
+            )
+            concurrency = []
+
+            async def request(status_code: int, retry_after=None):
+                async with throttle.slot() as slot:
+                    concurrency.append(throttle.active)
+                    await asyncio.sleep(0.001)
+                    slot.report(status_code, 0.01, retry_after)
+
+            await asyncio.gather(*[request(200) for _i in range(50)])
+            grown = throttle.limit
+            max_active = max(concurrency)
+            await request(429, retry_after=0.2)
+            decreased = throttle.limit
+            start = time.monotonic()
+            await request(200)
+            paused = time.monotonic() - start
+            return grown, max_active, decreased, paused
+
+        grown, max_active, decreased, paused = asyncio.run(run())
+        if self.debug:
+            print(grown, max_active, decreased, paused)
+        self.assertEqual(8, grown)
+        self.assertLessEqual(max_active, 8)
+        self.assertEqual(4, decreased)
+        self.assertGreaterEqual(paused, 0.15)
+
+    def test_parse_retry_after(self):
+        """
+        test parsing delay seconds and HTTP dates
+        """
+        self.assertEqual(5.0, HostThrottle.parse_retry_after("5"))
+        self.assertIsNone(HostThrottle.parse_retry_after(None))
+        self.assertIsNone(HostThrottle.parse_retry_after("soon"))
+        retry_after = HostThrottle.parse_retry_after(
+            formatdate(time.time() + 60, usegmt=True)
+        )
+        self.assertAlmostEqual(60, retry_after, delta=2)
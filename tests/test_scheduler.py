@@ -0,0 +1,61 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+
+from basemkit.basetest import Basetest
+
+from nscholia.scheduler import BoundedScheduler, ConcurrencyLimits
+
+
+class TestScheduler(Basetest):
+    """
+    Test the bounded concurrency scheduler
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_sliding_window(self):
+        """
+        test that a slow item does not stall the other slots
+        and that the global and per host limits are honored
+        """
+        limits = ConcurrencyLimits(
+            max_concurrency=4, max_per_host=3, per_host={"slow.example.org": 1}
+        )
+        urls = ["https://slow.example.org/0", "https://slow.example.org/1"]
+        urls += [f"https://fast.example.org/{i}" for i in range(20)]
+        active = {"total": 0, "max": 0}
+        active_by_host = {}
+        max_by_host = {}
+        done = []
+
+        async def work(url):
+            host = BoundedScheduler.host_of(url)
+            active["total"] += 1
+            active["max"] = max(active["max"], active["total"])
+            active_by_host[host] = active_by_host.get(host, 0) + 1
+            max_by_host[host] = max(max_by_host.get(host, 0), active_by_host[host])
+            await asyncio.sleep(0.2 if host.startswith("slow") else 0.01)
+            active["total"] -= 1
+            active_by_host[host] -= 1
+            return url.upper()
+
+        def on_done(url, result, ex):
+            done.append(url)
+
+        scheduler = BoundedScheduler(limits)
+        results = asyncio.run(
+            scheduler.run(urls, work, url_of=lambda url: url, on_done=on_done)
+        )
+        self.assertEqual([url.upper() for url in urls], results)
+        self.assertEqual(len(urls), len(done))
+        self.assertLessEqual(active["max"], 4)
+        self.assertEqual(1, max_by_host["slow.example.org"])
+        self.assertLessEqual(max_by_host["fast.example.org"], 3)
+        # all fast items finish while the slow host is still busy
+        self.assertEqual("https://slow.example.org/1", done[-1])
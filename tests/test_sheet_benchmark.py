@@ -0,0 +1,88 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from basemkit.basetest import Basetest
+
+# runs in a fresh interpreter so that import time and peak RSS are not
+# distorted by modules the test runner already loaded
+BENCHMARK_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from nscholia.google_sheet import GoogleSheet
+if sys.argv[2] == "pandas":
+    import pandas
+import_time = time.perf_counter() - start
+with open(sys.argv[1], "rb") as csv_file:
+    content = csv_file.read()
+start = time.perf_counter()
+if sys.argv[2] == "pandas":
+    lod = GoogleSheet.read_csv_pandas(content)
+else:
+    lod = GoogleSheet.read_csv(content)
+parse_time = time.perf_counter() - start
+# ru_maxrss is in KB on Linux
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rows": len(lod), "import_time": import_time, "parse_time": parse_time, "max_rss_kb": max_rss}))
+"""
+
+
+class TestSheetBenchmark(Basetest):
+    """
+    compare the csv and pandas readers of GoogleSheet
+    by import time, parse time and peak RSS
+    """
+
+    def setUp(self, debug=True, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def run_benchmark(self, csv_path: str, reader: str) -> dict:
+        """
+        run the benchmark script for the given reader in a subprocess
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", BENCHMARK_SCRIPT, csv_path, reader],
+            capture_output=True,
+            text=True,
+            cwd=root,
+            check=True,
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        return stats
+
+    def test_reader_benchmark(self):
+        """
+        benchmark the readers on a synthetic sheet the size of the Scholia examples
+        """
+        readers = ["csv"]
+        if importlib.util.find_spec("pandas") is not None:
+            readers.append("pandas")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as csv_file:
+            csv_file.write("link,comment,status,PR,GitHub ticket 1,error message 1\n")
+            for i in range(5000):
+                csv_file.write(
+                    f"https://qlever.scholia.wiki/author/Q{i},comment {i},ok,{i},,\n"
+                )
+            csv_path = csv_file.name
+        try:
+            for reader in readers:
+                stats = self.run_benchmark(csv_path, reader)
+                if self.debug:
+                    print(
+                        f"{reader:6}: import {stats['import_time']*1000:7.1f} ms "
+                        f"parse {stats['parse_time']*1000:7.1f} ms "
+                        f"peak RSS {stats['max_rss_kb']/1024:6.1f} MB"
+                    )
+                self.assertEqual(5000, stats["rows"])
+        finally:
+            os.remove(csv_path)
@@ -0,0 +1,88 @@
+"""
+Created on 2026-10-16
+
+@author: wf
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from nscholia.monitor import StatusResult
+from nscholia.probe_service import ProbeService
+from nscholia.sweep import Sweep, SweepReport, SweepSources
+
+
+class TestSweep(Basetest):
+    """
+    Test the headless sweeps
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.probe_service = ProbeService(SweepSources())
+        self.broken = {"https://example.org/broken"}
+
+        async def probe_example(url, timeout):
+            await asyncio.sleep(0.01)
+            status_code = 500 if url in self.broken else 200
+            return StatusResult(
+                endpoint_name="", url=url, status_code=status_code, latency=0.01
+            )
+
+        self.probe_service.probe_example = probe_example
+        self.targets = {
+            url: url
+            for url in [
+                "https://example.org/ok",
+                "https://example.org/broken",
+                "https://example.org/new",
+            ]
+        }
+
+    def run_sweep(self) -> SweepReport:
+        """
+        sweep my example targets
+        """
+        sweep = Sweep("examples", self.probe_service)
+        report = asyncio.run(sweep.run(self.targets))
+        if self.debug:
+            print(report.summary())
+        return report
+
+    def test_sweep(self):
+        """
+        test a sweep with and without a baseline
+        """
+        report = self.run_sweep()
+        self.assertEqual(3, len(report.records))
+        self.assertEqual(1, report.failed)
+        self.assertGreater(report.throughput, 0)
+        report.find_regressions()
+        self.assertEqual(
+            ["https://example.org/broken"], [r.key for r in report.regressions]
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, "examples.json")
+            report.write(json_path)
+            with open(json_path) as json_file:
+                sweep_record = json.load(json_file)
+            self.assertEqual(3, len(sweep_record["records"]))
+            csv_path = os.path.join(tmp_dir, "examples.csv")
+            report.write(csv_path)
+            with open(csv_path) as csv_file:
+                self.assertEqual(4, len(csv_file.readlines()))
+            baseline = SweepReport.load_baseline(json_path)
+            self.assertIsNone(
+                SweepReport.load_baseline(os.path.join(tmp_dir, "missing.json"))
+            )
+        # the known broken link is no regression - the newly broken one is
+        self.broken = {"https://example.org/broken", "https://example.org/ok"}
+        report = self.run_sweep()
+        report.find_regressions(baseline)
+        self.assertEqual(
+            ["https://example.org/ok"], [r.key for r in report.regressions]
+        )
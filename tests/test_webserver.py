@@ -4,9 +4,15 @@ Created on 2026-07-18
 @author: wf
 """
 
+import asyncio
+import json
+from dataclasses import replace
+
 from ngwidgets.webserver_test import WebserverTest
 
+from nscholia.backend import Backends
 from nscholia.cmd import ScholiaCmd
+from nscholia.probe_service import BackendProbe
 from nscholia.webserver import ScholiaWebserver
 
 
@@ -35,6 +41,11 @@ class TestScholiaWebserver(WebserverTest):
             "/api/backends",
             "/api/endpoints",
             "/api/examples",
+            "/api/stats/{kind}",
+            "/api/endpoints/probe/stream",
+            "/api/backends/probe/stream",
+            "/api/examples/check/stream",
+            "/metrics",
         ]:
             self.assertIn(path, paths)
 
@@ -63,6 +74,24 @@ class TestScholiaWebserver(WebserverTest):
         for _key, backend in backends_record.items():
             self.assertTrue("url" in backend)
 
+    def test_api_backends_probed(self):
+        """
+        test that /api/backends?probe=true serves the enriched backends of
+        fresh shared probes even if the shared backends were reloaded
+        """
+        ws = self.ws
+        for key, backend in Backends.from_yaml_path().backends.items():
+            enriched = replace(backend, version="probed-1.0")
+            probe = BackendProbe(backend=enriched, success=True)
+            ws.probe_service.caches["backends"].set(key, probe)
+        # fresh unprobed objects as loaded by the backends dashboard
+        ws.backends = Backends.from_yaml_path()
+        response = self.client.get("/api/backends?probe=true")
+        self.assertEqual(200, response.status_code)
+        for key, backend in response.json().items():
+            self.assertEqual("probed-1.0", backend.get("version"), key)
+        ws.probe_service.caches["backends"].invalidate()
+
     def test_api_backends_no_null_noise(self):
         """
         test that /api/backends omits None fields (no null-noise)
@@ -104,3 +133,88 @@ class TestScholiaWebserver(WebserverTest):
         if self.debug:
             print(f"{len(examples_record)} examples")
         self.assertIsInstance(examples_record, list)
+
+    def test_api_stats(self):
+        """
+        test the /api/stats endpoints
+        """
+        for kind in ["endpoints", "backends", "examples"]:
+            response = self.client.get(f"/api/stats/{kind}?window=3600")
+            self.assertEqual(200, response.status_code)
+            stats_record = response.json()
+            if self.debug:
+                print(stats_record)
+            self.assertEqual(kind, stats_record["kind"])
+            self.assertIsInstance(stats_record["targets"], dict)
+            for _key, stats in stats_record["targets"].items():
+                self.assertIn("count", stats)
+                self.assertIn("uptime", stats)
+        response = self.client.get("/api/stats/unknown")
+        self.assertEqual(404, response.status_code)
+
+    def test_api_stream(self):
+        """
+        test the streaming probe endpoints
+        """
+        response = self.client.get("/api/backends/probe/stream?format=sse")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(
+            response.headers["content-type"].startswith("text/event-stream")
+        )
+        events = response.text.strip().split("\n\n")
+        if self.debug:
+            print(events)
+        # one result event per backend and a final done event
+        self.assertTrue(events[-1].startswith("event: done"))
+        for event in events[:-1]:
+            self.assertTrue(event.startswith("event: result"))
+        response = self.client.get("/api/backends/probe/stream?max_age=3600")
+        self.assertEqual(200, response.status_code)
+        for line in response.text.splitlines():
+            record = json.loads(line)
+            self.assertEqual("backends", record["kind"])
+            self.assertIn("success", record)
+        response = self.client.get("/api/examples/check/stream?format=xml")
+        self.assertEqual(400, response.status_code)
+
+    def test_metrics(self):
+        """
+        test the Prometheus /metrics endpoint
+        """
+        # probe explicitly so that there are latency observations - a plain
+        # /api/backends may be served from the cache without any probe
+        response = self.client.get(
+            "/api/backends/probe/stream", params={"timeout": 2.0}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.text.strip())
+        response = self.client.get("/metrics")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        text = response.text
+        if self.debug:
+            print(text)
+        for name in [
+            "nicescholia_probe_latency_seconds",
+            "nicescholia_cache_hit_ratio",
+            "nicescholia_connected_clients",
+            "nicescholia_event_loop_lag_seconds",
+        ]:
+            self.assertIn(f"# TYPE {name}", text)
+        self.assertIn('nicescholia_probe_latency_seconds_count{kind="backends"}', text)
+
+    def test_stream_slot_released(self):
+        """
+        test that the slot of a stream is released even if the client
+        disconnects before the body has started
+        """
+
+        async def run():
+            for _i in range(5):
+                response = await self.ws.stream_response("backends", "ndjson")
+                # the body is never iterated - only the background task runs
+                await response.background()
+            return self.ws.limiter("stream").active
+
+        active = asyncio.run(run())
+        self.assertEqual(0, active)